@@ -61,6 +61,7 @@ def create(env_vars: dict[str, str]) -> None:
             "absl-py (>=2.2.1,<3.0.0)",
             "pydantic (>=2.10.6,<3.0.0)",
             "requests (>=2.32.3,<3.0.0)",
+            "numpy (>=2.0.0,<3.0.0)",
         ],
         extra_packages=[
             "./heracles_ai",  # The main package
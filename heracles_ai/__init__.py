@@ -15,5 +15,6 @@
 
 """Heracles.AI Package Initialization."""
 
-# Make the root_agent instance available directly when importing the package.
-from .agent import root_agent
+# Make the root_agent instance (and the app running it with its plugins)
+# available directly when importing the package.
+from .agent import app, root_agent
@@ -18,8 +18,10 @@
 """Heracles.AI Root Agent definition."""
 
 from google.adk.agents import Agent
+from google.adk.apps import App
 
 from heracles_ai import prompt
+from heracles_ai.shared_libraries import metrics
 
 # import onboarding_agent
 from heracles_ai.sub_agents.onboarding.agent import onboarding_agent
@@ -35,9 +37,11 @@ from heracles_ai.sub_agents.monitoring.agent import monitoring_agent # Import th
 from heracles_ai.sub_agents.feedback.agent import feedback_agent # Import the feedback agent
 
 from heracles_ai.tools.memory import memorize  # Only import the specific tool needed
+from heracles_ai.shared_libraries.models import get_model
+from heracles_ai.shared_libraries.router import route_user_message
 
 root_agent = Agent(
-    model="gemini-2.0-flash-001", # Updated model
+    model=get_model("root_agent"),
     name="root_agent",
     description="Heracles.ai: A Health and Fitness Coach using the services of multiple sub-agents",
     instruction=prompt.ROOT_AGENT_INSTR,
@@ -53,4 +57,14 @@ root_agent = Agent(
         memorize
     ],
     before_agent_callback=_load_precreated_profile,
-)
\ No newline at end of file
+    # Transfers high-confidence intents without a model call.
+    before_model_callback=route_user_message,
+)
+
+# Latency metrics for every agent and tool, exported in Prometheus text format.
+plugins = []
+if metrics.METRICS_FILE:
+    plugins.append(metrics.MetricsPlugin(metrics.instrument(root_agent)))
+    metrics.start_exporter(metrics.METRICS_FILE)
+
+app = App(name="heracles_ai", root_agent=root_agent, plugins=plugins)
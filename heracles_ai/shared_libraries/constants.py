@@ -19,6 +19,18 @@ PROGRAM_INITIALIZED = "_program_initialized"
 
 PROGRAM_KEY = "program"
 PROFILE_KEY = "user_profile"
+CMC_KEY = "cmc"
+CMC_MEMO_KEY = "_cmc_memo"
+DIET_PLAN_KEY = "diet_plan"
+FITNESS_PLAN_KEY = "fitness_plan"
+WORKOUT_SESSIONS_KEY = "workout_sessions"
+MEALS_KEY = "meals"
+# The merged nutrition and fitness plan of the parallel planning mode.
+COMBINED_PLAN_KEY = "combined_plan"
+# Prefix of the draft of a plan, filled chunk by chunk while it is created.
+PLAN_DRAFT_PREFIX = "_draft:"
+# Running aggregates of the progress analytics tool.
+ANALYTICS_KEY = "_progress_analytics"
 
 PROGRAM_START_DATE = "program_start_date"
 PROGRAM_END_DATE = "program_end_date"
@@ -42,4 +54,31 @@ GOAL_ADJUSTMENTS = {
     "lose_weight": -500,    # Deficit for weight loss
     "maintain_weight": 0,   # No adjustment for maintenance
     "gain_weight": 500      # Surplus for weight gain
-}
\ No newline at end of file
+}
+
+# Common spellings of the activity levels (normalized: lowercase, "_" for
+# spaces and dashes). Canonical keys and casing variants need no entry.
+ACTIVITY_LEVEL_ALIASES = {
+    "sedentary": ("inactive", "not_active", "no_exercise", "desk_job", "minimal"),
+    "lightly_active": ("light", "lightly", "low", "low_activity", "slightly_active", "somewhat_active"),
+    "moderately_active": ("moderate", "moderately", "medium", "average", "moderate_activity", "regular"),
+    "very_active": ("active", "very", "high", "high_activity", "highly_active"),
+    "extra_active": ("extra", "extremely_active", "extreme", "super_active", "athlete"),
+}
+
+# Common spellings of the calorie goals (normalized like the activity aliases).
+GOAL_ALIASES = {
+    "lose_weight": ("lose", "weight_loss", "lose_fat", "fat_loss", "burn_fat", "cut", "cutting", "reduce_weight"),
+    "maintain_weight": ("maintain", "maintenance", "weight_maintenance", "maintain_current_weight"),
+    "gain_weight": ("gain", "weight_gain", "gain_muscle", "muscle_gain", "build_muscle", "bulk", "bulking",
+                    "hypertrophy", "increase_muscle_mass"),
+}
+
+# Goals without a calorie adjustment of their own; alone, they imply maintenance.
+MAINTENANCE_GOALS = ("improve_cardio", "improve_endurance", "endurance", "general_fitness", "stay_fit",
+                     "tone", "toning", "flexibility", "improve_flexibility", "health", "stay_healthy")
+
+# When a profile lists several goals, the one earliest in this order sets the
+# calorie adjustment; goals implied by MAINTENANCE_GOALS come last.
+GOAL_PRIORITY = ("lose_weight", "gain_weight", "maintain_weight")
+
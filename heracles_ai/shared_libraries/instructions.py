@@ -0,0 +1,302 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Instruction providers that inject compact, per-agent projections of state.
+
+ADK fills `{key}` placeholders with `str(state[key])`, so prompts grow with
+every logged meal and workout. `instruction_provider(agent_name, template)`
+returns an ADK InstructionProvider that fills them from a `Projection`
+instead:
+
+- Only the fields the agent needs are kept (e.g. the coach sees the
+  equipment, not the food allergies).
+- Long lists and strings are truncated; dated records keep the most recent
+  entries.
+- The state is rendered as compact JSON.
+- The rendered state is kept within a token budget per agent, truncating
+  further if needed.
+
+Keys in `context_keys` are appended as a <state> block, for prompts that have
+no placeholders. The rendered instruction is memoized per session state
+version (the session's event count and last event), so model calls within
+an unchanged state reuse it.
+
+Configuration (environment):
+    HERACLES_AI_PROMPT_STATE_BUDGET: Overrides the token budget of every agent.
+"""
+
+import collections
+import dataclasses
+import json
+import math
+import os
+import re
+import threading
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.sessions.state import State
+
+from heracles_ai.shared_libraries import constants
+from heracles_ai.shared_libraries.log import get_logger
+
+logger = get_logger("instructions")
+
+PROMPT_STATE_BUDGET = int(os.getenv("HERACLES_AI_PROMPT_STATE_BUDGET", "0"))
+
+# Same placeholder syntax as ADK's instruction templating.
+_TEMPLATE_VAR = re.compile(r"{+[^{}]*}+")
+
+# Rough token count of English text and JSON.
+CHARS_PER_TOKEN = 4
+
+# Rendered instructions kept per provider.
+CACHE_SIZE = 256
+
+
+@dataclasses.dataclass(frozen=True)
+class Projection:
+    """
+    The parts of the session state an agent's instruction shows.
+
+    Attributes:
+        fields: State key -> the top-level fields kept of its dict value
+            (None keeps all fields). Keys not listed are rendered as ADK does.
+        context_keys: Keys appended to the instruction as a <state> block.
+        max_items: Lists are cut to this many items.
+        max_chars: Strings are cut to this many characters.
+        token_budget: Upper bound of the tokens of the injected state.
+    """
+
+    fields: Mapping[str, Optional[Tuple[str, ...]]] = dataclasses.field(default_factory=dict)
+    context_keys: Tuple[str, ...] = ()
+    max_items: int = 7
+    max_chars: int = 240
+    token_budget: int = 1200
+
+
+_NUTRITION_PROFILE = ("name_surname", "age", "sex", "gender", "height_cm", "weight_kg", "activity_level",
+                      "fitness_goals", "dietary_preferences", "food_allergies", "health_conditions")
+_TRAINING_PROFILE = ("name_surname", "age", "sex", "gender", "height_cm", "weight_kg", "activity_level",
+                     "fitness_level", "fitness_goals", "fitness_preferences", "equipment_available",
+                     "preferred_workout_times", "health_conditions", "program_start_date", "program_end_date")
+_PLAN_SUMMARY = {
+    "fitness_plan": ("name", "duration_weeks", "workouts_per_week", "daily_workouts"),
+    "diet_plan": ("name", "daily_calories", "meals"),
+}
+
+PROJECTIONS: Dict[str, Projection] = {
+    "planning_agent": Projection(
+        fields={
+            constants.PROFILE_KEY: tuple(dict.fromkeys(_NUTRITION_PROFILE + _TRAINING_PROFILE)),
+            "diet_plan": None,
+            "fitness_plan": None,
+            constants.COMBINED_PLAN_KEY: None,
+        },
+        token_budget=2500,
+    ),
+    "dietitian_agent": Projection(fields={constants.PROFILE_KEY: _NUTRITION_PROFILE}, token_budget=600),
+    "nutiritions_calculator_agent": Projection(fields={constants.PROFILE_KEY: ("name_surname",)}, token_budget=100),
+    "coach_agent": Projection(fields={constants.PROFILE_KEY: _TRAINING_PROFILE}, token_budget=600),
+    "monitoring_agent": Projection(
+        fields={constants.PROFILE_KEY: ("name_surname", "fitness_goals"), **_PLAN_SUMMARY},
+        context_keys=(constants.PROFILE_KEY, "fitness_plan", "diet_plan", "workout_sessions", "meals"),
+        max_items=5,
+        token_budget=1200,
+    ),
+    "feedback_agent": Projection(
+        fields={constants.PROFILE_KEY: ("name_surname", "fitness_goals"), **_PLAN_SUMMARY},
+        context_keys=(constants.PROFILE_KEY, "fitness_plan", "diet_plan", "workout_sessions", "meals"),
+        max_items=5,
+        token_budget=1200,
+    ),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _is_state_name(name: str) -> bool:
+    parts = name.split(":")
+    if len(parts) == 1:
+        return name.isidentifier()
+    return len(parts) == 2 and parts[0] + ":" in (State.APP_PREFIX, State.USER_PREFIX, State.TEMP_PREFIX) \
+        and parts[1].isidentifier()
+
+
+def _is_dated(items: list) -> bool:
+    return bool(items) and isinstance(items[-1], dict) and "date" in items[-1]
+
+
+def compact(value: Any, max_items: int, max_chars: int) -> Any:
+    """
+    Returns a smaller copy of a state value.
+
+    Empty fields are dropped. Lists keep `max_items` items: the last ones
+    for dated records (logs), the first ones otherwise, followed by a
+    marker with the number of items left out. Strings are cut to
+    `max_chars`.
+    """
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            item = compact(item, max_items, max_chars)
+            if item not in (None, "", [], {}):
+                result[key] = item
+        return result
+    if isinstance(value, list):
+        items = [compact(item, max_items, max_chars) for item in value]
+        if len(items) <= max_items:
+            return items
+        left_out = len(items) - max_items
+        if _is_dated(value):
+            return [f"... {left_out} earlier"] + items[-max_items:]
+        return items[:max_items] + [f"... {left_out} more"]
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars] + "..."
+    return value
+
+
+def project(state: Mapping[str, Any], key: str, projection: Projection, level: int = 0) -> str:
+    """
+    Renders one state key as compact JSON.
+
+    Args:
+        state: The session state.
+        key: The state key.
+        projection: The agent's projection.
+        level: Truncation level; each level halves the list and string limits.
+
+    Returns:
+        The rendered value ("" for None).
+    """
+    value = state.get(key)
+    if value is None:
+        return ""
+    fields = projection.fields.get(key)
+    if fields is not None and isinstance(value, dict):
+        value = {field: value[field] for field in fields if field in value}
+    value = compact(value, max(1, projection.max_items >> level), max(24, projection.max_chars >> level))
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+# Truncation levels tried to fit the token budget.
+_MAX_LEVEL = 4
+
+
+def render_instruction(template: str, state: Mapping[str, Any], projection: Projection,
+                       agent_name: str = "") -> str:
+    """
+    Fills the placeholders of an instruction template from a projection of state.
+
+    Placeholders follow ADK's syntax: `{key}`, `{key?}` (empty if missing),
+    and anything that is not a state name is left as is.
+
+    Args:
+        template: The instruction template.
+        state: The session state.
+        projection: The agent's projection.
+        agent_name: Used in error and log messages.
+
+    Returns:
+        The instruction.
+
+    Raises:
+        KeyError: If a required placeholder is missing from the state.
+    """
+    budget = PROMPT_STATE_BUDGET or projection.token_budget
+    for level in range(_MAX_LEVEL + 1):
+        injected = 0
+
+        def replace(match: re.Match) -> str:
+            nonlocal injected
+            name = match.group().lstrip("{").rstrip("}").strip()
+            optional = name.endswith("?")
+            name = name.removesuffix("?")
+            if not _is_state_name(name):
+                return match.group()
+            if name not in state:
+                if optional:
+                    return ""
+                raise KeyError(f"Context variable not found: `{name}` in agent '{agent_name}'.")
+            if name in projection.fields:
+                text = project(state, name, projection, level)
+            else:
+                text = "" if state[name] is None else str(state[name])
+            injected += len(text)
+            return text
+
+        instruction = _TEMPLATE_VAR.sub(replace, template)
+        context = [(key, project(state, key, projection, level)) for key in projection.context_keys if key in state]
+        context = [(key, text) for key, text in context if text]
+        if context:
+            block = "\n".join(f"{key}: {text}" for key, text in context)
+            injected += len(block)
+            instruction += f"\n<state>\n{block}\n</state>\n"
+        if injected <= budget * CHARS_PER_TOKEN:
+            return instruction
+
+    logger.warning("Injected state of %s is over its budget of %d tokens (about %d)",
+                   agent_name, budget, math.ceil(injected / CHARS_PER_TOKEN))
+    return instruction
+
+
+class StateInstructionProvider:
+    """ADK InstructionProvider rendering a template with a state projection."""
+
+    def __init__(self, template: str, projection: Projection, agent_name: str = ""):
+        self.template = template
+        self.projection = projection
+        self.agent_name = agent_name
+        self._cache: "collections.OrderedDict[Tuple[Any, ...], str]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def state_version(context: ReadonlyContext) -> Tuple[Any, ...]:
+        """Identifies the state of a session: it only changes through appended events."""
+        session = context.session
+        events = session.events
+        return (session.app_name, session.user_id, session.id, len(events), events[-1].id if events else None)
+
+    def __call__(self, context: ReadonlyContext) -> str:
+        key = self.state_version(context)
+        with self._lock:
+            instruction = self._cache.get(key)
+            if instruction is not None:
+                self._cache.move_to_end(key)
+                return instruction
+
+        instruction = render_instruction(self.template, context.state, self.projection, self.agent_name)
+        with self._lock:
+            self._cache[key] = instruction
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return instruction
+
+
+def instruction_provider(agent_name: str, template: str) -> StateInstructionProvider:
+    """
+    Returns the instruction provider of an agent.
+
+    Args:
+        agent_name: Name of the agent (selects its entry in PROJECTIONS).
+        template: The agent's instruction template.
+
+    Returns:
+        The provider, to pass as the agent's `instruction`.
+    """
+    return StateInstructionProvider(template, PROJECTIONS.get(agent_name, Projection()), agent_name)
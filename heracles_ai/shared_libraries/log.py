@@ -0,0 +1,132 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Leveled, non-blocking logging for the Heracles.AI tools.
+
+Tools log through `get_logger(<tool name>)` with %-style arguments, so
+messages are only formatted when the level is enabled. Records are handed to
+a queue on the request path and written to stderr by a background
+QueueListener thread.
+
+Configuration (environment):
+    HERACLES_AI_LOG_LEVEL: Level of all tool loggers (default INFO).
+    HERACLES_AI_TOOL_LOG_LEVELS: Per-tool overrides, e.g. "cmc=DEBUG,fitness=WARNING".
+"""
+
+import atexit
+import copy
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from typing import Dict, Optional
+
+LOGGER_NAME = "heracles_ai"
+
+LOG_LEVEL = os.getenv("HERACLES_AI_LOG_LEVEL", "INFO")
+TOOL_LOG_LEVELS = os.getenv("HERACLES_AI_TOOL_LOG_LEVELS", "")
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_configured = False
+_lock = threading.Lock()
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    A QueueHandler that leaves the Formatter work to the listener thread.
+
+    The stock handler formats every record before enqueueing it. Here only
+    the message is resolved on the calling thread, so %-args that a tool
+    keeps mutating (a dict or list from state) are logged with their value at
+    the call; the timestamp, level and traceback are formatted by the
+    listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """
+    Parses per-tool log levels.
+
+    Args:
+        spec: Comma-separated `<tool>=<level>` pairs (e.g. "cmc=DEBUG,fitness=WARNING").
+
+    Returns:
+        A mapping of tool name to logging level.
+
+    Raises:
+        ValueError: If a level name is unknown.
+    """
+    levels = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, level = item.partition("=")
+        value = logging.getLevelName(level.strip().upper())
+        if not isinstance(value, int):
+            raise ValueError(f"Unknown log level '{level}' for '{name.strip()}'")
+        levels[name.strip()] = value
+    return levels
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    tool_levels: Optional[Dict[str, int]] = None,
+    handler: Optional[logging.Handler] = None,
+) -> None:
+    """
+    Sets up the tool loggers. Safe to call more than once; later calls only
+    update the levels.
+
+    Args:
+        level: Level of all tool loggers (defaults to HERACLES_AI_LOG_LEVEL).
+        tool_levels: Per-tool levels (defaults to HERACLES_AI_TOOL_LOG_LEVELS).
+        handler: The sink the listener writes to (defaults to stderr).
+    """
+    global _listener, _configured
+    with _lock:
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.setLevel((level or LOG_LEVEL).upper())
+        for name, tool_level in (tool_levels if tool_levels is not None else parse_levels(TOOL_LOG_LEVELS)).items():
+            logging.getLogger(f"{LOGGER_NAME}.{name}").setLevel(tool_level)
+
+        if _configured:
+            return
+        if handler is None:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        logger.addHandler(_DeferredQueueHandler(log_queue))
+        logger.propagate = False
+        _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+        _configured = True
+
+
+def get_logger(tool_name: str) -> logging.Logger:
+    """
+    Returns the logger of a tool (`heracles_ai.<tool_name>`), configuring the
+    shared sink on first use.
+    """
+    if not _configured:
+        configure_logging()
+    return logging.getLogger(f"{LOGGER_NAME}.{tool_name}")
@@ -0,0 +1,368 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per-agent and per-tool latency metrics for the Heracles.AI agent tree.
+
+`instrument(root_agent)` attaches ADK before/after agent, model and tool
+callbacks to every agent in the tree (sub-agents and agents wrapped in an
+AgentTool). They record wall time, model calls, token counts and tool time
+into a registry that renders in the Prometheus text exposition format.
+`MetricsPlugin` closes the timers ADK leaves open when an invocation ends;
+add it to the runner.
+
+Configuration (environment):
+    HERACLES_AI_METRICS_FILE: If set, the root agent is instrumented and the
+        metrics are written to this file periodically and at exit (e.g. for
+        the node-exporter textfile collector).
+    HERACLES_AI_METRICS_EXPORT_INTERVAL: Seconds between writes (default 15).
+"""
+
+import atexit
+import bisect
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from google.adk.plugins.base_plugin import BasePlugin
+
+METRICS_FILE = os.getenv("HERACLES_AI_METRICS_FILE", "")
+METRICS_EXPORT_INTERVAL_SECONDS = float(os.getenv("HERACLES_AI_METRICS_EXPORT_INTERVAL", "15"))
+
+# Histogram bucket upper bounds, in seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_HELP = {
+    "heracles_agent_runs_total": ("counter", "Agent runs."),
+    "heracles_agent_duration_seconds": ("histogram", "Wall time of an agent run, including its sub-agents and tools."),
+    "heracles_model_calls_total": ("counter", "Model calls made by an agent."),
+    "heracles_model_duration_seconds": ("histogram", "Wall time of a model call."),
+    "heracles_model_tokens_total": ("counter", "Tokens used by model calls, by type (prompt, candidates, thoughts)."),
+    "heracles_tool_calls_total": ("counter", "Tool calls."),
+    "heracles_tool_errors_total": ("counter", "Tool calls that returned an error."),
+    "heracles_tool_duration_seconds": ("histogram", "Wall time of a tool call."),
+    "heracles_search_cache_requests_total": ("counter", "Search cache lookups, by result (hit, miss)."),
+    "heracles_router_decisions_total": ("counter", "Root agent routing decisions, by route (rule, classifier, llm) and agent."),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram, as exposed by Prometheus."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf.
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimates a quantile as the upper bound of the bucket holding it."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class MetricsRegistry:
+    """Thread-safe store of labelled counters and histograms."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, labels: Dict[str, Any], value: float = 1.0) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def observe(self, name: str, labels: Dict[str, Any], value: float) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def counter(self, name: str, **labels: Any) -> float:
+        """Returns the current value of a counter (0 if never incremented)."""
+        return self.counters.get((name, _labels(labels)), 0.0)
+
+    def histogram(self, name: str, **labels: Any) -> Optional[Histogram]:
+        return self.histograms.get((name, _labels(labels)))
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def render(self) -> str:
+        """Renders all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+            lines: List[str] = []
+            declared = set()
+
+            def declare(name: str) -> None:
+                if name not in declared:
+                    declared.add(name)
+                    kind, text = METRIC_HELP.get(name, ("untyped", name))
+                    lines.append(f"# HELP {name} {text}")
+                    lines.append(f"# TYPE {name} {kind}")
+
+            for (name, labels), value in counters:
+                declare(name)
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+            for (name, labels), histogram in histograms:
+                declare(name)
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', f'{bound:g}'))} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {histogram.count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Atomically writes the rendered metrics to a file."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(self.render())
+        os.replace(tmp_path, path)
+
+
+REGISTRY = MetricsRegistry()
+
+
+class LatencyRecorder:
+    """
+    ADK callbacks that time agents, model calls and tools.
+
+    Start times are kept per invocation, then per (kind, agent or function
+    call) on a stack, so nested and concurrent runs of the same agent are
+    timed independently. All callbacks return None and never alter the flow.
+
+    ADK does not always run the "after" callbacks (an agent whose run ends
+    with the invocation, a model call answered by a before_model callback),
+    so `finish_invocation` (called by `MetricsPlugin` when the runner is
+    done) closes whatever is still open.
+    """
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY):
+        self.registry = registry
+        self._starts: Dict[str, Dict[Tuple[str, str], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, invocation_id: str, key: Tuple[str, str]) -> None:
+        with self._lock:
+            self._starts.setdefault(invocation_id, {}).setdefault(key, []).append(time.perf_counter())
+
+    def _stop(self, invocation_id: str, key: Tuple[str, str]) -> Optional[float]:
+        with self._lock:
+            open_keys = self._starts.get(invocation_id)
+            starts = open_keys.get(key) if open_keys else None
+            if not starts:
+                return None
+            started = starts.pop()
+            if not starts:
+                del open_keys[key]
+                if not open_keys:
+                    del self._starts[invocation_id]
+        return time.perf_counter() - started
+
+    def finish_invocation(self, invocation_id: str) -> None:
+        """
+        Closes the timers an invocation left open.
+
+        Agents still running ended with the invocation and are recorded as
+        runs; model and tool timers without a response are dropped.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            open_keys = self._starts.pop(invocation_id, {})
+        for (kind, name), starts in open_keys.items():
+            if kind != "agent":
+                continue
+            for started in starts:
+                self.registry.inc("heracles_agent_runs_total", {"agent": name})
+                self.registry.observe("heracles_agent_duration_seconds", {"agent": name}, now - started)
+
+    # --- Agent callbacks ---
+    def before_agent(self, callback_context) -> None:
+        self._start(callback_context.invocation_id, ("agent", callback_context.agent_name))
+
+    def after_agent(self, callback_context) -> None:
+        agent = callback_context.agent_name
+        elapsed = self._stop(callback_context.invocation_id, ("agent", agent))
+        self.registry.inc("heracles_agent_runs_total", {"agent": agent})
+        if elapsed is not None:
+            self.registry.observe("heracles_agent_duration_seconds", {"agent": agent}, elapsed)
+
+    # --- Model callbacks ---
+    def before_model(self, callback_context, llm_request) -> None:
+        self._start(callback_context.invocation_id, ("model", callback_context.agent_name))
+
+    def after_model(self, callback_context, llm_response) -> None:
+        if getattr(llm_response, "partial", False):
+            return
+        agent = callback_context.agent_name
+        elapsed = self._stop(callback_context.invocation_id, ("model", agent))
+        self.registry.inc("heracles_model_calls_total", {"agent": agent})
+        if elapsed is not None:
+            self.registry.observe("heracles_model_duration_seconds", {"agent": agent}, elapsed)
+        usage = getattr(llm_response, "usage_metadata", None)
+        if usage is not None:
+            for kind in ("prompt", "candidates", "thoughts"):
+                tokens = getattr(usage, f"{kind}_token_count", None)
+                if tokens:
+                    self.registry.inc("heracles_model_tokens_total", {"agent": agent, "type": kind}, tokens)
+
+    # --- Tool callbacks ---
+    @staticmethod
+    def _tool_key(tool, tool_context) -> Tuple[str, str]:
+        return ("tool", getattr(tool_context, "function_call_id", None) or tool.name)
+
+    def before_tool(self, tool, args, tool_context) -> None:
+        self._start(tool_context.invocation_id, self._tool_key(tool, tool_context))
+
+    def after_tool(self, tool, args, tool_context, tool_response) -> None:
+        labels = {"agent": tool_context.agent_name, "tool": tool.name}
+        elapsed = self._stop(tool_context.invocation_id, self._tool_key(tool, tool_context))
+        self.registry.inc("heracles_tool_calls_total", labels)
+        if isinstance(tool_response, dict) and "error" in tool_response:
+            self.registry.inc("heracles_tool_errors_total", labels)
+        if elapsed is not None:
+            self.registry.observe("heracles_tool_duration_seconds", labels, elapsed)
+
+
+class MetricsPlugin(BasePlugin):
+    """
+    Runner plugin that closes a recorder's open timers when an invocation ends.
+
+    Pass it to the runner (`Runner(..., plugins=[MetricsPlugin(recorder)])`
+    or `App(plugins=...)`) of an agent tree instrumented with `instrument`.
+    """
+
+    def __init__(self, recorder: LatencyRecorder):
+        super().__init__(name="heracles_metrics")
+        self.recorder = recorder
+
+    async def after_run_callback(self, *, invocation_context) -> None:
+        self.recorder.finish_invocation(invocation_context.invocation_id)
+
+    async def on_run_error_callback(self, *, invocation_context, error: Exception) -> None:
+        self.recorder.finish_invocation(invocation_context.invocation_id)
+
+
+def _as_list(callback: Any) -> List[Any]:
+    if callback is None:
+        return []
+    return list(callback) if isinstance(callback, list) else [callback]
+
+
+def instrument(agent, recorder: Optional[LatencyRecorder] = None) -> LatencyRecorder:
+    """
+    Attaches timing callbacks to an agent and every agent below it.
+
+    Timing callbacks run before the agent's own "before" callbacks and after
+    its own "after" callbacks, so they cover them; the model timer starts
+    after the agent's before_model callbacks, once the call is certain. Agents reachable through
+    several parents are instrumented once. Add a `MetricsPlugin` of the
+    returned recorder to the runner.
+
+    Args:
+        agent: The root of the agent tree (e.g. `root_agent`).
+        recorder: The recorder to use (defaults to one on the global REGISTRY).
+
+    Returns:
+        The recorder.
+    """
+    recorder = recorder or LatencyRecorder()
+    seen = set()
+    pending = [agent]
+    while pending:
+        current = pending.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+
+        current.before_agent_callback = [recorder.before_agent] + _as_list(current.before_agent_callback)
+        current.after_agent_callback = _as_list(current.after_agent_callback) + [recorder.after_agent]
+        if hasattr(current, "before_model_callback"):
+            # Last, so a model call answered by a before_model callback (the
+            # root agent's router) is never timed: ADK skips the after_model
+            # callbacks of such a call.
+            current.before_model_callback = _as_list(current.before_model_callback) + [recorder.before_model]
+            current.after_model_callback = _as_list(current.after_model_callback) + [recorder.after_model]
+            current.before_tool_callback = [recorder.before_tool] + _as_list(current.before_tool_callback)
+            current.after_tool_callback = _as_list(current.after_tool_callback) + [recorder.after_tool]
+
+        pending.extend(current.sub_agents)
+        for tool in getattr(current, "tools", None) or []:
+            wrapped = getattr(tool, "agent", None)
+            if wrapped is not None:
+                pending.append(wrapped)
+    return recorder
+
+
+_exporter: Optional[threading.Thread] = None
+
+
+def start_exporter(
+    path: str,
+    interval: float = METRICS_EXPORT_INTERVAL_SECONDS,
+    registry: MetricsRegistry = REGISTRY,
+) -> None:
+    """Writes the registry to `path` every `interval` seconds and at exit."""
+    global _exporter
+    if _exporter is not None:
+        return
+
+    def run() -> None:
+        while True:
+            time.sleep(interval)
+            registry.write(path)
+
+    _exporter = threading.Thread(target=run, name="heracles-metrics-exporter", daemon=True)
+    _exporter.start()
+    atexit.register(registry.write, path)
@@ -0,0 +1,210 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pluggable model backend for the Heracles.AI agents.
+
+Every agent gets its model from `get_model(<agent name>)`. The backend is
+chosen per deployment:
+
+    live:     The model name is passed to ADK as before (Gemini).
+    record:   Calls the live model and stores every response in a cassette
+              keyed by a hash of the request contents.
+    replay:   Answers from the cassettes without network access. Requests
+              that were never recorded fail, or go to the scripted model
+              (with a warning) if the fallback is "scripted".
+    scripted: Deterministic keyword-routed scripts (see scripted_llm.py).
+
+Configuration (environment):
+    HERACLES_AI_MODEL: The live model name (default gemini-2.0-flash-001).
+    HERACLES_AI_MODEL_BACKEND: live, record, replay or scripted (default live).
+    HERACLES_AI_MODEL_CASSETTE_DIR: Directory of the cassettes (default eval/cassettes).
+    HERACLES_AI_MODEL_REPLAY_FALLBACK: error or scripted (default error).
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Any, AsyncGenerator, List, Optional, Union
+
+from google.adk.models import LlmCapabilities
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+from pydantic import PrivateAttr
+
+from heracles_ai.shared_libraries.log import get_logger
+from heracles_ai.shared_libraries.scripted_llm import ScriptedLlm
+
+MODEL_NAME = os.getenv("HERACLES_AI_MODEL", "gemini-2.0-flash-001")
+MODEL_BACKEND = os.getenv("HERACLES_AI_MODEL_BACKEND", "live").strip().lower()
+MODEL_CASSETTE_DIR = os.getenv("HERACLES_AI_MODEL_CASSETTE_DIR", "eval/cassettes")
+MODEL_REPLAY_FALLBACK = os.getenv("HERACLES_AI_MODEL_REPLAY_FALLBACK", "error").strip().lower()
+
+BACKENDS = ("live", "record", "replay", "scripted")
+
+# Date-times (e.g. the session's "Current time: {_time}" in an instruction)
+# differ between recording and replay, so they are left out of request keys.
+# Plain dates are kept: they carry meaning (a logged meal's date).
+_DATETIME = re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?")
+
+logger = get_logger("models")
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode for a request that was never recorded."""
+
+
+def request_key(llm_request: LlmRequest) -> str:
+    """
+    Returns a stable hash of what the model sees in a request.
+
+    The key covers the model name, system instruction, contents and the names
+    of the available tools, so any change to the prompt or the conversation
+    leads to a new recording. Date-times are replaced by a placeholder, so
+    a recording still matches in a later session.
+
+    Args:
+        llm_request: The request sent to the model.
+
+    Returns:
+        A hex SHA-256 digest.
+    """
+    config = llm_request.config
+    instruction = config.system_instruction if config else None
+    if instruction is not None and not isinstance(instruction, str):
+        instruction = instruction.model_dump(mode="json", exclude_none=True) if hasattr(instruction, "model_dump") else str(instruction)
+    payload = {
+        "model": llm_request.model,
+        "system_instruction": instruction,
+        "contents": [content.model_dump(mode="json", exclude_none=True) for content in llm_request.contents],
+        "tools": sorted(llm_request.tools_dict),
+    }
+    encoded = _DATETIME.sub("<datetime>", json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class CassetteStore:
+    """One JSON file of recorded responses per request key."""
+
+    def __init__(self, directory: str = MODEL_CASSETTE_DIR):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key: str) -> Optional[List[LlmResponse]]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        return [LlmResponse.model_validate(response) for response in data["responses"]]
+
+    def save(self, key: str, responses: List[LlmResponse]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"responses": [response.model_dump(mode="json", exclude_none=True) for response in responses]},
+                file, indent=2,
+            )
+        os.replace(tmp_path, path)
+
+
+class RecordingLlm(BaseLlm):
+    """Calls the live model and records its responses."""
+
+    cassette_dir: str = MODEL_CASSETTE_DIR
+    _delegate: BaseLlm = PrivateAttr()
+    _store: CassetteStore = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        self._delegate = LLMRegistry.new_llm(self.model)
+        self._store = CassetteStore(self.cassette_dir)
+
+    @property
+    def capabilities(self) -> LlmCapabilities:
+        return self._delegate.capabilities
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        key = request_key(llm_request)
+        responses = []
+        async for response in self._delegate.generate_content_async(llm_request, stream=stream):
+            if not response.partial:
+                responses.append(response)
+            yield response
+        self._store.save(key, responses)
+
+
+class ReplayLlm(BaseLlm):
+    """Answers from recorded responses, optionally falling back to a scripted model."""
+
+    cassette_dir: str = MODEL_CASSETTE_DIR
+    fallback: Optional[BaseLlm] = None
+    _store: CassetteStore = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        self._store = CassetteStore(self.cassette_dir)
+
+    @property
+    def capabilities(self) -> LlmCapabilities:
+        return LLMRegistry.new_llm(self.model).capabilities
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        key = request_key(llm_request)
+        responses = self._store.load(key)
+        if responses is not None:
+            for response in responses:
+                yield response
+            return
+        if self.fallback is None:
+            raise CassetteMissError(f"No recorded response for request {key} in {self._store.directory}")
+        logger.warning("No recorded response for request %s in %s; answering with %s",
+                       key, self._store.directory, self.fallback.model)
+        async for response in self.fallback.generate_content_async(llm_request, stream=stream):
+            yield response
+
+
+def get_model(agent_name: str, model: str = MODEL_NAME, backend: str = MODEL_BACKEND) -> Union[str, BaseLlm]:
+    """
+    Returns the model of an agent for the configured backend.
+
+    Args:
+        agent_name: Name of the agent (used by the scripted model).
+        model: The live model name.
+        backend: One of BACKENDS.
+
+    Returns:
+        The model name for the live backend, otherwise a BaseLlm instance.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    if backend == "live":
+        return model
+    if backend == "record":
+        return RecordingLlm(model=model)
+    if backend == "replay":
+        fallback = ScriptedLlm(model=f"scripted/{agent_name}") if MODEL_REPLAY_FALLBACK == "scripted" else None
+        return ReplayLlm(model=model, fallback=fallback)
+    if backend == "scripted":
+        return ScriptedLlm(model=f"scripted/{agent_name}")
+    raise ValueError(f"HERACLES_AI_MODEL_BACKEND must be one of {BACKENDS}, got '{backend}'")
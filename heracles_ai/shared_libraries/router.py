@@ -0,0 +1,227 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic pre-router in front of the root agent's delegation call.
+
+The root agent's model is only asked to pick a sub-agent. `route_user_message`
+is a `before_model_callback` that answers the common cases itself:
+
+1. Regex rules match explicit requests ("transfer to planning", "log my
+   run", "how am I doing").
+2. Otherwise, a TF-IDF nearest-centroid classifier routes the message if it
+   is confident enough. The classifier is fitted on the labelled messages in
+   data/router_examples.json the first time it is used (no model call).
+
+For a confident route, the callback returns a `transfer_to_agent` function
+call as the model response, so ADK transfers without a model call. Ambiguous
+messages still go to the model.
+
+Configuration (environment):
+    HERACLES_AI_ROUTER: "on" (default) or "off".
+    HERACLES_AI_ROUTER_MIN_SCORE: Minimum cosine similarity of a classifier route (default 0.3).
+    HERACLES_AI_ROUTER_MIN_MARGIN: Minimum lead over the runner-up (default 0.08).
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from heracles_ai.shared_libraries.log import get_logger
+from heracles_ai.shared_libraries.metrics import REGISTRY, MetricsRegistry
+
+logger = get_logger("router")
+
+ROUTER_ENABLED = os.getenv("HERACLES_AI_ROUTER", "on").strip().lower() not in ("off", "0", "false", "no")
+ROUTER_MIN_SCORE = float(os.getenv("HERACLES_AI_ROUTER_MIN_SCORE", "0.3"))
+ROUTER_MIN_MARGIN = float(os.getenv("HERACLES_AI_ROUTER_MIN_MARGIN", "0.08"))
+
+ROUTER_EXAMPLES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "router_examples.json")
+
+# Short names used in explicit transfer requests.
+AGENT_ALIASES = {
+    "onboarding": "onboarding_agent",
+    "profile": "onboarding_agent",
+    "planning": "planning_agent",
+    "planner": "planning_agent",
+    "coach": "coach_agent",
+    "trainer": "coach_agent",
+    "dietitian": "dietitian_agent",
+    "nutritionist": "dietitian_agent",
+    "monitoring": "monitoring_agent",
+    "feedback": "feedback_agent",
+}
+
+# (agent, pattern) rules, checked in order. A rule whose agent is None takes
+# the agent from the "agent" group (through AGENT_ALIASES).
+RULES: List[Tuple[Optional[str], re.Pattern]] = [
+    (None, re.compile(
+        r"\b(?:transfer|switch|send|connect|take|go)\s+(?:me\s+)?(?:back\s+)?to\s+(?:the\s+)?"
+        rf"(?P<agent>{'|'.join(AGENT_ALIASES)})\b")),
+    ("feedback_agent", re.compile(r"\bhow am i doing\b|\b(?:give|any|some)\s+(?:me\s+)?feedback\b")),
+    # A log request or a report of what the user did, from the start of the
+    # message; questions ("I ate too much, should I change my diet?") and
+    # negations ("I did not understand the plan") go to the model.
+    ("monitoring_agent", re.compile(
+        r"^(?!.*\?)(?:(?:please\s+)?(?:log|record|track)\b"
+        r"|(?:(?:today|yesterday|this\s+morning|tonight),?\s+)?i\s+(?:just\s+)?"
+        r"(?:ate|did|ran|cycled|swam|finished|completed|skipped|missed)\b(?!\s+(?:not|too|so)\b))")),
+    ("planning_agent", re.compile(
+        r"\b(?:create|make|build|generate|design)\s+(?:me\s+)?(?:a\s+|my\s+)?(?:new\s+)?"
+        r"(?:(?:diet|workout|fitness|nutrition|training)\s+(?:and\s+)?)*plan\b")),
+    ("onboarding_agent", re.compile(r"\bmy name is\b|\b(?:update|change)\s+my\s+profile\b")),
+]
+
+# Prefix of the events ADK replays from other agents as user content.
+_CONTEXT_PREFIX = "For context:"
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words with a plural "s" stripped, plus word bigrams."""
+    words = [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w
+             for w in re.findall(r"[a-z0-9']+", text.lower())]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class TfidfRouter:
+    """Nearest-centroid classifier over L2-normalized TF-IDF vectors."""
+
+    def __init__(self, examples: Dict[str, Sequence[str]]):
+        documents = [(label, tokenize(text)) for label, texts in examples.items() for text in texts]
+        vocabulary = sorted({token for _, tokens in documents for token in tokens})
+        self.index = {token: i for i, token in enumerate(vocabulary)}
+        self.labels = list(examples)
+
+        document_frequency = np.zeros(len(vocabulary))
+        for _, tokens in documents:
+            for token in set(tokens):
+                document_frequency[self.index[token]] += 1
+        # Smoothed IDF, as in scikit-learn.
+        self.idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+
+        centroids = np.zeros((len(self.labels), len(vocabulary)))
+        for label, tokens in documents:
+            centroids[self.labels.index(label)] += self._vector(tokens)
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        self.centroids = centroids / np.where(norms == 0, 1, norms)
+
+    def _vector(self, tokens: Sequence[str]) -> np.ndarray:
+        vector = np.zeros(len(self.idf))
+        for token in tokens:
+            i = self.index.get(token)
+            if i is not None:
+                vector[i] += 1
+        vector *= self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def scores(self, text: str) -> List[Tuple[str, float]]:
+        """Returns (agent, cosine similarity) pairs, best first."""
+        similarities = self.centroids @ self._vector(tokenize(text))
+        return sorted(zip(self.labels, similarities.tolist()), key=lambda item: -item[1])
+
+
+_classifier: Optional[TfidfRouter] = None
+_classifier_lock = threading.Lock()
+
+
+def get_classifier() -> TfidfRouter:
+    """Returns the process-wide classifier, fitting it on first use."""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            with open(ROUTER_EXAMPLES_PATH, "r", encoding="utf-8") as file:
+                _classifier = TfidfRouter(json.load(file))
+        return _classifier
+
+
+def classify(text: str, min_score: float = ROUTER_MIN_SCORE,
+             min_margin: float = ROUTER_MIN_MARGIN) -> Tuple[Optional[str], str]:
+    """
+    Picks the sub-agent of a user message, if confident.
+
+    Args:
+        text: The user message.
+        min_score: Minimum classifier similarity.
+        min_margin: Minimum lead of the best agent over the runner-up.
+
+    Returns:
+        (agent name, "rule" or "classifier"), or (None, "llm") when the
+        message should go to the model.
+    """
+    normalized = " ".join(text.lower().split())
+    for agent, pattern in RULES:
+        match = pattern.search(normalized)
+        if match:
+            return agent or AGENT_ALIASES[match.group("agent")], "rule"
+
+    ranked = get_classifier().scores(normalized)
+    (best, score), (_, runner_up) = ranked[0], ranked[1]
+    if score >= min_score and score - runner_up >= min_margin:
+        return best, "classifier"
+    return None, "llm"
+
+
+def _latest_user_text(llm_request: LlmRequest) -> Optional[str]:
+    """Returns the text of the new user message, or None if the model is not answering one."""
+    if not llm_request.contents:
+        return None
+    content = llm_request.contents[-1]
+    if content.role != "user" or not content.parts:
+        return None
+    if any(part.function_response is not None for part in content.parts):
+        return None
+    text = "".join(part.text or "" for part in content.parts).strip()
+    if not text or text.startswith(_CONTEXT_PREFIX):
+        return None
+    return text
+
+
+def route_user_message(callback_context, llm_request: LlmRequest,
+                       registry: MetricsRegistry = REGISTRY) -> Optional[LlmResponse]:
+    """
+    `before_model_callback` of the root agent: transfers high-confidence
+    intents directly instead of asking the model.
+
+    Args:
+        callback_context: The ADK callback context.
+        llm_request: The request about to be sent to the model.
+        registry: Metrics registry of the routing decisions.
+
+    Returns:
+        A `transfer_to_agent` function call response, or None to call the model.
+    """
+    if not ROUTER_ENABLED or "transfer_to_agent" not in llm_request.tools_dict:
+        return None
+    text = _latest_user_text(llm_request)
+    if text is None:
+        return None
+
+    agent, route = classify(text)
+    if agent == callback_context.agent_name:
+        agent, route = None, "llm"
+    registry.inc("heracles_router_decisions_total", {"route": route, "agent": agent or ""})
+    if agent is None:
+        return None
+
+    logger.debug("Routing %r to %s (%s)", text, agent, route)
+    return LlmResponse(content=types.Content(role="model", parts=[
+        types.Part(function_call=types.FunctionCall(name="transfer_to_agent", args={"agent_name": agent})),
+    ]))
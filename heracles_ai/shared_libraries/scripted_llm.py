@@ -0,0 +1,208 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A deterministic, offline stand-in for Gemini that follows fixed scripts.
+
+Used by the "scripted" model backend, as the replay fallback and by the
+load-test harness (tests/benchmark).
+
+Each agent gets its own `ScriptedLlm`. On a new user message the model
+picks an intent from keywords, transfers to the agent that owns the intent
+(if that is not itself), or plays that agent's script: a fixed sequence
+of tool calls, one per model turn, followed by a short text reply.
+"""
+
+import asyncio
+import re
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+# Keywords of the user message -> intent, checked in order.
+INTENT_KEYWORDS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("feedback", ("feedback", "how am i doing", "progress")),
+    ("monitoring", ("log", "did", "ate", "finished")),
+    ("planning", ("plan",)),
+    ("onboarding", ("my name", "years old", "profile")),
+]
+
+# Intent -> agent that owns it.
+INTENT_AGENTS = {
+    "onboarding": "onboarding_agent",
+    "planning": "planning_agent",
+    "monitoring": "monitoring_agent",
+    "feedback": "feedback_agent",
+}
+
+# Agent -> tool calls it makes, in order, before its text reply. Calls to
+# tools the agent does not have (e.g. in another CMC mode) and transfers to
+# agents it cannot reach are skipped.
+AGENT_SCRIPTS: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {
+    "onboarding_agent": [
+        ("memorize_profile", {"fields": {"name_surname": "Jane Doe", "age": 30}}),
+        ("memorize_list", {"key": "fitness_preferences", "value": "running"}),
+    ],
+    "planning_agent": [
+        ("dietitian_agent", {"request": "Design a nutrition program for the user."}),
+        ("coach_agent", {"request": "Design a training program for the user."}),
+        ("transfer_to_agent", {"agent_name": "plan_builder_agent"}),
+        ("memorize", {"key": "program_status", "value": "planned"}),
+    ],
+    "dietitian_agent": [
+        ("nutiritions_calculator_agent", {"request": "Calculate my calorie and macro needs."}),
+        ("calculate_and_store_cmc_tool", {"query": "weight loss"}),
+        ("meal_plan_tool", {"days": 1}),
+        ("nutrition_tool", {"query": "vegetarian high-protein snacks under 300 kcal"}),
+    ],
+    "nutiritions_calculator_agent": [
+        ("calories_macro_calculator_tool", {"query": "weight loss"}),
+    ],
+    "coach_agent": [
+        ("workout_plan_tool", {"duration_weeks": 12}),
+        ("fitness_tool", {"query": "dumbbell exercises for chest"}),
+    ],
+    "monitoring_agent": [
+        ("memorize", {"key": "last_workout", "value": "30 minute run"}),
+        ("log_workout_session", {"session": {"date": "2024-02-26", "type": "Running", "duration_minutes": 30}}),
+        ("progress_analytics_tool", {}),
+    ],
+    "feedback_agent": [
+        ("progress_analytics_tool", {}),
+    ],
+}
+
+
+# Tools whose result an agent with an output schema returns as its
+# structured reply (through ADK's set_model_response tool).
+STRUCTURED_REPLY_SOURCES = ("workout_plan_tool", "meal_plan_tool")
+
+
+_INTENT_PATTERNS = [
+    (intent, re.compile("|".join(rf"\b{re.escape(keyword)}" for keyword in keywords)))
+    for intent, keywords in INTENT_KEYWORDS
+]
+
+
+def detect_intent(text: str) -> Optional[str]:
+    """Returns the intent of the first keyword group matching at a word start."""
+    text = text.lower()
+    for intent, pattern in _INTENT_PATTERNS:
+        if pattern.search(text):
+            return intent
+    return None
+
+
+# ADK replays other agents' events to an agent as user text with this prefix.
+_CONTEXT_PREFIX = "For context:"
+
+
+def _last_user_turn(contents: List[types.Content]) -> Tuple[str, int]:
+    """Returns the last user text and the number of tool responses after it."""
+    responses = 0
+    for content in reversed(contents):
+        parts = content.parts or []
+        if parts and (parts[0].text or "").startswith(_CONTEXT_PREFIX):
+            continue
+        for part in reversed(parts):
+            if part.function_response is not None:
+                if part.function_response.name != "transfer_to_agent":
+                    responses += 1
+            elif part.text and content.role == "user":
+                return part.text, responses
+    return "", responses
+
+
+def _last_tool_result(contents: List[types.Content], names: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+    """Returns the latest successful result of one of the named tools."""
+    for content in reversed(contents):
+        for part in reversed(content.parts or []):
+            response = part.function_response
+            if response is not None and response.name in names and "error" not in (response.response or {}):
+                return response.response
+    return None
+
+
+def _text(text: str) -> LlmResponse:
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+def _call(name: str, args: Dict[str, Any]) -> LlmResponse:
+    return LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))])
+    )
+
+
+def _has_tool(tools: Dict[str, Any], name: str, args: Dict[str, Any]) -> bool:
+    if name not in tools:
+        return False
+    if name == "transfer_to_agent":
+        # ADK's TransferToAgentTool keeps the names of the agents it can reach.
+        return args["agent_name"] in (getattr(tools[name], "_agent_names", None) or ())
+    return True
+
+
+class ScriptedLlm(BaseLlm):
+    """
+    Fake model for one agent. `model` is "scripted/<agent name>".
+
+    Attributes:
+        latency_seconds: Simulated model latency per call.
+        prompt_tokens_per_part: Tokens reported per request content part, so
+            token metrics are exercised.
+    """
+
+    latency_seconds: float = 0.0
+    prompt_tokens_per_part: int = 50
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"scripted/.*"]
+
+    @property
+    def agent_name(self) -> str:
+        return self.model.split("/", 1)[1]
+
+    def respond(self, llm_request: LlmRequest) -> LlmResponse:
+        text, responses = _last_user_turn(llm_request.contents)
+        tools = llm_request.tools_dict
+        intent = detect_intent(text)
+        target = INTENT_AGENTS.get(intent)
+
+        # A new user message for another agent: hand it over.
+        if responses == 0 and target and target != self.agent_name and "transfer_to_agent" in tools:
+            return _call("transfer_to_agent", {"agent_name": target})
+
+        script = [(name, args) for name, args in AGENT_SCRIPTS.get(self.agent_name, []) if _has_tool(tools, name, args)]
+        if responses < len(script):
+            return _call(*script[responses])
+        structured = _last_tool_result(llm_request.contents, STRUCTURED_REPLY_SOURCES)
+        if "set_model_response" in tools and structured is not None and responses == len(script):
+            return _call("set_model_response", structured)
+        return _text(f"[{self.agent_name}] Done ({responses} tool calls).")
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        response = self.respond(llm_request)
+        parts = sum(len(content.parts or []) for content in llm_request.contents)
+        response.usage_metadata = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=parts * self.prompt_tokens_per_part,
+            candidates_token_count=20,
+        )
+        yield response
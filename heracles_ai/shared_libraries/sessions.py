@@ -0,0 +1,365 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Durable ADK session service that writes state as per-key deltas.
+
+Session, user and app state are stored one row per key, so an event that
+changes `meals` rewrites that key only, not the whole state blob. Events are
+appended as rows. `SessionStore` is the storage interface; `SqliteSessionStore`
+implements it on a local SQLite file in WAL mode (concurrent readers, one
+writer).
+
+Usage:
+    runner = Runner(agent=root_agent, app_name="heracles_ai",
+                    session_service=PersistentSessionService())
+
+Configuration (environment):
+    HERACLES_AI_SESSION_DB: Path of the SQLite file (default heracles_sessions.db).
+"""
+
+import abc
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.errors.session_not_found_error import SessionNotFoundError
+from google.adk.events.event import Event
+from google.adk.sessions import _session_util
+from google.adk.sessions.base_session_service import BaseSessionService, GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.session import Session
+from google.adk.sessions.state import State
+
+SESSION_DB_PATH = os.getenv("HERACLES_AI_SESSION_DB", "heracles_sessions.db")
+
+# State deltas split by scope: {"app": {...}, "user": {...}, "session": {...}}.
+# A None value deletes the key.
+StateDeltas = Dict[str, Dict[str, Any]]
+
+
+class StoredSession:
+    """What a store returns for one session."""
+
+    __slots__ = ("last_update_time", "state", "app_state", "user_state", "events")
+
+    def __init__(self, last_update_time: float, state: Dict[str, Any], app_state: Dict[str, Any],
+                 user_state: Dict[str, Any], events: List[str]):
+        self.last_update_time = last_update_time
+        self.state = state
+        self.app_state = app_state
+        self.user_state = user_state
+        self.events = events  # Event JSON documents, oldest first.
+
+
+class SessionStore(abc.ABC):
+    """Storage backend of PersistentSessionService."""
+
+    @abc.abstractmethod
+    def create_session(self, app_name: str, user_id: str, session_id: str,
+                       deltas: StateDeltas, update_time: float) -> None:
+        """Creates a session; raises AlreadyExistsError if it exists."""
+
+    @abc.abstractmethod
+    def load_session(self, app_name: str, user_id: str, session_id: str,
+                     num_recent_events: Optional[int] = None,
+                     after_timestamp: Optional[float] = None) -> Optional[StoredSession]:
+        """Loads a session with its merged-scope state and (some of) its events."""
+
+    @abc.abstractmethod
+    def list_sessions(self, app_name: str, user_id: Optional[str]) -> List[Tuple[str, str, float]]:
+        """Returns (user id, session id, last update time), oldest first."""
+
+    @abc.abstractmethod
+    def delete_session(self, app_name: str, user_id: str, session_id: str) -> None:
+        """Deletes a session, its state and its events."""
+
+    @abc.abstractmethod
+    def get_user_state(self, app_name: str, user_id: str) -> Dict[str, Any]:
+        """Returns the user-scoped state (keys without the "user:" prefix)."""
+
+    @abc.abstractmethod
+    def append_event(self, app_name: str, user_id: str, session_id: str, event_id: str,
+                     timestamp: float, event_json: str, deltas: StateDeltas) -> None:
+        """Appends an event and applies its state deltas, atomically."""
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    last_update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS session_state (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS user_state (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS app_state (
+    app_name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (app_name, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_session ON events (app_name, user_id, session_id, seq);
+"""
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    SessionStore on a SQLite file in WAL mode.
+
+    Each thread reads through its own connection, so readers never wait on
+    each other or on the writer; writes are serialized by a lock.
+    """
+
+    def __init__(self, path: str = SESSION_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _apply_deltas(self, connection: sqlite3.Connection, app_name: str, user_id: str,
+                      session_id: str, deltas: StateDeltas) -> None:
+        scopes = (
+            ("app_state", ("app_name",), (app_name,), deltas.get("app")),
+            ("user_state", ("app_name", "user_id"), (app_name, user_id), deltas.get("user")),
+            ("session_state", ("app_name", "user_id", "session_id"), (app_name, user_id, session_id), deltas.get("session")),
+        )
+        for table, columns, ids, delta in scopes:
+            if not delta:
+                continue
+            where = " AND ".join(f"{column} = ?" for column in columns)
+            insert = (f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}, key, value) "
+                      f"VALUES ({', '.join('?' * len(columns))}, ?, ?)")
+            for key, value in delta.items():
+                if value is None:
+                    connection.execute(f"DELETE FROM {table} WHERE {where} AND key = ?", (*ids, key))
+                else:
+                    connection.execute(insert, (*ids, key, json.dumps(value)))
+
+    def create_session(self, app_name, user_id, session_id, deltas, update_time):
+        connection = self._connection()
+        with self._write_lock:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "INSERT INTO sessions (app_name, user_id, session_id, last_update_time) VALUES (?, ?, ?, ?)",
+                    (app_name, user_id, session_id, update_time),
+                )
+                self._apply_deltas(connection, app_name, user_id, session_id, deltas)
+            except sqlite3.IntegrityError as e:
+                connection.execute("ROLLBACK")
+                raise AlreadyExistsError(f"Session with id {session_id} already exists.") from e
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    @staticmethod
+    def _rows_to_state(rows) -> Dict[str, Any]:
+        return {key: json.loads(value) for key, value in rows}
+
+    def load_session(self, app_name, user_id, session_id, num_recent_events=None, after_timestamp=None):
+        connection = self._connection()
+        connection.execute("BEGIN")
+        try:
+            row = connection.execute(
+                "SELECT last_update_time FROM sessions WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+            if row is None:
+                return None
+            ids = (app_name, user_id, session_id)
+            state = self._rows_to_state(connection.execute(
+                "SELECT key, value FROM session_state WHERE app_name = ? AND user_id = ? AND session_id = ?", ids))
+            user_state = self._rows_to_state(connection.execute(
+                "SELECT key, value FROM user_state WHERE app_name = ? AND user_id = ?", (app_name, user_id)))
+            app_state = self._rows_to_state(connection.execute(
+                "SELECT key, value FROM app_state WHERE app_name = ?", (app_name,)))
+
+            sql = "SELECT data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+            params: List[Any] = list(ids)
+            if after_timestamp is not None:
+                sql += " AND timestamp >= ?"
+                params.append(after_timestamp)
+            sql += " ORDER BY seq DESC"
+            if num_recent_events is not None:
+                sql += " LIMIT ?"
+                params.append(num_recent_events)
+            events = [data for (data,) in connection.execute(sql, params)]
+            events.reverse()
+        finally:
+            connection.execute("COMMIT")
+        return StoredSession(row[0], state, app_state, user_state, events)
+
+    def list_sessions(self, app_name, user_id):
+        sql = "SELECT user_id, session_id, last_update_time FROM sessions WHERE app_name = ?"
+        params: List[Any] = [app_name]
+        if user_id is not None:
+            sql += " AND user_id = ?"
+            params.append(user_id)
+        rows = self._connection().execute(sql, params).fetchall()
+        return sorted(rows, key=lambda row: (row[2], row[0], row[1]))
+
+    def delete_session(self, app_name, user_id, session_id):
+        connection = self._connection()
+        ids = (app_name, user_id, session_id)
+        with self._write_lock:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                for table in ("sessions", "session_state", "events"):
+                    connection.execute(f"DELETE FROM {table} WHERE app_name = ? AND user_id = ? AND session_id = ?", ids)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def get_user_state(self, app_name, user_id):
+        return self._rows_to_state(self._connection().execute(
+            "SELECT key, value FROM user_state WHERE app_name = ? AND user_id = ?", (app_name, user_id)))
+
+    def append_event(self, app_name, user_id, session_id, event_id, timestamp, event_json, deltas):
+        connection = self._connection()
+        with self._write_lock:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                updated = connection.execute(
+                    "UPDATE sessions SET last_update_time = ? WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                    (timestamp, app_name, user_id, session_id),
+                ).rowcount
+                if not updated:
+                    raise SessionNotFoundError(f"Session {session_id} not found.")
+                connection.execute(
+                    "INSERT INTO events (app_name, user_id, session_id, event_id, timestamp, data) VALUES (?, ?, ?, ?, ?, ?)",
+                    (app_name, user_id, session_id, event_id, timestamp, event_json),
+                )
+                self._apply_deltas(connection, app_name, user_id, session_id, deltas)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+
+def _merge_state(stored: StoredSession) -> Dict[str, Any]:
+    state = dict(stored.state)
+    state.update({State.APP_PREFIX + key: value for key, value in stored.app_state.items()})
+    state.update({State.USER_PREFIX + key: value for key, value in stored.user_state.items()})
+    return state
+
+
+class PersistentSessionService(BaseSessionService):
+    """
+    An ADK session service on a SessionStore (SQLite by default).
+
+    Store calls block on disk I/O (and on the write lock), so they run in a
+    worker thread (`asyncio.to_thread`) and a slow write in one session does
+    not stall the others on the event loop.
+    """
+
+    def __init__(self, store: Optional[SessionStore] = None):
+        self.store = store if store is not None else SqliteSessionStore()
+
+    async def create_session(self, *, app_name: str, user_id: str, state: Optional[Dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> Session:
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        deltas = _session_util.extract_state_delta(state or {})
+        await asyncio.to_thread(self.store.create_session, app_name, user_id, session_id, deltas, time.time())
+        return await self.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    def _load_session(self, app_name: str, user_id: str, session_id: str,
+                      config: Optional[GetSessionConfig]) -> Optional[Session]:
+        stored = self.store.load_session(
+            app_name, user_id, session_id,
+            num_recent_events=config.num_recent_events if config else None,
+            after_timestamp=config.after_timestamp if config else None,
+        )
+        if stored is None:
+            return None
+        return Session(
+            id=session_id,
+            app_name=app_name,
+            user_id=user_id,
+            state=_merge_state(stored),
+            events=[Event.model_validate_json(data) for data in stored.events],
+            last_update_time=stored.last_update_time,
+        )
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                          config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        # Parsing the events is done in the worker thread as well.
+        return await asyncio.to_thread(self._load_session, app_name, user_id, session_id, config)
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        rows = await asyncio.to_thread(self.store.list_sessions, app_name, user_id)
+        return ListSessionsResponse(sessions=[
+            Session(id=session_id, app_name=app_name, user_id=session_user, state={}, events=[],
+                    last_update_time=last_update_time)
+            for session_user, session_id, last_update_time in rows
+        ])
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await asyncio.to_thread(self.store.delete_session, app_name, user_id, session_id)
+
+    async def get_user_state(self, *, app_name: str, user_id: str) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.store.get_user_state, app_name, user_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        event = await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+        state_delta = event.actions.state_delta if event.actions else None
+        await asyncio.to_thread(
+            self.store.append_event,
+            session.app_name, session.user_id, session.id, event.id, event.timestamp,
+            event.model_dump_json(exclude_none=True),
+            _session_util.extract_state_delta(state_delta or {}),
+        )
+        return event
@@ -14,10 +14,15 @@
 
 """Common data schema and types for travel-concierge agents."""
 
-from typing import Optional, Union
+import dataclasses
+from datetime import date
+import math
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Type, TypeVar, Union
 
 from google.genai import types
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+from heracles_ai.shared_libraries import constants
 
 
 # Convenient declaration for controlled generation.
@@ -25,6 +30,9 @@ json_response_config = types.GenerateContentConfig(
     response_mime_type="application/json"
 )
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
 class CaloriesMacros(BaseModel):
     """A calories and macros breakdown."""
     calories: int = Field(description="Total calories")
@@ -36,3 +44,373 @@ class CaloriesMacros(BaseModel):
     sodium: int = Field(description="Total sodium in milligrams")
     cholesterol: int = Field(description="Total cholesterol in milligrams")
     saturated_fat: int = Field(description="Total saturated fat in grams")
+
+
+def _text(value: Any) -> str:
+    return str(value).strip() if value is not None else ""
+
+
+def _token(value: Any) -> str:
+    """Normalizes an enum-like value: "Lightly Active" -> "lightly_active"."""
+    return _text(value).lower().replace(" ", "_").replace("-", "_")
+
+
+def _texts(value: Any) -> Tuple[str, ...]:
+    """Normalizes a string or list field into a tuple of non-empty strings."""
+    if value is None:
+        return ()
+    items = value if isinstance(value, (list, tuple)) else [value]
+    return tuple(text for text in (_text(item) for item in items) if text)
+
+
+def _number(value: Any, kind: type) -> Optional[Union[int, float]]:
+    """Converts a profile number; empty values are None, invalid ones raise ValueError."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"expected a number, got {value!r}")
+    number = float(value)
+    if not math.isfinite(number) or number <= 0:
+        raise ValueError(f"expected a positive number, got {value!r}")
+    if kind is int:
+        if not number.is_integer():
+            raise ValueError(f"expected a whole number, got {value!r}")
+        return int(number)
+    return number
+
+
+def _iso_date(value: Any) -> Optional[str]:
+    text = _text(value)
+    return date.fromisoformat(text).isoformat() if text else None
+
+
+# --- Alias index ---
+# Built once at import: every normalized spelling -> canonical key (and, for
+# goals, its priority rank).
+
+
+def _alias_index(canonical: Iterable[str], aliases: Mapping[str, Iterable[str]]) -> Dict[str, str]:
+    index = {}
+    for key in canonical:
+        index[_token(key)] = key
+        index[_token(key).replace("_", "")] = key
+        for alias in aliases.get(key, ()):
+            index[_token(alias)] = key
+            index[_token(alias).replace("_", "")] = key
+    return index
+
+
+_ACTIVITY_INDEX = _alias_index(constants.ACTIVITY_MULTIPLIERS, constants.ACTIVITY_LEVEL_ALIASES)
+_GOAL_INDEX = {
+    alias: (goal, constants.GOAL_PRIORITY.index(goal))
+    for alias, goal in _alias_index(constants.GOAL_ADJUSTMENTS, constants.GOAL_ALIASES).items()
+}
+for _alias in constants.MAINTENANCE_GOALS:
+    _GOAL_INDEX.setdefault(_token(_alias), ("maintain_weight", len(constants.GOAL_PRIORITY)))
+    _GOAL_INDEX.setdefault(_token(_alias).replace("_", ""), ("maintain_weight", len(constants.GOAL_PRIORITY)))
+del _alias
+
+
+def resolve_activity_level(value: Any) -> Optional[str]:
+    """
+    Returns the ACTIVITY_MULTIPLIERS key for an activity level spelling.
+
+    Args:
+        value: E.g. "moderate", "Moderately Active" or "very-active".
+
+    Returns:
+        The canonical level, or None if the value is unknown.
+    """
+    token = _token(value)
+    return _ACTIVITY_INDEX.get(token) or _ACTIVITY_INDEX.get(token.replace("_", ""))
+
+
+def resolve_goal(goals: Any) -> Optional[str]:
+    """
+    Returns the GOAL_ADJUSTMENTS key for one goal or a list of goals.
+
+    Among several recognized goals the one earliest in GOAL_PRIORITY wins, so
+    ["improve_cardio", "lose_weight"] resolves to "lose_weight".
+
+    Args:
+        goals: A goal string or a list of goal strings.
+
+    Returns:
+        The canonical goal, or None if no goal is recognized.
+    """
+    best = None
+    for goal in _texts(goals):
+        token = _token(goal)
+        match = _GOAL_INDEX.get(token) or _GOAL_INDEX.get(token.replace("_", ""))
+        if match is not None and (best is None or match[1] < best[1]):
+            best = match
+    return best[0] if best is not None else None
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class UserProfile:
+    """
+    The user profile, normalized and validated.
+
+    `parse` converts the raw `user_profile` state dict (free-form strings and
+    lists written by the model or loaded from a scenario). Invalid values are
+    left as None and reported in `errors`; missing values are None or empty.
+    """
+
+    name_surname: str = ""
+    age: Optional[int] = None
+    sex: Optional[str] = None
+    height_cm: Optional[float] = None
+    weight_kg: Optional[float] = None
+    activity_level: Optional[str] = None
+    fitness_level: Optional[str] = None
+    fitness_goals: Tuple[str, ...] = ()
+    dietary_preferences: Tuple[str, ...] = ()
+    fitness_preferences: Tuple[str, ...] = ()
+    food_allergies: Tuple[str, ...] = ()
+    health_conditions: Tuple[str, ...] = ()
+    equipment_available: Tuple[str, ...] = ()
+    preferred_workout_times: Tuple[str, ...] = ()
+    program_start_date: Optional[str] = None
+    program_end_date: Optional[str] = None
+    errors: Tuple[Tuple[str, str], ...] = ()  # (field, message) pairs.
+
+    @classmethod
+    def parse(cls, raw: Mapping[str, Any]) -> "UserProfile":
+        """
+        Builds a profile from the raw `user_profile` state dict.
+
+        Args:
+            raw: The user profile as stored in the session state.
+
+        Returns:
+            The normalized profile.
+        """
+        values: Dict[str, Any] = {}
+        errors = []
+
+        def convert(field: str, converter, *args) -> None:
+            try:
+                values[field] = converter(raw.get(field), *args)
+            except (TypeError, ValueError) as e:
+                errors.append((field, str(e)))
+
+        convert("age", _number, int)
+        convert("height_cm", _number, float)
+        convert("weight_kg", _number, float)
+        convert("program_start_date", _iso_date)
+        convert("program_end_date", _iso_date)
+
+        # Older profiles and scenarios use "gender".
+        sex = _token(raw.get("sex") or raw.get("gender")) or None
+        if sex is not None and sex not in ("male", "female"):
+            errors.append(("sex", f"must be 'male' or 'female', got {sex!r}"))
+            sex = None
+
+        activity_level = None
+        if _text(raw.get("activity_level")):
+            activity_level = resolve_activity_level(raw.get("activity_level"))
+            if activity_level is None:
+                errors.append(("activity_level", f"must be one of {list(constants.ACTIVITY_MULTIPLIERS)}, "
+                                                 f"got {raw.get('activity_level')!r}"))
+
+        return cls(
+            name_surname=_text(raw.get("name_surname")),
+            sex=sex,
+            activity_level=activity_level,
+            fitness_level=_token(raw.get("fitness_level")) or None,
+            fitness_goals=tuple(_token(goal) for goal in _texts(raw.get("fitness_goals"))),
+            dietary_preferences=_texts(raw.get("dietary_preferences")),
+            fitness_preferences=_texts(raw.get("fitness_preferences")),
+            food_allergies=_texts(raw.get("food_allergies")),
+            health_conditions=_texts(raw.get("health_conditions")),
+            equipment_available=_texts(raw.get("equipment_available")),
+            preferred_workout_times=_texts(raw.get("preferred_workout_times")),
+            errors=tuple(errors),
+            **values,
+        )
+
+    @property
+    def primary_goal(self) -> Optional[str]:
+        """The goal that sets the calorie adjustment (see `resolve_goal`), if any."""
+        return resolve_goal(self.fitness_goals)
+
+    def cmc_inputs(self) -> Dict[str, Any]:
+        """Returns the inputs of the calorie and macro calculation (cmc.PROFILE_FIELDS)."""
+        return {
+            "age": self.age,
+            "sex": self.sex,
+            "height_cm": self.height_cm,
+            "weight_kg": self.weight_kg,
+            "activity_level": self.activity_level,
+            "fitness_goals": self.primary_goal or (self.fitness_goals[0] if self.fitness_goals else None),
+        }
+
+
+def load_user_profile(state: Mapping[str, Any]) -> Optional[UserProfile]:
+    """
+    Returns the parsed user profile.
+
+    The profile is parsed on every call: it is a few dozen small fields, and
+    it can be written without the memory tools (a scenario, an AgentTool
+    state delta, a direct state edit), so a parse stored in the state would
+    have to be checked against the raw profile at about the cost of parsing.
+
+    Args:
+        state: The session state.
+
+    Returns:
+        The parsed profile, or None if the state has no profile.
+    """
+    raw = state.get(constants.PROFILE_KEY)
+    if not isinstance(raw, Mapping) or not raw:
+        return None
+    return UserProfile.parse(raw)
+
+
+# --- Plans and logs ---
+# Controlled-generation schemas (agents' `output_schema`, typed tool
+# arguments). The shapes match the plans of workout_plan_tool and
+# meal_plan_tool and the records of the workout and meal logs; values are
+# stored in state as `model_dump(exclude_none=True)`.
+
+
+class Macros(BaseModel):
+    """Macronutrients in grams."""
+    protein: Optional[float] = Field(default=None, description="Protein in grams")
+    carbs: Optional[float] = Field(default=None, description="Carbohydrates in grams")
+    fat: Optional[float] = Field(default=None, description="Fat in grams")
+
+
+class PlannedMeal(BaseModel):
+    """A meal of a diet plan."""
+    name: str = Field(description="Meal name, e.g. Breakfast")
+    time: Optional[str] = Field(default=None, description="Time of day, e.g. 08:00")
+    description: Optional[str] = Field(default=None, description="What to eat")
+    servings: Optional[float] = Field(default=None, description="Number of servings")
+    serving_size: Optional[str] = Field(default=None, description="Size of one serving, e.g. 100 g")
+    calories: float = Field(description="Calories of the meal")
+    macros: Optional[Macros] = Field(default=None, description="Macronutrients of the meal")
+
+
+class DietDay(BaseModel):
+    """The meals of one day of a multi-day diet plan."""
+    day: int = Field(description="Day number, starting at 1")
+    meals: List[PlannedMeal] = Field(description="Meals of the day, in order")
+
+
+class Supplement(BaseModel):
+    """A supplement of a diet plan."""
+    name: str = Field(description="Supplement name, e.g. Omega-3")
+    time: Optional[str] = Field(default=None, description="Time of day, e.g. 08:00")
+    dosage: Optional[str] = Field(default=None, description="Amount per dose, e.g. 1 capsule")
+
+
+class DietPlan(BaseModel):
+    """A nutrition plan: the meals of a day, or of several days."""
+    name: Optional[str] = Field(default=None, description="Plan name")
+    description: Optional[str] = Field(default=None, description="Short description of the plan")
+    daily_calories: float = Field(description="Daily calorie target")
+    meals: List[PlannedMeal] = Field(default_factory=list, description="Meals of a one-day plan")
+    days: List[DietDay] = Field(default_factory=list, description="Meals per day of a multi-day plan")
+    supplements: List[Supplement] = Field(default_factory=list, description="Supplements to take, if any")
+    notes: Optional[str] = Field(default=None, description="Advice and caveats")
+
+
+class Exercise(BaseModel):
+    """An exercise of a workout: strength (sets and reps) or cardio (duration)."""
+    name: str = Field(description="Exercise name, or Rest")
+    sets: Optional[int] = Field(default=None, description="Number of sets")
+    reps: Optional[Union[int, str]] = Field(default=None, description="Repetitions per set, e.g. 12 or 8-10")
+    weight_kg: Optional[float] = Field(default=None, description="Load in kilograms")
+    duration_minutes: Optional[float] = Field(default=None, description="Duration in minutes")
+    intensity: Optional[str] = Field(default=None, description="e.g. light, moderate, high")
+    focus: Optional[str] = Field(default=None, description="Muscle group, e.g. legs")
+
+
+class WorkoutDay(BaseModel):
+    """The workout of one day of the week."""
+    day: str = Field(description="Day of the week, e.g. Monday")
+    time: Optional[str] = Field(default=None, description="Preferred time of day")
+    exercises: List[Exercise] = Field(description="Exercises, in order")
+
+
+class WeekProgression(BaseModel):
+    """How one week of the program changes the base week."""
+    week: int = Field(description="Week number, starting at 1")
+    phase: Optional[str] = Field(default=None, description="Training phase, e.g. foundation or deload")
+    extra_sets: Optional[int] = Field(default=None, description="Sets added to each strength exercise")
+    reps: Optional[Union[int, str]] = Field(default=None, description="Repetitions per set")
+    cardio_factor: Optional[float] = Field(default=None, description="Multiplier of the cardio durations")
+    intensity: Optional[str] = Field(default=None, description="Cardio intensity")
+
+
+class FitnessPlan(BaseModel):
+    """A training program: a base week and its weekly progression."""
+    name: Optional[str] = Field(default=None, description="Plan name")
+    description: Optional[str] = Field(default=None, description="Short description of the plan")
+    duration_weeks: Optional[int] = Field(default=None, description="Program length in weeks")
+    workouts_per_week: Optional[int] = Field(default=None, description="Training days per week")
+    daily_workouts: List[WorkoutDay] = Field(description="Workouts of the base week")
+    weekly_progression: List[WeekProgression] = Field(default_factory=list, description="Changes per week")
+
+
+class WorkoutSession(BaseModel):
+    """A logged workout (an entry of `workout_sessions`)."""
+    date: str = Field(description="ISO date of the workout (YYYY-MM-DD)")
+    type: str = Field(description="Workout type, e.g. Running or Strength Training")
+    duration_minutes: Optional[float] = Field(default=None, description="Duration in minutes")
+    intensity: Optional[str] = Field(default=None, description="e.g. light, moderate, high")
+    calories_burned: Optional[float] = Field(default=None, description="Calories burned")
+    focus: Optional[str] = Field(default=None, description="Muscle group of a strength workout")
+    sets: Optional[int] = Field(default=None, description="Sets of a strength workout")
+    reps: Optional[int] = Field(default=None, description="Repetitions per set")
+    weight_kg: Optional[float] = Field(default=None, description="Load in kilograms")
+    notes: Optional[str] = Field(default=None, description="How it went")
+
+    @field_validator("date", mode="before")
+    @classmethod
+    def _check_date(cls, value: Any) -> Optional[str]:
+        return _iso_date(value)
+
+
+class MealLog(BaseModel):
+    """A logged meal (an entry of `meals`)."""
+    date: str = Field(description="ISO date of the meal (YYYY-MM-DD)")
+    name: str = Field(description="Meal name, e.g. Breakfast")
+    time: Optional[str] = Field(default=None, description="Time of day, e.g. 08:00")
+    description: Optional[str] = Field(default=None, description="What was eaten")
+    calories: float = Field(description="Calories eaten")
+    macros: Optional[Macros] = Field(default=None, description="Macronutrients eaten")
+
+    @field_validator("date", mode="before")
+    @classmethod
+    def _check_date(cls, value: Any) -> Optional[str]:
+        return _iso_date(value)
+
+
+def parse_structured(schema: Type[ModelT], value: Any) -> ModelT:
+    """
+    Validates a plan or log entry from state, a tool argument or model output.
+
+    Args:
+        schema: The schema (e.g. FitnessPlan).
+        value: A model instance, a dict, or JSON text (parsed by pydantic-core
+            without an intermediate dict).
+
+    Returns:
+        The validated object.
+
+    Raises:
+        pydantic.ValidationError: If the value does not match the schema.
+    """
+    if isinstance(value, schema):
+        return value
+    if isinstance(value, (str, bytes)):
+        return schema.model_validate_json(value)
+    return schema.model_validate(value)
+
+
+def validation_errors(error: ValidationError) -> Dict[str, str]:
+    """Returns the errors of a ValidationError as {field path: message}."""
+    return {".".join(str(part) for part in item["loc"]) or "value": item["msg"] for item in error.errors()}
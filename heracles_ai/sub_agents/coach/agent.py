@@ -22,20 +22,24 @@ from . import prompt
 from heracles_ai.tools.memory import memorize  # Only import the specific tool needed
 # Import necessary tools
 from heracles_ai.tools.fitness import fitness_tool
+from heracles_ai.tools.workout_planner import workout_plan_tool
 
 from google.adk.agents import Agent
+from heracles_ai.shared_libraries.instructions import instruction_provider
+from heracles_ai.shared_libraries.models import get_model
 
 
 coach_agent = Agent(
-    model="gemini-2.0-flash-001",
+    model=get_model("coach_agent"),
     name="coach_agent",
     description="Coach agent for Heracles.AI, responsible for providing personalized coaching and feedback.",
-    instruction=prompt.COACH_AGENT_INSTR,
+    instruction=instruction_provider("coach_agent", prompt.COACH_AGENT_INSTR),
     sub_agents=[
         # Add any sub-agents if needed
     ],
     tools=[
         memorize,  # Register the memorize tool
         fitness_tool,  # Use actual fitness_tool
+        workout_plan_tool,  # Deterministic fitness plan from the profile
     ],
 )
\ No newline at end of file
@@ -34,7 +34,8 @@ COACH_AGENT_INSTR = """
     </user_profile>
 
 **3. Available Tools:**
-  - `fitness` tool: Use this tool to find suitable exercises based on goals, fitness level, and available equipment (e.g., `query="beginner dumbbell chest exercises"`).
+  - `workout_plan_tool`: Generates the complete fitness plan from the user profile (goals, activity level, equipment, preferred workout times). Pass `duration_weeks` if the user asked for a specific program length, otherwise `0` to use the program dates.
+  - `fitness` tool: Use this tool to find suitable exercises based on goals, fitness level, and available equipment (e.g., `query="beginner dumbbell chest exercises"`), for example when the user asks to swap an exercise.
 
 **4. Interaction Flow:**
 
@@ -62,35 +63,30 @@ COACH_AGENT_INSTR = """
                   
    *   **Step 2: Generate and Present Fitness Plan**
         - Tell the user you will now create a personalized fitness plan based on their data, and ask for their confirmation to proceed.
-        - Upon user confirmation, use the provided data and the user's goals.
-        - Utilize the `fitness` tool to get exercise ideas relevant to the plan segments (e.g., specific muscle groups, workout types).
-        - Generate a fitness plan, ideally in JSON format. Include details like workout days, activities, specific exercises (with sets/reps from `fitness` tool or standard recommendations), duration, and notes.
-        - Present the plan to the user.
+        - Upon user confirmation, call the `workout_plan_tool`.
+        - Present the returned plan as is; do not rewrite its exercises, sets or reps. Briefly explain the weekly split and the `weekly_progression` (foundation, build, peak and deload weeks) in a few sentences.
+        - Only use the `fitness` tool if the user asks to replace an exercise.
         - Output format (Fitness Plan):
           ` Here is your personalized fitness plan:`
         <JSON_EXAMPLE>
           {{
-            "weekly_fitness_plan": {{
-              "monday": {{
-                "activity": "Strength Training - Upper Body",
+            "name": "12-Week Fat Loss Plan", // From workout_plan_tool
+            "duration_weeks": 12,
+            "workouts_per_week": 4,
+            "daily_workouts": [
+              {{
+                "day": "Monday",
+                "time": "morning",
                 "exercises": [
-                  {{"name": "Dumbbell Bench Press", "sets": 3, "reps": "8-12"}}, // Example from fitness tool
-                  {{"name": "Bent-Over Rows", "sets": 3, "reps": "10-15"}},
-                  {{"name": "Push-ups", "sets": 3, "reps": "AMRAP"}} // As Many Reps As Possible
+                  {{"name": "Back Squat", "sets": 3, "reps": 12, "focus": "legs"}},
+                  {{"name": "Running", "duration_minutes": 20, "intensity": "moderate"}}
                   // ... more exercises
-                ],
-                "duration_minutes": 60,
-                "notes": "Focus on proper form. Rest 60-90 seconds between sets."
+                ]
               }},
-              "tuesday": {{
-                "activity": "Cardio",
-                "type": "Running", // Or based on user preference/goal
-                "duration_minutes": 30,
-                "intensity": "Moderate"
-              }},
-              "wednesday": {{"activity": "Rest"}},
-              // ... more days (e.g., Lower Body, Full Body, Active Recovery)
-            }},
+              {{"day": "Wednesday", "exercises": [{{"name": "Rest", "duration_minutes": 0, "intensity": "none"}}]}}
+              // ... more days
+            ],
+            "weekly_progression": [{{"week": 1, "phase": "foundation", "extra_sets": 0, "reps": 12, "cardio_factor": 1.0, "intensity": "moderate"}}],
             "general_recommendations": "Remember to warm up for 5-10 minutes before each session and cool down with stretching afterwards. Stay hydrated and listen to your body. Adjust weights/intensity as needed."
           }}
         </JSON_EXAMPLE>
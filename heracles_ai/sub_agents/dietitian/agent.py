@@ -16,29 +16,52 @@
 # pylint: disable=line-too-long
 """Coach Agent definition for Heracles.AI."""
 
+import os
 
 # Import the prompt for this agent
 from . import prompt
 from heracles_ai.tools.memory import memorize  # Only import the specific tool needed
 # Import necessary tools
 from heracles_ai.tools.nutrition import nutrition_tool
-from heracles_ai.tools.cmc import calories_macro_calculator_tool
+from heracles_ai.tools.cmc import calories_macro_calculator_tool, calculate_and_store_cmc_tool
+from heracles_ai.tools.meal_planner import meal_plan_tool
 from google.adk.tools.agent_tool import AgentTool
-from heracles_ai.shared_libraries import types
+from heracles_ai.shared_libraries import constants, types
 
 
 from google.adk.agents import Agent
+from heracles_ai.shared_libraries.instructions import instruction_provider
+from heracles_ai.shared_libraries.models import get_model
 
+# How the dietitian calculates calorie/macro needs, selectable per deployment:
+# "agent" delegates to the nutiritions_calculator_agent (AgentTool), "tool"
+# calls the calculator as a plain function tool that writes the `cmc` state
+# key directly, saving the sub-agent's model round trips.
+CMC_MODE = os.getenv("HERACLES_AI_CMC_MODE", "agent").strip().lower()
+if CMC_MODE not in ("agent", "tool"):
+    raise ValueError(f"HERACLES_AI_CMC_MODE must be 'agent' or 'tool', got '{CMC_MODE}'")
+
+DIETITIAN_INSTR = prompt.DIETITIAN_AGENT_DIRECT_CMC_INSTR if CMC_MODE == "tool" else prompt.DIETITIAN_AGENT_INSTR
+
+# The dietitian's tools in the "tool" CMC mode. The parallel planning branch
+# always uses them: it runs unattended, and the nutiritions_calculator_agent
+# asks the user to confirm its results.
+DIRECT_CMC_TOOLS = [
+    calculate_and_store_cmc_tool,
+    memorize,  # Register the memorize tool
+    nutrition_tool,  # Use actual fitness_tool
+    meal_plan_tool,  # Deterministic meal plan for the cmc targets
+]
 
 nutiritions_calculator_agent = Agent(
-    model="gemini-2.0-flash-001",
+    model=get_model("nutiritions_calculator_agent"),
     name="nutiritions_calculator_agent",
     description="CMC agent for Heracles.AI, responsible for calculating calories and macros.",
-    instruction=prompt.CMC_AGENT_INSTR,
+    instruction=instruction_provider("nutiritions_calculator_agent", prompt.CMC_AGENT_INSTR),
     #output_schema= types.CaloriesMacros,
     disallow_transfer_to_parent=True,
     disallow_transfer_to_peers=True,
-    output_key= "cmc",
+    output_key=constants.CMC_KEY,
     tools=[
         memorize,  # Register the memorize tool
         calories_macro_calculator_tool,  # Add the calorie calculation tool
@@ -46,14 +69,13 @@ nutiritions_calculator_agent = Agent(
 )
 
 dietitian_agent = Agent(
-    model="gemini-2.0-flash-001",
+    model=get_model("dietitian_agent"),
     name="dietitian_agent",
     description="Dietitian agent for Heracles.AI, responsible for providing personalized nutrition plans and feedback.",
-    instruction=prompt.DIETITIAN_AGENT_INSTR,
+    instruction=instruction_provider("dietitian_agent", DIETITIAN_INSTR),
 
-    tools=[
+    tools=DIRECT_CMC_TOOLS if CMC_MODE == "tool" else [
         AgentTool(agent=nutiritions_calculator_agent),
-        memorize,  # Register the memorize tool
-        nutrition_tool,  # Use actual fitness_tool
+        *DIRECT_CMC_TOOLS[1:],
     ],
 )
\ No newline at end of file
@@ -18,14 +18,17 @@
 from google.adk.agents import Agent
 
 # Assuming memory tool is needed for accessing user plans/history/monitoring results
+from heracles_ai.tools.analytics import progress_analytics_tool
 from heracles_ai.tools.memory import memorize
 from . import prompt
+from heracles_ai.shared_libraries.instructions import instruction_provider
+from heracles_ai.shared_libraries.models import get_model
 
 feedback_agent = Agent(
     # Use a model compatible with the live API
-    model="gemini-2.0-flash-001",
+    model=get_model("feedback_agent"),
     name="feedback_agent",
     description="Analyzes user progress and adherence, providing overall feedback.",
-    instruction=prompt.FEEDBACK_AGENT_INSTR,
-    tools=[memorize],  # Add memory tool to access plans, history, and monitoring data
+    instruction=instruction_provider("feedback_agent", prompt.FEEDBACK_AGENT_INSTR),
+    tools=[memorize, progress_analytics_tool],  # Add memory tool to access plans, history, and monitoring data
 )
\ No newline at end of file
@@ -18,14 +18,17 @@
 from google.adk.agents import Agent
 
 # Assuming memory tool is needed for accessing user plans/history
-from heracles_ai.tools.memory import memorize
+from heracles_ai.tools.analytics import progress_analytics_tool
+from heracles_ai.tools.memory import log_meal, log_workout_session, memorize
 from . import prompt
+from heracles_ai.shared_libraries.instructions import instruction_provider
+from heracles_ai.shared_libraries.models import get_model
 
 monitoring_agent = Agent(
     # Use a model compatible with the live API
-    model="gemini-2.0-flash-001",
+    model=get_model("monitoring_agent"),
     name="monitoring_agent",
     description="Monitors user adherence to fitness and diet plans by asking questions.",
-    instruction=prompt.MONITORING_AGENT_INSTR,
-    tools=[memorize],  # Add memory tool to access plans and history
+    instruction=instruction_provider("monitoring_agent", prompt.MONITORING_AGENT_INSTR),
+    tools=[memorize, log_workout_session, log_meal, progress_analytics_tool],  # Add memory tool to access plans and history
 )
\ No newline at end of file
@@ -18,19 +18,22 @@
 """Onboarding Agent definition."""
 
 from google.adk.agents import Agent
-from heracles_ai.tools.memory import memorize, memorize_list, forget
+from heracles_ai.tools.memory import memorize, memorize_list, memorize_many, memorize_profile, forget
 
 from . import prompt
+from heracles_ai.shared_libraries.models import get_model
 
 
 onboarding_agent = Agent(
-    model="gemini-2.0-flash-001",
+    model=get_model("onboarding_agent"),
     name="onboarding_agent",
     description="Onboarding agent for Heracles.AI, responsible for gathering user information, goals and preferences.",
     instruction=prompt.ONBOARDING_AGENT_INSTR,
     tools=[
+        memorize_profile,  # Register the memorize_profile tool
         memorize,  # Register the memorize tool
         memorize_list,  # Register the memorize_list tool
+        memorize_many,  # Register the memorize_many tool
         forget,  # Register the forget tool
     ],
 )
@@ -16,6 +16,8 @@
 # pylint: disable=line-too-long
 """Planning Agent definition for Heracles.AI."""
 
+import os
+
 # Import the Agent class
 from google.adk.agents import Agent
 from google.adk.tools.agent_tool import AgentTool
@@ -27,19 +29,52 @@ from . import prompt
 from heracles_ai.tools.memory import memorize  # Only import the specific tool needed
 from heracles_ai.sub_agents.coach.agent import coach_agent  # Import the actual fitness tool
 # from heracles_ai.sub_agents.dietitian.agent import dietitian_age  # Import the actual nutrition tool
-from heracles_ai.sub_agents.dietitian.agent import dietitian_agent  # Import the actual nutrition tool
+from heracles_ai.sub_agents.dietitian.agent import DIRECT_CMC_TOOLS, dietitian_agent  # Import the actual nutrition tool
+from heracles_ai.sub_agents.dietitian import prompt as dietitian_prompt
+from heracles_ai.sub_agents.coach import prompt as coach_prompt
+from heracles_ai.sub_agents.planning.merge import build_plan_builder_agent
+from heracles_ai.shared_libraries.instructions import instruction_provider
+from heracles_ai.shared_libraries.models import get_model
 # TODO(b/336705178): Import actual tool instances once created
 # from heracles_ai.tools.conversion import metric_conversion_tool
 
 
-planning_agent = Agent(
-    model="gemini-2.0-flash-001",
-    name="planning_agent",
-    description="Planning agent for Heracles.AI, responsible for creating personalized fitness and nutrition plans.",
-    instruction=prompt.PLANNING_AGENT_INSTR,
-    tools=[
+# How the plans are created, selectable per deployment: "sequential" has the
+# planning agent consult the dietitian, then the coach; "parallel" transfers
+# to plan_builder_agent, which runs both at the same time, streams the plan
+# chunks as they are produced and merges the plans.
+PLANNING_MODE = os.getenv("HERACLES_AI_PLANNING_MODE", "sequential").strip().lower()
+if PLANNING_MODE not in ("sequential", "parallel"):
+    raise ValueError(f"HERACLES_AI_PLANNING_MODE must be 'sequential' or 'parallel', got '{PLANNING_MODE}'")
+
+if PLANNING_MODE == "parallel":
+    plan_builder_agent = build_plan_builder_agent(
+        dietitian_agent,
+        coach_agent,
+        # The branch calls the calculator directly whatever the CMC mode:
+        # nobody can answer the calculator agent's confirmation request.
+        dietitian_prompt.DIETITIAN_AGENT_DIRECT_CMC_INSTR + prompt.PLAN_BRANCH_INSTR,
+        coach_prompt.COACH_AGENT_INSTR + prompt.PLAN_BRANCH_INSTR,
+        dietitian_tools=DIRECT_CMC_TOOLS,
+    )
+    planning_tools = [memorize]
+    planning_sub_agents = [plan_builder_agent]
+else:
+    planning_sub_agents = []
+    planning_tools = [
         memorize,  # Register the memorize tool
         AgentTool(agent=coach_agent),
         AgentTool(agent=dietitian_agent),
-    ],
-)
\ No newline at end of file
+    ]
+
+planning_agent = Agent(
+    model=get_model("planning_agent"),
+    name="planning_agent",
+    description="Planning agent for Heracles.AI, responsible for creating personalized fitness and nutrition plans.",
+    instruction=instruction_provider(
+        "planning_agent",
+        prompt.PLANNING_AGENT_PARALLEL_INSTR if PLANNING_MODE == "parallel" else prompt.PLANNING_AGENT_INSTR,
+    ),
+    sub_agents=planning_sub_agents,
+    tools=planning_tools,
+)
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# pylint: disable=line-too-long
+"""Parallel plan generation for the planning agent.
+
+Once the profile is complete, the nutrition and fitness plans are
+independent. `build_plan_builder_agent` returns a workflow that runs the
+dietitian and coach concurrently (a ParallelAgent, one branch each, each
+streaming its plan chunks; see stream.py) and then `PlanMergeAgent`, which
+combines the two plans without a model call and presents the combined plan
+to the user, so the turn ends on the plan rather than on its JSON.
+"""
+
+import json
+import re
+from typing import Any, AsyncGenerator, Dict, List, Optional, Type
+
+from google.adk.agents import BaseAgent, ParallelAgent, SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+from pydantic import BaseModel, ValidationError
+
+from heracles_ai.shared_libraries import constants
+from heracles_ai.shared_libraries.types import DietPlan, FitnessPlan, parse_structured, validation_errors
+from heracles_ai.shared_libraries.instructions import instruction_provider
+from heracles_ai.shared_libraries.log import get_logger
+from heracles_ai.sub_agents.planning.stream import PlanStreamAgent
+
+logger = get_logger("planning")
+
+# Markdown code fence around a JSON reply.
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+OVERALL_GUIDANCE = (
+    "This integrated plan combines your nutritional needs with a structured fitness routine to help you "
+    "achieve your goals. Consistency and adherence are key. Remember to consult with healthcare "
+    "professionals for personalized advice."
+)
+
+PLAN_INTRO = "Here is your comprehensive nutrition and fitness plan:"
+PLAN_QUESTIONS = "Do you have any questions about the plan?"
+
+
+def parse_plan(value: Any) -> Any:
+    """
+    Returns a plan written by a branch agent as a dict, if it is JSON.
+
+    Branch agents with an output schema store their reply parsed; a text
+    reply holding a JSON object, optionally in a code fence or surrounded by
+    prose, is parsed here; anything else is returned unchanged.
+    """
+    if not isinstance(value, str):
+        return value
+    text = _FENCE.sub("", value.strip())
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        return value
+    try:
+        return json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return value
+
+
+def merge_plans(diet_plan: Any, fitness_plan: Any) -> Dict[str, Any]:
+    """Returns the combined plan, in the shape the planning agent presents."""
+    return {
+        "nutrition_plan": diet_plan,
+        "fitness_plan": fitness_plan,
+        "overall_guidance": OVERALL_GUIDANCE,
+    }
+
+
+def _number(value: Any) -> Any:
+    """Returns a float with an integral value as an int (2000.0 -> 2000)."""
+    return int(value) if isinstance(value, float) and value.is_integer() else value
+
+
+def _meal_line(meal: Dict[str, Any]) -> str:
+    line = f"- {meal.get('name')}"
+    if meal.get("time"):
+        line += f" ({meal['time']})"
+    line += f": {_number(meal.get('calories'))} kcal"
+    if meal.get("description"):
+        line += f", {meal['description']}"
+    return line
+
+
+def _exercise_text(exercise: Dict[str, Any]) -> str:
+    text = str(exercise.get("name"))
+    if exercise.get("sets") and exercise.get("reps"):
+        text += f" {exercise['sets']}x{exercise['reps']}"
+    if exercise.get("weight_kg"):
+        text += f" @ {_number(exercise['weight_kg'])} kg"
+    if exercise.get("duration_minutes"):
+        text += f" {_number(exercise['duration_minutes'])} min"
+    if exercise.get("intensity"):
+        text += f" ({exercise['intensity']})"
+    return text
+
+
+def _plan_heading(title: str, plan: Dict[str, Any]) -> List[str]:
+    lines = [f"**{title}**" + (f": {plan['name']}" if plan.get("name") else "")]
+    if plan.get("description"):
+        lines.append(plan["description"])
+    return lines
+
+
+def _nutrition_lines(plan: Any) -> List[str]:
+    if not isinstance(plan, dict):
+        return ["**Nutrition plan**", str(plan)]
+    lines = _plan_heading("Nutrition plan", plan)
+    if plan.get("daily_calories") is not None:
+        lines.append(f"Daily calories: {_number(plan['daily_calories'])} kcal")
+    lines.extend(_meal_line(meal) for meal in plan.get("meals") or [] if isinstance(meal, dict))
+    for day in plan.get("days") or []:
+        if isinstance(day, dict):
+            lines.append(f"Day {day.get('day')}:")
+            lines.extend("  " + _meal_line(meal) for meal in day.get("meals") or [] if isinstance(meal, dict))
+    for supplement in plan.get("supplements") or []:
+        if isinstance(supplement, dict):
+            details = ", ".join(str(supplement[key]) for key in ("dosage", "time") if supplement.get(key))
+            lines.append(f"- Supplement: {supplement.get('name')}" + (f" ({details})" if details else ""))
+    if plan.get("notes"):
+        lines.append(plan["notes"])
+    return lines
+
+
+def _fitness_lines(plan: Any) -> List[str]:
+    if not isinstance(plan, dict):
+        return ["**Fitness plan**", str(plan)]
+    lines = _plan_heading("Fitness plan", plan)
+    details = [f"{plan[key]} {label}" for key, label in (("workouts_per_week", "workouts per week"), ("duration_weeks", "weeks"))
+               if plan.get(key)]
+    if details:
+        lines.append(", ".join(details))
+    for day in plan.get("daily_workouts") or []:
+        if isinstance(day, dict):
+            exercises = ", ".join(_exercise_text(exercise) for exercise in day.get("exercises") or [] if isinstance(exercise, dict))
+            lines.append(f"- {day.get('day')}" + (f" ({day['time']})" if day.get("time") else "") + f": {exercises}")
+    for week in plan.get("weekly_progression") or []:
+        if isinstance(week, dict):
+            changes = ", ".join(f"{key.replace('_', ' ')} {_number(value)}" for key, value in week.items()
+                                if key != "week" and value is not None)
+            lines.append(f"- Week {week.get('week')}" + (f": {changes}" if changes else ""))
+    return lines
+
+
+def format_plan(combined: Dict[str, Any]) -> str:
+    """Returns the combined plan as the message presenting it to the user."""
+    sections = [
+        [PLAN_INTRO],
+        _nutrition_lines(combined.get("nutrition_plan")),
+        _fitness_lines(combined.get("fitness_plan")),
+        [combined.get("overall_guidance") or OVERALL_GUIDANCE],
+        [PLAN_QUESTIONS],
+    ]
+    return "\n\n".join("\n".join(lines) for lines in sections)
+
+
+def _branch_plan(state: Any, key: str, schema: Type[BaseModel]) -> Any:
+    """Returns a branch's plan: its JSON reply, else the draft of its streamed chunks, else its reply text."""
+    plan = parse_plan(state.get(key))
+    if isinstance(plan, dict):
+        try:
+            # Only the fields the branch wrote: no empty defaults next to them.
+            return parse_structured(schema, plan).model_dump(exclude_unset=True, exclude_none=True)
+        except ValidationError as error:
+            # Kept as is: a plan off the schema is still better than none.
+            logger.warning("%s does not match %s: %s", key, schema.__name__, validation_errors(error))
+            return plan
+    return state.get(constants.PLAN_DRAFT_PREFIX + key) or plan
+
+
+class PlanMergeAgent(BaseAgent):
+    """
+    Combines the `diet_plan` and `fitness_plan` written by the parallel
+    branches, and presents the combined plan (stored as JSON in
+    `combined_plan`) to the user.
+    """
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        diet_plan = _branch_plan(state, constants.DIET_PLAN_KEY, DietPlan)
+        fitness_plan = _branch_plan(state, constants.FITNESS_PLAN_KEY, FitnessPlan)
+        missing = [key for key, plan in ((constants.DIET_PLAN_KEY, diet_plan), (constants.FITNESS_PLAN_KEY, fitness_plan))
+                   if plan in (None, "")]
+        if missing:
+            logger.warning("Parallel planning finished without %s", ", ".join(missing))
+            text = f"Sorry, I could not finish creating your plan ({', '.join(missing)} missing). Please ask me to try again."
+            state_delta: Optional[Dict[str, Any]] = None
+        else:
+            combined = merge_plans(diet_plan, fitness_plan)
+            text = format_plan(combined)
+            state_delta = {
+                constants.DIET_PLAN_KEY: diet_plan,
+                constants.FITNESS_PLAN_KEY: fitness_plan,
+                constants.COMBINED_PLAN_KEY: combined,
+                # The drafts are superseded by the complete plans.
+                constants.PLAN_DRAFT_PREFIX + constants.DIET_PLAN_KEY: None,
+                constants.PLAN_DRAFT_PREFIX + constants.FITNESS_PLAN_KEY: None,
+            }
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=EventActions(state_delta=state_delta or {}),
+        )
+
+
+def _branch(agent: BaseAgent, output_key: str, schema: Type[BaseModel], template: str,
+            tools: Optional[List[Any]] = None) -> BaseAgent:
+    """Copies a specialist agent to run unattended in a parallel branch, streaming its plan."""
+    update = {
+        "instruction": instruction_provider(agent.name, template),
+        # Controlled generation: the final reply is a plan of this schema,
+        # stored parsed under the output key.
+        "output_schema": schema,
+        "output_key": output_key,
+        "disallow_transfer_to_parent": True,
+        "disallow_transfer_to_peers": True,
+    }
+    if tools is not None:
+        update["tools"] = list(tools)
+    clone = agent.clone(update)
+    return PlanStreamAgent(
+        name=f"{output_key}_stream_agent",
+        description=f"Creates the {output_key} with {agent.name}, streaming it chunk by chunk.",
+        plan_key=output_key,
+        sub_agents=[clone],
+    )
+
+
+def build_plan_builder_agent(dietitian_agent: BaseAgent, coach_agent: BaseAgent,
+                             dietitian_template: str, coach_template: str,
+                             dietitian_tools: Optional[List[Any]] = None) -> SequentialAgent:
+    """
+    Builds the parallel plan generation workflow.
+
+    The specialist agents are cloned (an agent has a single parent, and these
+    are already sub-agents of the root agent) with branch instructions, and
+    write their replies, generated with the DietPlan and FitnessPlan
+    schemas, to `diet_plan` and `fitness_plan`. Run the workflow
+    as a sub-agent (not an AgentTool) so its chunk events reach the client
+    and are saved as they come.
+
+    Args:
+        dietitian_agent: The dietitian agent.
+        coach_agent: The coach agent.
+        dietitian_template: Instruction template of the dietitian branch.
+        coach_template: Instruction template of the coach branch.
+        dietitian_tools: Tools of the dietitian branch, if not the dietitian's
+            own. A branch cannot ask the user anything, so a tool that does
+            (e.g. an AgentTool whose agent asks for a confirmation) must be
+            swapped for one that does not.
+
+    Returns:
+        The workflow.
+    """
+    return SequentialAgent(
+        name="plan_builder_agent",
+        description="Creates the nutrition and fitness plans at the same time and presents the combined plan.",
+        sub_agents=[
+            ParallelAgent(
+                name="parallel_plans_agent",
+                description="Runs the dietitian and the coach concurrently.",
+                sub_agents=[
+                    _branch(dietitian_agent, constants.DIET_PLAN_KEY, DietPlan, dietitian_template, dietitian_tools),
+                    _branch(coach_agent, constants.FITNESS_PLAN_KEY, FitnessPlan, coach_template),
+                ],
+            ),
+            PlanMergeAgent(name="plan_merge_agent", description="Combines the nutrition and fitness plans."),
+        ],
+    )
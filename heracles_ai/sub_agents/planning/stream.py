@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# pylint: disable=line-too-long
+"""Streams the chunks of a plan while a specialist agent is creating it.
+
+`PlanStreamAgent` wraps a plan-writing agent (the dietitian or the coach in
+the parallel planning mode) and watches its events. Plan chunks (a day of
+workouts, a week of the progression, a meal) are picked up as soon as they
+are complete:
+
+- from the results of the plan tools (`workout_plan_tool`, `meal_plan_tool`);
+- from the model's reply, parsed incrementally as its text streams in (with
+  `RunConfig(streaming_mode=StreamingMode.SSE)`; otherwise when it arrives).
+
+Each new, validated chunk is sent as its own event, whose `custom_metadata`
+holds only that entry (kind, index and chunk; for a meal of a multi-day
+diet plan, also its day, as the meals are grouped under `days`). The whole plan draft
+(`_draft:<plan key>`) is written to state every `DRAFT_SAVE_INTERVAL`
+chunks and once more when the plan is complete, so a long plan is not
+stored again with every chunk. Partial model events are not saved to the
+session, but these events are, so a plan cut off mid-turn keeps its last
+saved draft, and the chunks sent after it can be replayed from the events.
+"""
+
+import json
+import re
+from typing import Any, AsyncGenerator, Dict, Iterator, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+
+from heracles_ai.shared_libraries import constants
+from heracles_ai.shared_libraries.log import get_logger
+
+logger = get_logger("planning")
+
+# Chunk kind -> the list of the plan draft it is appended to. Meals of a
+# multi-day diet plan go to the `meals` of their entry of `days` instead.
+CHUNK_SECTIONS = {"workout_day": "daily_workouts", "week": "weekly_progression", "meal": "meals"}
+DAYS_SECTION = "days"
+
+# A chunk with the day of its diet plan (None outside `days`).
+Chunk = Tuple[str, Dict[str, Any], Optional[int]]
+
+# The "day" key of a diet day, read from the text of its object so far.
+_DAY_KEY = re.compile(r'"day"\s*:\s*(\d+)')
+
+# Chunks sent between two writes of the plan draft to state.
+DRAFT_SAVE_INTERVAL = 8
+
+
+def chunk_kind(value: Any) -> Optional[str]:
+    """
+    Returns the kind of a plan chunk, or None if the value is not one.
+
+    - workout_day: {"day": ..., "exercises": [...]} (at least one exercise).
+    - week: {"week": <int>, ...}, an entry of the weekly progression.
+    - meal: {"name": ..., "calories": <number>, ...}.
+    """
+    if not isinstance(value, dict):
+        return None
+    if value.get("day") not in (None, "") and isinstance(value.get("exercises"), list) and value["exercises"]:
+        return "workout_day"
+    if isinstance(value.get("week"), int) and not isinstance(value["week"], bool) and "exercises" not in value:
+        return "week"
+    calories = value.get("calories")
+    if value.get("name") and isinstance(calories, (int, float)) and not isinstance(calories, bool):
+        return "meal"
+    return None
+
+
+def _diet_day(value: Any) -> Optional[int]:
+    """Returns the day number of a multi-day diet plan entry ({"day": <int>, "meals": [...]}), else None."""
+    if isinstance(value, dict) and isinstance(value.get("meals"), list):
+        day = value.get("day")
+        if isinstance(day, int) and not isinstance(day, bool):
+            return day
+    return None
+
+
+def iter_chunks(value: Any, day: Optional[int] = None) -> Iterator[Chunk]:
+    """Yields the (kind, chunk, day) triples of a parsed plan, in document order."""
+    kind = chunk_kind(value)
+    if kind is not None:
+        yield kind, value, day if kind == "meal" else None
+        return
+    if _diet_day(value) is not None:
+        day = _diet_day(value)
+    children = value.values() if isinstance(value, dict) else value if isinstance(value, list) else ()
+    for child in children:
+        yield from iter_chunks(child, day)
+
+
+class JsonChunkScanner:
+    """
+    Incremental scanner of JSON objects in streamed text.
+
+    `feed` takes the next piece of text and returns the plan chunks whose
+    closing brace it contained. Text outside JSON values (prose, code
+    fences) is skipped. A meal's day is read from the object enclosing it,
+    so it is known when the diet day lists "day" before "meals" (the
+    schema's order).
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._starts: List[int] = []  # Offsets of the open "{" (-1 for "[").
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> List[Chunk]:
+        chunks = []
+        offset = len(self._buffer)
+        self._buffer += text
+        for i, char in enumerate(text, offset):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = bool(self._starts)
+            elif char in "{[":
+                self._starts.append(i if char == "{" else -1)
+            elif char in "}]" and self._starts:
+                start = self._starts.pop()
+                if char != "}" or start < 0:
+                    continue
+                try:
+                    value = json.loads(self._buffer[start:i + 1])
+                except json.JSONDecodeError:
+                    continue
+                kind = chunk_kind(value)
+                if kind is not None:
+                    chunks.append((kind, value, self._enclosing_day(i) if kind == "meal" else None))
+        if not self._starts:
+            # Between JSON values: nothing read so far is needed again.
+            self._buffer = ""
+        return chunks
+
+    def _enclosing_day(self, end: int) -> Optional[int]:
+        """Returns the "day" of the innermost open object (a diet day around a meal), if any."""
+        parent = next((start for start in reversed(self._starts) if start >= 0), None)
+        if parent is None:
+            return None
+        match = _DAY_KEY.search(self._buffer, parent, end)
+        return int(match.group(1)) if match else None
+
+
+# Tools whose results are plans.
+PLAN_TOOLS = ("workout_plan_tool", "meal_plan_tool")
+
+
+class PlanStreamAgent(BaseAgent):
+    """
+    Runs a plan-writing agent and streams its plan chunks.
+
+    Every source of chunks (a plan tool result, a model reply) lists the
+    plan in order, so the n-th chunk of a kind in a source updates the n-th
+    entry of its draft section: the model's rewrite of a tool's plan
+    replaces those entries rather than duplicating them, and only chunks
+    that add or change an entry are sent.
+
+    Attributes:
+        plan_key: State key of the plan (e.g. "diet_plan"); the draft is kept
+            in `_draft:<plan_key>`.
+    """
+
+    plan_key: str
+
+    def _draft_event(self, ctx: InvocationContext, draft: Dict[str, List[Dict[str, Any]]]) -> Event:
+        """Returns an event writing the plan draft to state."""
+        snapshot = {key: list(items) for key, items in draft.items() if items}
+        if DAYS_SECTION in snapshot:
+            # The meals of a day keep growing after this event.
+            snapshot[DAYS_SECTION] = [{**entry, "meals": list(entry["meals"])} for entry in snapshot[DAYS_SECTION]]
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={
+                constants.PLAN_DRAFT_PREFIX + self.plan_key: snapshot,
+            }),
+        )
+
+    def _sources(self, event: Event, scanner: JsonChunkScanner, streamed: bool) -> List[List[Chunk]]:
+        """Returns the chunks of an event, one list per plan tool result and one for its text."""
+        sources, text_chunks = [], []
+        for part in (event.content.parts if event.content else None) or []:
+            response = part.function_response
+            if response is not None and response.name in PLAN_TOOLS:
+                sources.append(list(iter_chunks(response.response)))
+            elif part.text and not part.thought and (event.partial or not streamed):
+                text_chunks.extend(scanner.feed(part.text))
+        return sources + [text_chunks]
+
+    @staticmethod
+    def _section(draft: Dict[str, List[Dict[str, Any]]], kind: str, day: Optional[int]) -> List[Dict[str, Any]]:
+        """Returns the draft list a chunk belongs to, adding the entry of its day if needed."""
+        if day is None:
+            return draft[CHUNK_SECTIONS[kind]]
+        days = draft[DAYS_SECTION]
+        entry = next((entry for entry in days if entry["day"] == day), None)
+        if entry is None:
+            entry = {"day": day, "meals": []}
+            days.append(entry)
+        return entry["meals"]
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        draft: Dict[str, List[Dict[str, Any]]] = {section: [] for section in (*CHUNK_SECTIONS.values(), DAYS_SECTION)}
+        scanner = JsonChunkScanner()
+        ordinals: Dict[Tuple[str, Optional[int]], int] = {}  # Chunks of each kind (and day) in the model reply so far.
+        streamed = False  # Whether partial text preceded the current model response.
+        sent = saved = 0  # Chunks sent, and sent when the draft was last saved.
+
+        for agent in self.sub_agents:
+            async for event in agent.run_async(ctx):
+                yield event
+                *tool_sources, text_chunks = self._sources(event, scanner, streamed)
+                updates = []
+                for chunks, counts in [(chunks, {}) for chunks in tool_sources] + [(text_chunks, ordinals)]:
+                    for kind, chunk, day in chunks:
+                        index = counts.get((kind, day), 0)
+                        counts[(kind, day)] = index + 1
+                        section = self._section(draft, kind, day)
+                        if index < len(section) and section[index] == chunk:
+                            continue
+                        if index < len(section):
+                            section[index] = chunk
+                        else:
+                            index = len(section)
+                            section.append(chunk)
+                        updates.append((kind, day, index, chunk))
+                if event.partial:
+                    streamed = True
+                else:
+                    streamed = False
+                    scanner, ordinals = JsonChunkScanner(), {}
+
+                for kind, day, index, chunk in updates:
+                    sent += 1
+                    entry = {"plan": self.plan_key, "kind": kind, "index": index, "chunk": chunk}
+                    if day is not None:
+                        entry["day"] = day
+                    yield Event(
+                        invocation_id=ctx.invocation_id,
+                        author=self.name,
+                        branch=ctx.branch,
+                        custom_metadata={"plan_chunk": entry},
+                    )
+                if sent - saved >= DRAFT_SAVE_INTERVAL:
+                    saved = sent
+                    yield self._draft_event(ctx, draft)
+        if sent > saved:
+            yield self._draft_event(ctx, draft)
+        logger.debug("Streamed %d chunks of %s", sent, self.plan_key)
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Incremental progress analytics over the logged workouts, meals and weigh-ins.
+
+Running aggregates are kept in the session state (ANALYTICS_KEY) together
+with a cursor per source list: how many records were folded in and a hash of
+the last one. A call only processes the records appended since the previous
+call; if a list was rewritten (shorter, or its last folded record changed)
+the aggregates are rebuilt from scratch.
+"""
+
+import bisect
+import datetime
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+import google.adk.tools as ToolContext
+
+from heracles_ai.shared_libraries.constants import ANALYTICS_KEY, CMC_KEY
+from heracles_ai.shared_libraries.log import get_logger
+
+logger = get_logger("analytics")
+
+# Logged days kept individually for the calorie deltas; older days are folded
+# into a running total.
+RECENT_DAYS = 14
+
+# Number of most recent weigh-ins the weight trend is fitted on.
+WEIGHT_WINDOW = 8
+
+# Number of most recent weeks returned in the summary.
+SUMMARY_WEEKS = 4
+
+# Source lists in the session state. Weigh-ins live in progress.weight_kg.
+SOURCES = ("workout_sessions", "meals", "weight")
+
+
+def _records(state: Any, source: str) -> List[Any]:
+    if source == "weight":
+        progress = state.get("progress")
+        records = progress.get("weight_kg") if isinstance(progress, dict) else None
+    else:
+        records = state.get(source)
+    return records if isinstance(records, list) else []
+
+
+def _fingerprint(record: Any) -> str:
+    encoded = json.dumps(record, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def _parse_date(value: Any) -> Optional[datetime.date]:
+    try:
+        return datetime.date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _week_key(day: datetime.date) -> str:
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _empty_aggregates() -> Dict[str, Any]:
+    return {
+        "cursors": {source: {"count": 0, "last": None} for source in SOURCES},
+        "weeks": {},  # ISO week -> workout totals.
+        "days": {},  # ISO date -> calories eaten, for the RECENT_DAYS latest days.
+        # Folded older days: their sorted ISO dates and total calories.
+        "settled": {"dates": [], "calories": 0.0, "until": None},
+        "weight": [],  # [day ordinal, kg] of the WEIGHT_WINDOW latest weigh-ins.
+    }
+
+
+# --- Folding new records ---
+def _add_workout(aggregates: Dict[str, Any], record: Any) -> None:
+    if not isinstance(record, dict) or str(record.get("type", "")).strip().lower() == "rest":
+        return
+    day = _parse_date(record.get("date"))
+    if day is None:
+        return
+    week = aggregates["weeks"].setdefault(_week_key(day), {
+        "sessions": 0, "minutes": 0.0, "volume_kg": 0.0, "calories_burned": 0.0, "days": [],
+    })
+    week["sessions"] += 1
+    week["minutes"] += _number(record.get("duration_minutes"))
+    week["volume_kg"] += _number(record.get("sets")) * _number(record.get("reps")) * _number(record.get("weight_kg"))
+    week["calories_burned"] += _number(record.get("calories_burned"))
+    if day.isoformat() not in week["days"]:
+        week["days"].append(day.isoformat())
+
+
+def _settle(settled: Dict[str, Any], day: str, calories: float) -> None:
+    """Adds calories to the folded days, counting the day if it is not yet one of them."""
+    dates = settled["dates"]
+    position = bisect.bisect_left(dates, day)
+    if position == len(dates) or dates[position] != day:
+        dates.insert(position, day)
+    settled["calories"] += calories
+
+
+def _add_meal(aggregates: Dict[str, Any], record: Any) -> None:
+    if not isinstance(record, dict):
+        return
+    day = _parse_date(record.get("date"))
+    if day is None:
+        return
+    calories = _number(record.get("calories"))
+    settled = aggregates["settled"]
+    if settled["until"] is not None and day.isoformat() <= settled["until"]:
+        # Logged late, for a day that may have no other meals.
+        _settle(settled, day.isoformat(), calories)
+        return
+
+    days = aggregates["days"]
+    days[day.isoformat()] = days.get(day.isoformat(), 0.0) + calories
+    if len(days) > RECENT_DAYS:
+        oldest = min(days)
+        _settle(settled, oldest, days.pop(oldest))
+        settled["until"] = oldest
+
+
+def _add_weight(aggregates: Dict[str, Any], record: Any) -> None:
+    if not isinstance(record, dict):
+        return
+    day = _parse_date(record.get("date"))
+    if day is None or record.get("value") in (None, ""):
+        return
+    window = aggregates["weight"]
+    window.append([day.toordinal(), _number(record.get("value"))])
+    if len(window) > WEIGHT_WINDOW:
+        del window[0]
+
+
+_FOLDERS = {"workout_sessions": _add_workout, "meals": _add_meal, "weight": _add_weight}
+
+
+def update_aggregates(state: Any, aggregates: Optional[Dict[str, Any]] = None) -> tuple[Dict[str, Any], Dict[str, int]]:
+    """
+    Folds the records appended since the last update into the aggregates.
+
+    Args:
+        state: The session state.
+        aggregates: The stored aggregates (None to start from scratch).
+
+    Returns:
+        The updated aggregates and the number of new records per source.
+    """
+    if (not isinstance(aggregates, dict) or set(aggregates.get("cursors", ())) != set(SOURCES)
+            or "dates" not in aggregates.get("settled", {})):
+        aggregates = _empty_aggregates()
+
+    # A list that shrank or whose last folded record changed was rewritten
+    # (e.g. by `forget`): start over.
+    for source in SOURCES:
+        records = _records(state, source)
+        cursor = aggregates["cursors"][source]
+        count = cursor["count"]
+        if count > len(records) or (count and _fingerprint(records[count - 1]) != cursor["last"]):
+            logger.debug("%s was rewritten; rebuilding the aggregates", source)
+            aggregates = _empty_aggregates()
+            break
+
+    new_records = {}
+    for source in SOURCES:
+        records = _records(state, source)
+        cursor = aggregates["cursors"][source]
+        fresh = records[cursor["count"]:]
+        for record in fresh:
+            _FOLDERS[source](aggregates, record)
+        if fresh:
+            cursor["count"] = len(records)
+            cursor["last"] = _fingerprint(records[-1])
+        new_records[source] = len(fresh)
+    return aggregates, new_records
+
+
+# --- Summary ---
+def _planned_days(fitness_plan: Any) -> int:
+    """Returns the planned workout days per week of a fitness plan (0 if unknown)."""
+    if not isinstance(fitness_plan, dict):
+        return 0
+    planned = 0
+    for day in fitness_plan.get("daily_workouts") or []:
+        exercises = day.get("exercises") if isinstance(day, dict) else None
+        if any(isinstance(ex, dict) and str(ex.get("name", "")).strip().lower() != "rest" for ex in exercises or []):
+            planned += 1
+    return planned or int(_number(fitness_plan.get("workouts_per_week")))
+
+
+def _calorie_target(state: Any) -> Optional[float]:
+    diet_plan = state.get("diet_plan")
+    if isinstance(diet_plan, dict):
+        if _number(diet_plan.get("daily_calories")):
+            return _number(diet_plan.get("daily_calories"))
+        total = sum(_number(meal.get("calories")) for meal in diet_plan.get("meals") or [] if isinstance(meal, dict))
+        if total:
+            return total
+    cmc = state.get(CMC_KEY)
+    if isinstance(cmc, dict) and _number(cmc.get("estimated_daily_calories")):
+        return _number(cmc.get("estimated_daily_calories"))
+    return None
+
+
+def _weight_trend(window: List[List[float]]) -> Optional[Dict[str, Any]]:
+    """Least-squares slope of the weigh-ins in the window, in kg per week."""
+    if len(window) < 2:
+        return None
+    n = len(window)
+    mean_x = sum(x for x, _ in window) / n
+    mean_y = sum(y for _, y in window) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in window)
+    if not sxx:
+        return None
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in window) / sxx
+    return {
+        "kg_per_week": round(slope * 7, 2),
+        "latest_kg": window[-1][1],
+        "weigh_ins": n,
+        "since": datetime.date.fromordinal(int(window[0][0])).isoformat(),
+    }
+
+
+def summarize(state: Any, aggregates: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Builds the compact progress summary from the aggregates.
+
+    Args:
+        state: The session state (for the plans and calorie target).
+        aggregates: The aggregates from `update_aggregates`.
+
+    Returns:
+        Weekly volume and adherence, calorie deltas and the weight trend.
+    """
+    planned = _planned_days(state.get("fitness_plan"))
+    weeks = []
+    for key in sorted(aggregates["weeks"])[-SUMMARY_WEEKS:]:
+        week = aggregates["weeks"][key]
+        weeks.append({
+            "week": key,
+            "sessions": week["sessions"],
+            "training_days": len(week["days"]),
+            "minutes": round(week["minutes"]),
+            "volume_kg": round(week["volume_kg"]),
+            "calories_burned": round(week["calories_burned"]),
+            "adherence_pct": min(100, round(100 * len(week["days"]) / planned)) if planned else None,
+        })
+
+    summary: Dict[str, Any] = {"planned_days_per_week": planned or None, "weeks": weeks}
+    if planned and aggregates["weeks"]:
+        training_days = sum(len(week["days"]) for week in aggregates["weeks"].values())
+        summary["overall_adherence_pct"] = min(100, round(100 * training_days / (planned * len(aggregates["weeks"]))))
+
+    target = _calorie_target(state)
+    days, settled = aggregates["days"], aggregates["settled"]
+    logged_days = len(days) + len(settled["dates"])
+    if logged_days:
+        average = (sum(days.values()) + settled["calories"]) / logged_days
+        calories: Dict[str, Any] = {"target": target, "average_daily": round(average), "logged_days": logged_days}
+        if target:
+            calories["average_delta"] = round(average - target)
+            calories["recent_deltas"] = {day: round(days[day] - target) for day in sorted(days)[-7:]}
+        summary["calories"] = calories
+
+    summary["weight_trend"] = _weight_trend(aggregates["weight"])
+    return summary
+
+
+def progress_analytics_tool(tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Summarizes the user's progress from the logged workouts, meals and weigh-ins.
+
+    Returns the weekly training volume (sessions, minutes, strength volume,
+    calories burned) of the last weeks, adherence against the workout days of
+    the fitness plan, daily calorie deltas against the diet plan target, and
+    the weight trend (kg per week) over the latest weigh-ins. Only records
+    logged since the previous call are processed.
+
+    Args:
+        tool_context: The ADK tool context containing session state.
+
+    Returns:
+        The progress summary.
+    """
+    state = tool_context.state
+    aggregates, new_records = update_aggregates(state, state.get(ANALYTICS_KEY))
+    if any(new_records.values()):
+        # Reassigned as a whole so the update is recorded as a state delta.
+        state[ANALYTICS_KEY] = aggregates
+    logger.debug("Folded new records: %s", new_records)
+    return summarize(state, aggregates)
@@ -16,12 +16,238 @@
 """Tool for calculating estimated daily calorie and macronutrient needs
 and providing workout guidance."""
 
-from typing import Dict, Any
+import copy
+import hashlib
+import json
+import math
+from typing import Any, Dict, List, Mapping, Sequence, Union
+
 import google.adk.tools as ToolContext
+import numpy as np
+
 from heracles_ai.shared_libraries.constants import (
     ACTIVITY_MULTIPLIERS,
+    CMC_KEY,
+    CMC_MEMO_KEY,
     GOAL_ADJUSTMENTS
 )
+from heracles_ai.shared_libraries.log import get_logger
+from heracles_ai.shared_libraries.types import load_user_profile, resolve_activity_level, resolve_goal
+
+logger = get_logger("cmc")
+
+# Profile fields used by the Mifflin-St Jeor calculation.
+PROFILE_FIELDS = ("age", "sex", "height_cm", "weight_kg", "activity_level", "fitness_goals")
+
+# Activity levels that get the higher fat ratio (1.0 g/kg instead of 0.8 g/kg).
+LOW_ACTIVITY_LEVELS = ("sedentary", "lightly_active")
+
+# Goals that get the higher protein ratio (1.8 g/kg instead of 1.6 g/kg).
+HIGH_PROTEIN_GOALS = ("gain_weight", "lose_weight")
+
+# A batch is either a list of profile dicts or a mapping of column name to
+# a list / NumPy array of values (struct-of-arrays).
+ProfileBatch = Union[Sequence[Any], Mapping[str, Sequence[Any]]]
+
+
+def profile_fingerprint(user_profile: Mapping[str, Any]) -> str:
+    """
+    Returns a stable hash of the profile fields the calculation depends on.
+
+    Args:
+        user_profile: The user profile dict.
+
+    Returns:
+        A hex digest that changes only when one of PROFILE_FIELDS changes.
+    """
+    values = [user_profile.get(field) for field in PROFILE_FIELDS]
+    encoded = json.dumps(values, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def _to_columns(profiles: ProfileBatch) -> tuple[int, Dict[str, list], Union[List[Any], None]]:
+    """
+    Normalizes a batch of profiles into columns.
+
+    Args:
+        profiles: A list of profile dicts or a mapping of column name to values.
+
+    Returns:
+        A tuple of (row count, columns keyed by PROFILE_FIELDS, source rows).
+        Source rows are the input dicts (None for rows that are not dicts) for
+        list input, and None for columnar input.
+    """
+    if isinstance(profiles, Mapping):
+        lengths = {len(profiles[f]) for f in PROFILE_FIELDS if f in profiles}
+        if len(lengths) > 1:
+            raise ValueError(f"Profile columns have different lengths: {sorted(lengths)}")
+        n = lengths.pop() if lengths else 0
+        columns = {}
+        for field in PROFILE_FIELDS:
+            values = profiles.get(field)
+            if values is None:
+                columns[field] = [None] * n
+            elif isinstance(values, np.ndarray):
+                columns[field] = values.tolist()
+            else:
+                columns[field] = list(values)
+        return n, columns, None
+
+    rows = [p if isinstance(p, dict) else None for p in profiles]
+    columns = {
+        field: [row.get(field) if row is not None else None for row in rows]
+        for field in PROFILE_FIELDS
+    }
+    return len(rows), columns, rows
+
+
+def _is_missing(value: Any) -> bool:
+    """Returns True for empty values, including NaN from columnar inputs."""
+    return not value or (isinstance(value, float) and math.isnan(value))
+
+
+def _validate_row(row: Any, age_raw: Any, sex_raw: Any, height_raw: Any, weight_raw: Any,
+                  activity_raw: Any, goal_raw: Any) -> Union[tuple, str]:
+    """
+    Converts and validates the profile values of a single row.
+
+    `row` is the source profile dict, or a callable building it on demand
+    (columnar input), and is only used to list missing fields in errors.
+
+    Returns:
+        A tuple of (age, is_male, height_cm, weight_kg, activity_level, goal),
+        or an error message string.
+    """
+    if row is None:
+        return "Internal error: Retrieved user profile is not in the expected format."
+
+    try:
+        if _is_missing(age_raw):
+            raise ValueError("Age is missing or empty in user profile")
+        if _is_missing(height_raw):
+            raise ValueError("Height (cm) is missing or empty in user profile")
+        if _is_missing(weight_raw):
+            raise ValueError("Weight (kg) is missing or empty in user profile")
+
+        age = int(age_raw)
+        sex = str(sex_raw).lower() if sex_raw else "male"  # Default to male
+        height_cm = float(height_raw)
+        weight_kg = float(weight_raw)
+    except (ValueError, TypeError) as e:
+        return f"Invalid format or missing value in user profile data (age, height, weight). Please ensure they are provided and are valid numbers. Details: {e}"
+
+    # Synonyms and goal lists resolve through the alias index (e.g. "moderate" -> "moderately_active").
+    activity_level = resolve_activity_level(activity_raw) or str(activity_raw if activity_raw is not None else "").lower()
+    goal = resolve_goal(goal_raw) or str(goal_raw if goal_raw is not None else []).lower().replace(" ", "_")  # e.g., "lose weight" -> "lose_weight"
+
+    if not all([age, sex, height_cm, weight_kg, activity_level, goal]):
+        missing = [k for k, v in (row() if callable(row) else row).items() if not v]
+        return f"Missing required user profile information: {missing}. Please provide age, sex, height (cm), weight (kg), activity level, and goal."
+
+    if sex not in ["male", "female"]:
+        return f"Invalid sex specified: '{sex}'. Must be 'male' or 'female'."
+    if activity_level not in ACTIVITY_MULTIPLIERS:
+        return f"Invalid activity level: '{activity_level}'. Valid levels are: {list(ACTIVITY_MULTIPLIERS.keys())}"
+    if goal not in GOAL_ADJUSTMENTS:
+        return f"Invalid goal: '{goal}'. Valid goals are: {list(GOAL_ADJUSTMENTS.keys())}"
+
+    return age, sex == "male", height_cm, weight_kg, activity_level, goal
+
+
+def calculate_needs_batch(profiles: ProfileBatch) -> List[Dict[str, Any]]:
+    """
+    Calculates daily calorie and macronutrient needs for many profiles at once.
+
+    Rows are validated individually; the Mifflin-St Jeor BMR, TDEE, goal
+    adjustment and macro splits are then computed as NumPy vector operations
+    over all valid rows.
+
+    Args:
+        profiles: Either a list of user profile dicts, or a columnar mapping of
+            profile field name (age, sex, height_cm, weight_kg, activity_level,
+            fitness_goals) to a list or NumPy array of values.
+
+    Returns:
+        A list with one dict per input row, in input order. Each dict is either
+        the calculation result (same shape as `calories_macro_calculator_tool`)
+        or `{"error": "<message>"}` for rows that failed validation.
+    """
+    n, columns, rows = _to_columns(profiles)
+    output: List[Dict[str, Any]] = [None] * n
+
+    valid_rows = []
+    parsed = []
+    for i, values in enumerate(zip(*(columns[f] for f in PROFILE_FIELDS))):
+        if rows is not None:
+            row = rows[i]
+        else:
+            row = lambda i=i: {f: columns[f][i] for f in PROFILE_FIELDS if f in profiles}
+        result = _validate_row(row, *values)
+        if isinstance(result, str):
+            output[i] = {"error": result}
+        else:
+            valid_rows.append(i)
+            parsed.append(result)
+
+    if not parsed:
+        return output
+
+    ages, is_male, heights, weights, activity_levels, goals = zip(*parsed)
+    age = np.asarray(ages, dtype=np.float64)
+    height_cm = np.asarray(heights, dtype=np.float64)
+    weight_kg = np.asarray(weights, dtype=np.float64)
+    male = np.asarray(is_male, dtype=bool)
+    low_activity = np.isin(np.asarray(activity_levels), LOW_ACTIVITY_LEVELS)
+    high_protein = np.isin(np.asarray(goals), HIGH_PROTEIN_GOALS)
+
+    # --- Calculate BMR using Mifflin-St Jeor ---
+    bmr = (10 * weight_kg) + (6.25 * height_cm) - (5 * age) + np.where(male, 5, -161)
+
+    # --- Calculate TDEE ---
+    activity_multiplier = np.fromiter((ACTIVITY_MULTIPLIERS[a] for a in activity_levels), dtype=np.float64, count=len(parsed))
+    tdee = bmr * activity_multiplier
+
+    # --- Adjust for Goal (Calories) ---
+    goal_adjustment = np.fromiter((GOAL_ADJUSTMENTS[g] for g in goals), dtype=np.int64, count=len(parsed))
+    estimated_daily_calories = np.rint(tdee + goal_adjustment)
+
+    # --- Calculate Macronutrient Needs (General Guidelines) ---
+    # 1.6 g/kg for general fitness, 1.8 g/kg to preserve muscle mass when
+    # losing weight or for muscle growth when gaining.
+    protein_grams = np.rint(np.where(high_protein, 1.8, 1.6) * weight_kg)
+    fat_grams = np.rint(np.where(low_activity, 1.0, 0.8) * weight_kg)
+    carb_grams = np.rint((estimated_daily_calories - (protein_grams * 4) - (fat_grams * 9)) / 4)
+    # Ensure carb_grams is not negative
+    carb_grams = np.maximum(carb_grams, 0)
+
+    # Convert once to Python scalars; indexing NumPy arrays per element is slow.
+    columns_out = zip(
+        valid_rows,
+        estimated_daily_calories.astype(np.int64).tolist(),
+        protein_grams.astype(np.int64).tolist(),
+        carb_grams.astype(np.int64).tolist(),
+        fat_grams.astype(np.int64).tolist(),
+        bmr.tolist(),
+        tdee.tolist(),
+        goal_adjustment.tolist(),
+        activity_levels,
+        goals,
+    )
+    for i, calories, protein, carbs, fat, bmr_i, tdee_i, adjustment, activity_level, goal in columns_out:
+        output[i] = {
+            "estimated_daily_calories": calories,
+            "protein_grams": protein,
+            "carbohydrate_grams": carbs,
+            "fat_grams": fat,
+            "calculation_details": {
+                "bmr": round(bmr_i, 2),
+                "tdee": round(tdee_i, 2),
+                "goal_adjustment": adjustment,
+                "activity_level": activity_level,
+                "goal": goal
+            }
+        }
+    return output
 
 
 def calories_macro_calculator_tool(query: str, tool_context: ToolContext) -> Dict[str, Any]:
@@ -31,7 +257,10 @@ def calories_macro_calculator_tool(query: str, tool_context: ToolContext) -> Dic
 
     Uses the Mifflin-St Jeor formula for BMR and adjusts based on activity level
     and fitness goal (lose, maintain, gain weight). Also calculates protein,
-    carbohydrate, and fat recommendations.
+    carbohydrate, and fat recommendations. This is a single-row wrapper over
+    `calculate_needs_batch`. Results are memoized in session state per profile
+    fingerprint, so repeated calls for an unchanged profile return the stored
+    result without recomputing or logging.
 
     Args:
         query: The user query (not directly used for calculation but required by ADK).
@@ -41,119 +270,63 @@ def calories_macro_calculator_tool(query: str, tool_context: ToolContext) -> Dic
         A dictionary containing the estimated daily calorie needs, macronutrient
         recommendations, workout guidance, or an error message.
     """
-    print(f"[calculate_comprehensive_needs] Received query: {query}")
     # --- Access session state via tool_context.session_state ---
     user_profile = tool_context.state.get("user_profile")
     if not user_profile:
         return {"error": "User profile not found in session state. Please provide user profile information."}
+    if not isinstance(user_profile, Mapping):
+        return {"error": "Internal error: Retrieved user profile is not in the expected format."}
     # --- End state access ---
 
-    # --- Extract required user data ---
-    try:
-        # Check if user_profile is a dictionary before proceeding
-        if not isinstance(user_profile, dict):
-            print(f"[calculate_comprehensive_needs] Error: user_profile is not a dictionary (type: {type(user_profile)})" )
-            return {"error": "Internal error: Retrieved user profile is not in the expected format."}
-
-        # --- Existing extraction and validation logic ---
-        age_str = user_profile.get("age")
-        sex_str = user_profile.get("sex")
-        height_str = user_profile.get("height_cm")
-        weight_str = user_profile.get("weight_kg")
-        activity_level_raw = str(user_profile.get("activity_level", "")).lower()
-        goal_raw = user_profile.get("fitness_goals", [])
-        diet_prefs = user_profile.get("dietary_preferences", [])
-
-        # --- Type Conversion and Validation ---
-        try:
-            # --- Add check for empty strings before conversion --- 
-            if not age_str:
-                raise ValueError("Age is missing or empty in user profile")
-            if not height_str:
-                raise ValueError("Height (cm) is missing or empty in user profile")
-            if not weight_str:
-                raise ValueError("Weight (kg) is missing or empty in user profile")
-            # --- End check --- 
-            
-            age = int(age_str)
-            sex = str(sex_str).lower() if sex_str else "male" # Default to male
-            height_cm = float(height_str)
-            weight_kg = float(weight_str)
-        except (ValueError, TypeError) as e:
-            print(f"[calculate_comprehensive_needs] Error converting profile values: {e}")
-            # Re-raise or return a more specific error based on the caught exception
-            return {"error": f"Invalid format or missing value in user profile data (age, height, weight). Please ensure they are provided and are valid numbers. Details: {e}"}
-
-        # --- Validate other fields ---
-        activity_level = activity_level_raw
-        goal = str(goal_raw).lower().replace(" ", "_") # e.g., "lose weight" -> "lose_weight"
-
-        if not all([age, sex, height_cm, weight_kg, activity_level, goal]):
-            missing = [k for k, v in user_profile.items() if not v]
-            return {"error": f"Missing required user profile information: {missing}. Please provide age, sex, height (cm), weight (kg), activity level, and goal."}
-
-        if sex not in ["male", "female"]:
-            return {"error": f"Invalid sex specified: '{sex}'. Must be 'male' or 'female'."}
-        if activity_level not in ACTIVITY_MULTIPLIERS:
-            return {"error": f"Invalid activity level: '{activity_level}'. Valid levels are: {list(ACTIVITY_MULTIPLIERS.keys())}"}
-        if goal not in GOAL_ADJUSTMENTS:
-            return {"error": f"Invalid goal: '{goal}'. Valid goals are: {list(GOAL_ADJUSTMENTS.keys())}"}
-
-    except Exception as e: # Catch broader errors during extraction/parsing
-        print(f"[calculate_comprehensive_needs] Error parsing user profile: {e}")
-        return {"error": f"Could not parse user profile data. Ensure age, height, and weight are numbers. Error: {e}"}
-
-    print(f"[calculate_comprehensive_needs] Calculating for: Age={age}, Sex={sex}, H={height_cm}cm, W={weight_kg}kg, Activity={activity_level}, Goal={goal}")
+    # --- Memo lookup ---
+    fingerprint = profile_fingerprint(user_profile)
+    memo = tool_context.state.get(CMC_MEMO_KEY)
+    if memo and memo.get("fingerprint") == fingerprint:
+        # A copy: a caller changing the result must not change the memo
+        # without a state delta.
+        return copy.deepcopy(memo["result"])
+    # --- End memo lookup ---
 
-    # --- Calculate BMR using Mifflin-St Jeor ---
-    if sex == "male":
-        bmr = (10 * weight_kg) + (6.25 * height_cm) - (5 * age) + 5
-    else: # female
-        bmr = (10 * weight_kg) + (6.25 * height_cm) - (5 * age) - 161
+    logger.debug("Received query: %s", query)
+    # The profile is parsed and validated when it is written (see types.UserProfile).
+    profile = load_user_profile(tool_context.state)
+    invalid = [f"{field}: {message}" for field, message in profile.errors if field in PROFILE_FIELDS]
+    if invalid:
+        result = {"error": f"Invalid user profile data: {'; '.join(invalid)}. Please correct these fields."}
+    else:
+        result = calculate_needs_batch([profile.cmc_inputs()])[0]
+    if "error" in result:
+        logger.warning("Error: %s", result["error"])
+        return result
 
-    # --- Calculate TDEE ---
-    activity_multiplier = ACTIVITY_MULTIPLIERS[activity_level]
-    tdee = bmr * activity_multiplier
+    details = result["calculation_details"]
+    logger.info("BMR=%.2f, TDEE=%.2f, Adjustment=%s, Final Calories=%s",
+                details["bmr"], details["tdee"], details["goal_adjustment"], result["estimated_daily_calories"])
+    logger.info("Protein=%sg, Carbs=%sg, Fats=%sg",
+                result["protein_grams"], result["carbohydrate_grams"], result["fat_grams"])
 
-    # --- Adjust for Goal (Calories) ---
-    goal_adjustment = GOAL_ADJUSTMENTS[goal]
-    estimated_daily_calories = round(tdee + goal_adjustment)
+    if fingerprint:
+        tool_context.state[CMC_MEMO_KEY] = {"fingerprint": fingerprint, "result": copy.deepcopy(result)}
+    return result
 
-    # --- Calculate Macronutrient Needs (General Guidelines) ---
-    protein_grams = round(1.6 * weight_kg) # Aim for 1.6 g/kg for general fitness
-    if goal == "gain_weight":
-        protein_grams = round(1.8 * weight_kg) # Slightly higher for muscle growth
-    elif goal == "lose_weight":
-        protein_grams = round(1.8 * weight_kg) # To preserve muscle mass
-
-    # Carbohydrates and Fats (Adjust based on activity and preference)
-    # These are starting points and can be adjusted based on the user's response
-    # to the plan and their preferences.
-    if activity_level in ["sedentary", "lightly_active"]:
-        fat_grams = round(1.0 * weight_kg)
-        carb_grams = round((estimated_daily_calories - (protein_grams * 4) - (fat_grams * 9)) / 4)
-    else: # More active
-        fat_grams = round(0.8 * weight_kg)
-        carb_grams = round((estimated_daily_calories - (protein_grams * 4) - (fat_grams * 9)) / 4)
 
-    # Ensure carb_grams is not negative
-    carb_grams = max(0, carb_grams)
-
-    # --- Provide General Workout Guidance based on Goal ---
-
-    print(f"[calculate_comprehensive_needs] BMR={bmr:.2f}, TDEE={tdee:.2f}, Adjustment={goal_adjustment}, Final Calories={estimated_daily_calories}")
-    print(f"[calculate_comprehensive_needs] Protein={protein_grams}g, Carbs={carb_grams}g, Fats={fat_grams}g")
-
-    return {
-        "estimated_daily_calories": estimated_daily_calories,
-        "protein_grams": protein_grams,
-        "carbohydrate_grams": carb_grams,
-        "fat_grams": fat_grams,
-        "calculation_details": {
-            "bmr": round(bmr, 2),
-            "tdee": round(tdee, 2),
-            "goal_adjustment": goal_adjustment,
-            "activity_level": activity_level,
-            "goal": goal
-        }
-    }
\ No newline at end of file
+def calculate_and_store_cmc_tool(query: str, tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Calculates the user's daily calorie and macronutrient needs and stores
+    them in the `cmc` session state key.
+
+    Used when the dietitian calls the calculator directly instead of through
+    the `nutiritions_calculator_agent`, which saves a model round trip.
+
+    Args:
+        query: The user's goal (not directly used for calculation but required by ADK).
+        tool_context: The ADK tool context containing session state with user profile.
+
+    Returns:
+        The calculation results, or an error message (in which case the
+        session state is left unchanged).
+    """
+    result = calories_macro_calculator_tool(query, tool_context)
+    if "error" not in result:
+        tool_context.state[CMC_KEY] = result
+    return result
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local exercise catalog with inverted indexes for fast exercise lookups."""
+
+from collections import defaultdict
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from heracles_ai.tools.wger import WgerClient, WGER_LANGUAGE_ENGLISH, format_exercise_info
+
+# Path of the exercise catalog. Either the bundled catalog format
+# ({"exercises": [...]}) or a raw WGER /exerciseinfo/ dump (a list of records).
+EXERCISE_CATALOG_PATH = os.getenv(
+    "HERACLES_AI_EXERCISE_CATALOG",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "exercises.json"),
+)
+
+# Equipment covered by the `equipment_available` values used in user profiles.
+# Bodyweight exercises (no equipment) are always available.
+_GYM_EQUIPMENT = [
+    "barbell", "dumbbell", "kettlebell", "bench", "pull-up bar", "cable machine",
+    "machine", "resistance band", "gym mat", "swiss ball", "stationary bike",
+    "rowing machine", "treadmill", "elliptical", "jump rope", "foam roller",
+    "medicine ball", "pool",
+]
+EQUIPMENT_ALIASES = {
+    "gym_access": _GYM_EQUIPMENT,
+    "gym": _GYM_EQUIPMENT,
+    "commercial_gym": _GYM_EQUIPMENT,
+    "home_gym": ["barbell", "dumbbell", "kettlebell", "bench", "pull-up bar", "gym mat", "resistance band"],
+    "bodyweight": [],
+    "bodyweight_only": [],
+    "none": [],
+    "running_shoes": [],
+    "dumbbells": ["dumbbell"],
+    "resistance_bands": ["resistance band"],
+    "bands": ["resistance band"],
+    "mat": ["gym mat"],
+    "yoga_mat": ["gym mat"],
+    "bicycle": ["bike"],
+    "bike": ["bike"],
+    "swimming_pool": ["pool"],
+    "pool_access": ["pool"],
+}
+
+# Words in a free-text query that do not help to select exercises.
+_QUERY_STOPWORDS = {
+    "a", "an", "and", "the", "for", "with", "of", "to", "on", "in", "my", "me",
+    "exercise", "exercises", "workout", "workouts", "some", "good", "best",
+    "using", "at", "home", "beginner", "intermediate", "advanced",
+}
+
+
+def _normalize_token(token: str) -> str:
+    """Lowercases and crudely singularizes a token ("dumbbells" -> "dumbbell")."""
+    token = token.lower()
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        token = token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits text into normalized tokens."""
+    return [_normalize_token(t) for t in re.findall(r"[a-z0-9]+", (text or "").lower())]
+
+
+class ExerciseCatalog:
+    """
+    An in-memory exercise catalog.
+
+    Inverted indexes map normalized tokens of the exercise name, category,
+    muscles and equipment to exercise ids, so a free-text query resolves with
+    a few set intersections instead of a scan.
+    """
+
+    INDEXED_FIELDS = ("name", "category", "muscles", "equipment")
+
+    def __init__(self, exercises: Iterable[Dict[str, Any]]):
+        self.exercises: Dict[int, Dict[str, Any]] = {}
+        self.indexes: Dict[str, Dict[str, Set[int]]] = {field: defaultdict(set) for field in self.INDEXED_FIELDS}
+        # Exact (lowercased) equipment name -> ids, used for equipment filtering.
+        self.equipment_ids: Dict[str, Set[int]] = defaultdict(set)
+
+        for exercise in exercises:
+            exercise_id = exercise["id"]
+            self.exercises[exercise_id] = exercise
+            for field in self.INDEXED_FIELDS:
+                values = exercise.get(field) or []
+                if isinstance(values, str):
+                    values = [values]
+                for value in values:
+                    for token in tokenize(value):
+                        self.indexes[field][token].add(exercise_id)
+            for equipment in exercise.get("equipment") or []:
+                self.equipment_ids[equipment.lower()].add(exercise_id)
+
+        # Merged token index across all fields, used for free-text queries.
+        self.token_index: Dict[str, Set[int]] = defaultdict(set)
+        for index in self.indexes.values():
+            for token, ids in index.items():
+                self.token_index[token] |= ids
+        self._all_ids = frozenset(self.exercises)
+
+    def __len__(self) -> int:
+        return len(self.exercises)
+
+    @classmethod
+    def from_wger(cls, records: Iterable[Dict[str, Any]]) -> "ExerciseCatalog":
+        """Builds a catalog from raw WGER /exerciseinfo/ records."""
+        exercises = []
+        for record in records:
+            exercise = format_exercise_info(record)
+            if exercise["name"]:
+                exercise["equipment"] = [
+                    e.lower() for e in exercise["equipment"] if e and not e.lower().startswith("none")
+                ]
+                exercises.append(exercise)
+        return cls(exercises)
+
+    @classmethod
+    def from_json(cls, path: str) -> "ExerciseCatalog":
+        """Loads the bundled catalog format or a raw WGER /exerciseinfo/ dump."""
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        if isinstance(data, dict) and "exercises" in data:
+            return cls(data["exercises"])
+        records = data.get("results", []) if isinstance(data, dict) else data
+        return cls.from_wger(records)
+
+    @classmethod
+    def download(cls, client: Optional[WgerClient] = None) -> "ExerciseCatalog":
+        """Builds a catalog from the live WGER API, e.g. to refresh the bundled dump."""
+        client = client or WgerClient()
+        return cls.from_wger(client.fetch_all("/exerciseinfo/", {"language": WGER_LANGUAGE_ENGLISH}))
+
+    def to_json(self, path: str) -> None:
+        """Writes the catalog in the bundled format."""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"exercises": list(self.exercises.values())}, file, indent=2)
+
+    def allowed_equipment(self, equipment_available: Optional[Iterable[str]]) -> Optional[Set[str]]:
+        """
+        Maps profile `equipment_available` values to catalog equipment names.
+
+        Returns:
+            The set of usable equipment names, or None when the profile does
+            not list any equipment (no filtering).
+        """
+        if not equipment_available:
+            return None
+        if isinstance(equipment_available, str):
+            equipment_available = [equipment_available]
+        allowed: Set[str] = set()
+        for item in equipment_available:
+            key = str(item).strip().lower().replace(" ", "_").replace("-", "_")
+            if key in EQUIPMENT_ALIASES:
+                allowed.update(EQUIPMENT_ALIASES[key])
+                continue
+            # Fall back to matching catalog equipment names by tokens.
+            tokens = set(tokenize(str(item)))
+            allowed.update(name for name in self.equipment_ids if tokens & set(tokenize(name)))
+        return allowed
+
+    def search(
+        self,
+        query: str = "",
+        equipment_available: Optional[Iterable[str]] = None,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """
+        Finds exercises matching every known term of a free-text query.
+
+        Terms that appear in no index (e.g. "beginner") are ignored. Exercises
+        requiring equipment outside `equipment_available` are excluded.
+
+        Args:
+            query: Free text such as "dumbbell exercises for chest".
+            equipment_available: The profile's equipment list, if any.
+            limit: Maximum number of exercises to return.
+
+        Returns:
+            Matching exercise records, ordered by catalog id.
+        """
+        ids: Optional[Set[int]] = None
+        for token in tokenize(query):
+            if token in _QUERY_STOPWORDS:
+                continue
+            postings = self.token_index.get(token)
+            if postings is None:
+                continue
+            ids = set(postings) if ids is None else ids & postings
+            if not ids:
+                return []
+        if ids is None:
+            ids = set(self._all_ids)
+
+        allowed = self.allowed_equipment(equipment_available)
+        if allowed is not None:
+            for equipment, equipment_ids in self.equipment_ids.items():
+                if equipment not in allowed:
+                    ids -= equipment_ids
+
+        return [self.exercises[i] for i in sorted(ids)[:limit]]
+
+
+_catalog: Optional[ExerciseCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_exercise_catalog() -> ExerciseCatalog:
+    """Returns the process-wide exercise catalog, loading it on first use."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = ExerciseCatalog.from_json(EXERCISE_CATALOG_PATH)
+    return _catalog
@@ -15,43 +15,27 @@
 
 """Fitness-related tools for Heracles.AI."""
 
-from typing import Dict, Any
+from typing import Any, Dict
+
 import google.adk.tools as ToolContext
-import requests
-import os
-# --- Add import for the helper function ---
 
-def fitness_tool(query: str, tool_context: ToolContext) -> Dict[str, str]:
-    """
-    (Simulated) Gets meal and snack suggestions aligned with dietary needs and goals.
+from heracles_ai.shared_libraries.log import get_logger
+from heracles_ai.shared_libraries.types import load_user_profile
+from heracles_ai.tools.exercise import get_exercise_catalog
 
-    Args:
-        query: A description of the dietary needs (e.g., "vegetarian high-protein snacks").
-        tool_context: The ADK tool context.
+logger = get_logger("fitness")
 
-    Returns:
-        A status message or simulated meal data.
-    """
-    # In a real implementation, this would query a nutrition database or API.
-    print(f"[nutrition_tool called with query: {query}]")
-    # Simulate finding some meal ideas
-    simulated_meals = [
-        {"meal_type": "snack", "name": "Greek Yogurt with Berries"},
-        {"meal_type": "lunch", "name": "Lentil Soup with Whole Wheat Bread"},
-        {"meal_type": "dinner", "name": "Tofu Stir-fry with Brown Rice"}
-    ]
-    # For now, just return a status message. The agent prompt expects this tool
-    # to be used, but the agent itself will generate the plan text.
-    # Alternatively, return the simulated data as a JSON string:
-    # import json
-    # return {"meals": json.dumps(simulated_meals)}
-    return {"status": f"Simulated finding meal suggestions for: {query}"}
-# # --- Updated Tool Function ---
-# def fitness_tool(query: str, params, tool_context: ToolContext) -> Dict[str, Any]:
+# Maximum number of exercises returned to the model per query.
+MAX_EXERCISES = 20
+
+
+def fitness_tool(query: str, tool_context: ToolContext) -> Dict[str, Any]:
     """
-    Finds suitable exercises using the WGER API based on a query.
-    Uses the fetch_wger_data helper function.
-    Filters by English language and the provided query string.
+    Finds suitable exercises in the local exercise catalog based on a query.
+
+    The query is resolved against inverted indexes on exercise name, category,
+    muscles and equipment (no network call). Exercises that need equipment
+    missing from the user's `equipment_available` profile field are excluded.
 
     Args:
         query: A description of the exercises needed (e.g., "dumbbell exercises for chest").
@@ -60,40 +44,18 @@ def fitness_tool(query: str, tool_context: ToolContext) -> Dict[str, str]:
     Returns:
         A dictionary containing a list of exercises or an error/status message.
     """
-
-    
-
-    
-    endpoint_path = "/exerciseinfo/"
-    print(f"[fitness_tool] Calling WGER API via helper: {endpoint_path} with params: {params}")
+    profile = load_user_profile(tool_context.state)
+    equipment_available = list(profile.equipment_available) if profile is not None else None
+    logger.debug("Searching exercise catalog: query=%r, equipment=%s", query, equipment_available)
 
     try:
-        # --- Use the helper function ---
-        data = fetch_wger_data(endpoint_path=endpoint_path, params=params)
-
-        exercises = data.get('results', [])
-
-        if not exercises:
-            return {"status": f"No specific exercises found on WGER for query: '{query}' with filters {params}. Try a broader search."}
-
-        formatted_exercises = [
-            {
-                "id": ex.get('id'),
-                "name": ex.get('name'),
-                "description": ex.get('description', '').replace('<p>', '').replace('</p>', ''),
-                "category": ex.get('category', {}).get('name'),
-                "equipment": [eq.get('name') for eq in ex.get('equipment', [])]
-            }
-            for ex in exercises
-        ]
+        exercises = get_exercise_catalog().search(query, equipment_available, limit=MAX_EXERCISES)
+    except (OSError, ValueError) as e:
+        logger.error("Error loading the exercise catalog: %s", e)
+        return {"error": f"Failed to load the exercise catalog: {e}"}
 
-        print(f"[fitness_tool] Found {len(formatted_exercises)} exercises from WGER.")
-        return {"exercises": formatted_exercises}
+    if not exercises:
+        return {"status": f"No specific exercises found for query: '{query}' with the available equipment. Try a broader search."}
 
-    # --- Catch exceptions raised by the helper ---
-    except (requests.exceptions.RequestException, ValueError) as e:
-        print(f"[fitness_tool] Error fetching or processing WGER data: {e}")
-        return {"error": f"Failed to fetch exercises from WGER: {e}"}
-    except Exception as e:
-        print(f"[fitness_tool] An unexpected error occurred: {e}")
-        return {"error": f"An unexpected error occurred while fetching exercises: {e}"}
\ No newline at end of file
+    logger.debug("Found %d exercises.", len(exercises))
+    return {"exercises": exercises}
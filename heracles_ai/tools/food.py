@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local food and recipe database backed by SQLite, with macro range indexes."""
+
+from dataclasses import dataclass, field
+import json
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Path of the food data. A `.json` file ({"foods": [...]}) is loaded into an
+# in-memory SQLite database; any other path is opened as a prebuilt SQLite file.
+FOOD_DATABASE_PATH = os.getenv(
+    "HERACLES_AI_FOOD_DB",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "foods.json"),
+)
+
+MEAL_TYPES = ("breakfast", "lunch", "dinner", "snack")
+DIET_TAGS = (
+    "vegetarian", "vegan", "pescatarian", "keto", "paleo", "gluten_free", "dairy_free",
+)
+ALLERGENS = (
+    "dairy", "eggs", "gluten", "peanuts", "tree_nuts", "soy", "fish", "shellfish", "sesame",
+)
+
+# Free-text spellings of allergens, as found in queries and `food_allergies`.
+ALLERGEN_ALIASES = {
+    "milk": ["dairy"], "lactose": ["dairy"], "cheese": ["dairy"],
+    "egg": ["eggs"], "wheat": ["gluten"], "peanut": ["peanuts"],
+    "nut": ["peanuts", "tree_nuts"], "nuts": ["peanuts", "tree_nuts"],
+    "tree_nut": ["tree_nuts"], "almond": ["tree_nuts"], "almonds": ["tree_nuts"],
+    "soya": ["soy"], "seafood": ["fish", "shellfish"], "shrimp": ["shellfish"],
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS foods (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    serving TEXT,
+    calories REAL NOT NULL,
+    protein REAL NOT NULL,
+    carbs REAL NOT NULL,
+    fat REAL NOT NULL,
+    fiber REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS food_meal_types (
+    meal_type TEXT NOT NULL,
+    calories REAL NOT NULL,
+    food_id INTEGER NOT NULL REFERENCES foods(id),
+    PRIMARY KEY (meal_type, calories, food_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS food_tags (
+    tag TEXT NOT NULL,
+    food_id INTEGER NOT NULL REFERENCES foods(id),
+    PRIMARY KEY (tag, food_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS food_allergens (
+    allergen TEXT NOT NULL,
+    food_id INTEGER NOT NULL REFERENCES foods(id),
+    PRIMARY KEY (allergen, food_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_foods_calories ON foods(calories);
+CREATE INDEX IF NOT EXISTS idx_foods_protein ON foods(protein);
+CREATE INDEX IF NOT EXISTS idx_foods_carbs ON foods(carbs);
+CREATE INDEX IF NOT EXISTS idx_foods_fat ON foods(fat);
+"""
+
+_MACROS = ("calories", "protein", "carbs", "fat")
+
+
+@dataclass
+class FoodQuery:
+    """Structured filters for `FoodDatabase.search`. Macro bounds are per serving."""
+    meal_type: Optional[str] = None
+    diet_tags: List[str] = field(default_factory=list)
+    exclude_allergens: List[str] = field(default_factory=list)
+    # Allergies outside ALLERGENS (e.g. "banana"): foods named after them are excluded.
+    exclude_terms: List[str] = field(default_factory=list)
+    min_calories: Optional[float] = None
+    max_calories: Optional[float] = None
+    min_protein: Optional[float] = None
+    max_protein: Optional[float] = None
+    min_carbs: Optional[float] = None
+    max_carbs: Optional[float] = None
+    min_fat: Optional[float] = None
+    max_fat: Optional[float] = None
+    order_by: str = "protein DESC"
+    limit: int = 10
+
+
+def normalize_allergens(values: Optional[Iterable[str]]) -> List[str]:
+    """Maps free-text allergy names (e.g. "nuts", "Shellfish") to database allergens."""
+    if not values:
+        return []
+    if isinstance(values, str):
+        values = [values]
+    allergens = []
+    for value in values:
+        key = str(value).strip().lower().replace(" ", "_").replace("-", "_")
+        for allergen in ALLERGEN_ALIASES.get(key, [key]):
+            if allergen in ALLERGENS and allergen not in allergens:
+                allergens.append(allergen)
+    return allergens
+
+
+def split_allergies(values: Optional[Iterable[str]]) -> Tuple[List[str], List[str]]:
+    """
+    Splits free-text allergies into database allergens and other terms.
+
+    Returns:
+        The allergens (as `normalize_allergens`), and the lower-cased allergies
+        that map to none of them (e.g. "banana", "kiwi"). The database has no
+        allergen data for the latter; they can only be matched by food name.
+    """
+    if not values:
+        return [], []
+    if isinstance(values, str):
+        values = [values]
+    allergens, terms = [], []
+    for value in values:
+        found = normalize_allergens([value])
+        term = " ".join(str(value).lower().split())
+        if not found and term and term not in terms:
+            terms.append(term)
+        allergens.extend(allergen for allergen in found if allergen not in allergens)
+    return allergens, terms
+
+
+def _name_stem(term: str) -> str:
+    """Returns the stem matching the singular and plural of a food name ("berries", "berry" -> "berr")."""
+    for suffix in ("ies", "es", "s", "y"):
+        if term.endswith(suffix) and len(term) - len(suffix) >= 3:
+            return term[:-len(suffix)]
+    return term
+
+
+def normalize_diet_tags(values: Optional[Iterable[str]]) -> List[str]:
+    """Keeps the dietary preferences that correspond to database diet tags."""
+    if not values:
+        return []
+    if isinstance(values, str):
+        values = [values]
+    tags = []
+    for value in values:
+        tag = str(value).strip().lower().replace(" ", "_").replace("-", "_")
+        if tag in DIET_TAGS and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def parse_food_query(text: str) -> FoodQuery:
+    """
+    Turns a free-text request such as "vegetarian high-protein snacks under
+    300 kcal" into a `FoodQuery`.
+    """
+    text = (text or "").lower()
+    query = FoodQuery()
+    words = re.findall(r"[a-z_]+", text.replace("-", "_").replace(" free", "_free"))
+
+    query.diet_tags = normalize_diet_tags(words)
+    for meal_type in MEAL_TYPES:
+        if re.search(rf"\b{meal_type}(e?s)?\b", text):
+            query.meal_type = meal_type
+            break
+
+    for allergen in re.findall(r"([a-z]+)[ -]free", text):
+        if allergen not in ("gluten", "dairy"):  # These are diet tags.
+            query.exclude_allergens.extend(normalize_allergens([allergen]))
+
+    calories = r"(\d+(?:\.\d+)?)\s*(?:k?cal|calories)"
+    if match := re.search(rf"(?:under|below|less than|at most|max(?:imum)?|<)\s*{calories}", text):
+        query.max_calories = float(match.group(1))
+    if match := re.search(rf"(?:over|above|more than|at least|min(?:imum)?|>)\s*{calories}", text):
+        query.min_calories = float(match.group(1))
+    if match := re.search(rf"(?:around|about|approximately|~)\s*{calories}", text):
+        target = float(match.group(1))
+        query.min_calories, query.max_calories = target * 0.85, target * 1.15
+
+    if re.search(r"high[ _-]?protein", text):
+        query.min_protein = 15
+        query.order_by = "protein DESC"
+    if re.search(r"low[ _-]?carb", text):
+        query.max_carbs = 20
+        query.order_by = "carbs ASC"
+    if re.search(r"low[ _-]?fat", text):
+        query.max_fat = 10
+        query.order_by = "fat ASC"
+    if re.search(r"low[ _-]?cal", text):
+        query.order_by = "calories ASC"
+    return query
+
+
+class FoodDatabase:
+    """
+    SQLite food and recipe database.
+
+    Meal types are stored with the per-serving calories in a clustered
+    (meal_type, calories) table, diet tags and allergens in (tag, food_id)
+    tables, and each macro column has its own index. Filters therefore run
+    as index range scans and semi-joins.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_json(cls, path: str) -> "FoodDatabase":
+        """Builds an in-memory database from a JSON file of foods."""
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        database = cls()
+        database.add_foods(data["foods"] if isinstance(data, dict) else data)
+        return database
+
+    def add_foods(self, foods: Iterable[Dict[str, Any]]) -> None:
+        """
+        Inserts foods. Each food has an id, name, serving, per-serving calories,
+        protein, carbs, fat (and optionally fiber), `meal_types`, `diet_tags`
+        and `allergens`. The gluten_free and dairy_free tags are derived from
+        the allergens.
+        """
+        with self._lock, self._conn:
+            for food in foods:
+                food_id = food["id"]
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO foods VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (food_id, food["name"], food.get("serving"), food["calories"], food["protein"],
+                     food["carbs"], food["fat"], food.get("fiber", 0)),
+                )
+                allergens = set(normalize_allergens(food.get("allergens")))
+                tags = set(normalize_diet_tags(food.get("diet_tags")))
+                if "gluten" not in allergens:
+                    tags.add("gluten_free")
+                if "dairy" not in allergens:
+                    tags.add("dairy_free")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO food_meal_types VALUES (?, ?, ?)",
+                    [(m.lower(), food["calories"], food_id) for m in food.get("meal_types", [])],
+                )
+                self._conn.executemany("INSERT OR REPLACE INTO food_tags VALUES (?, ?)", [(t, food_id) for t in tags])
+                self._conn.executemany("INSERT OR REPLACE INTO food_allergens VALUES (?, ?)", [(a, food_id) for a in allergens])
+
+    def _build_sql(self, query: FoodQuery) -> tuple[str, list]:
+        if query.meal_type:
+            sql = ["SELECT f.* FROM food_meal_types m JOIN foods f ON f.id = m.food_id WHERE m.meal_type = ?"]
+            params: list = [query.meal_type]
+            calories_column = "m.calories"
+        else:
+            sql = ["SELECT f.* FROM foods f WHERE 1 = 1"]
+            params = []
+            calories_column = "f.calories"
+
+        for macro in _MACROS:
+            column = calories_column if macro == "calories" else f"f.{macro}"
+            low, high = getattr(query, f"min_{macro}"), getattr(query, f"max_{macro}")
+            if low is not None:
+                sql.append(f"AND {column} >= ?")
+                params.append(low)
+            if high is not None:
+                sql.append(f"AND {column} <= ?")
+                params.append(high)
+
+        for tag in query.diet_tags:
+            sql.append("AND f.id IN (SELECT food_id FROM food_tags WHERE tag = ?)")
+            params.append(tag)
+        if query.exclude_allergens:
+            placeholders = ", ".join("?" for _ in query.exclude_allergens)
+            sql.append(f"AND f.id NOT IN (SELECT food_id FROM food_allergens WHERE allergen IN ({placeholders}))")
+            params.extend(query.exclude_allergens)
+        for term in query.exclude_terms:
+            # Deliberately broad: excluding a food too many is the safe side.
+            pattern = re.sub(r"([%_\\])", r"\\\1", _name_stem(term))
+            sql.append("AND lower(f.name) NOT LIKE ? ESCAPE '\\'")
+            params.append(f"%{pattern}%")
+
+        column, _, direction = query.order_by.partition(" ")
+        if column not in _MACROS or direction.upper() not in ("ASC", "DESC", ""):
+            raise ValueError(f"Invalid order_by: {query.order_by!r}")
+        sql.append(f"ORDER BY f.{column} {direction or 'ASC'}, f.id LIMIT ?")
+        params.append(query.limit)
+        return " ".join(sql), params
+
+    def search(self, query: FoodQuery) -> List[Dict[str, Any]]:
+        """Returns foods matching every filter of `query`."""
+        sql, params = self._build_sql(query)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            foods = [dict(row) for row in rows]
+            for food in foods:
+                food["diet_tags"] = [r[0] for r in self._conn.execute(
+                    "SELECT tag FROM food_tags WHERE food_id = ? ORDER BY tag", (food["id"],))]
+                food["allergens"] = [r[0] for r in self._conn.execute(
+                    "SELECT allergen FROM food_allergens WHERE food_id = ? ORDER BY allergen", (food["id"],))]
+        return foods
+
+    def explain(self, query: FoodQuery) -> List[str]:
+        """Returns SQLite's query plan for `query` (useful to check index usage)."""
+        sql, params = self._build_sql(query)
+        with self._lock:
+            return [row[-1] for row in self._conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+_database: Optional[FoodDatabase] = None
+_database_lock = threading.Lock()
+
+
+def get_food_database() -> FoodDatabase:
+    """Returns the process-wide food database, loading it on first use."""
+    global _database
+    if _database is None:
+        with _database_lock:
+            if _database is None:
+                if FOOD_DATABASE_PATH.endswith(".json"):
+                    _database = FoodDatabase.from_json(FOOD_DATABASE_PATH)
+                else:
+                    _database = FoodDatabase(FOOD_DATABASE_PATH)
+    return _database
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic meal-plan solver that hits calorie and macro targets."""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+import google.adk.tools as ToolContext
+import numpy as np
+
+from heracles_ai.shared_libraries.constants import CMC_KEY
+from heracles_ai.shared_libraries.log import get_logger
+from heracles_ai.shared_libraries.types import load_user_profile
+from heracles_ai.tools.cmc import calculate_needs_batch
+from heracles_ai.tools.food import (
+    FoodDatabase,
+    FoodQuery,
+    get_food_database,
+    normalize_diet_tags,
+    split_allergies,
+)
+
+logger = get_logger("meal_planner")
+
+# Meal slots of a day with their share of the daily calories and a default time.
+MEAL_SLOTS = (
+    ("breakfast", "Breakfast", 0.25, "08:00"),
+    ("lunch", "Lunch", 0.30, "12:30"),
+    ("snack", "Snack", 0.15, "15:30"),
+    ("dinner", "Dinner", 0.30, "19:00"),
+)
+
+# Serving multipliers the solver may pick for a food.
+SERVING_SIZES = (0.5, 0.75, 1.0, 1.25, 1.5, 2.0)
+
+# Relative weight of each target in the objective.
+_WEIGHTS = {"calories": 4.0, "protein": 2.0, "carbs": 1.0, "fat": 1.0}
+
+# Objective penalties for repeating a food from an earlier day or the same day.
+_REPEAT_PENALTY = 0.01
+_DUPLICATE_PENALTY = 0.05
+
+_MACROS = ("calories", "protein", "carbs", "fat")
+
+
+def _candidates(database: FoodDatabase, meal_type: str, diet_tags: List[str],
+                exclude_allergens: List[str], exclude_terms: List[str]) -> List[Dict[str, Any]]:
+    return database.search(FoodQuery(
+        meal_type=meal_type,
+        diet_tags=diet_tags,
+        exclude_allergens=exclude_allergens,
+        exclude_terms=exclude_terms,
+        order_by="calories ASC",
+        limit=500,
+    ))
+
+
+class _SlotOptions:
+    """All (food, serving size) options of a meal slot as NumPy arrays."""
+
+    def __init__(self, foods: List[Dict[str, Any]]):
+        self.foods = [food for food in foods for _ in SERVING_SIZES]
+        self.sizes = np.tile(np.asarray(SERVING_SIZES), len(foods))
+        per_serving = np.asarray([[food[m] for m in _MACROS] for food in foods], dtype=np.float64)
+        self.values = np.repeat(per_serving, len(SERVING_SIZES), axis=0) * self.sizes[:, None]
+        self.food_ids = np.asarray([food["id"] for food in self.foods])
+
+
+def _solve_day(options: List[_SlotOptions], targets: np.ndarray, used: set, passes: int = 6) -> List[int]:
+    """
+    Picks one option per slot minimizing the weighted sum of squared relative
+    deviations of the day totals from the targets. Starts from the best
+    per-slot greedy choice and improves it by coordinate descent (re-choosing
+    one slot at a time against the totals of the others).
+
+    Returns:
+        The chosen option index of every slot.
+    """
+    weights = np.asarray([_WEIGHTS[m] for m in _MACROS]) / np.square(targets)
+    used_penalty = [np.where(np.isin(o.food_ids, list(used)), _REPEAT_PENALTY, 0.0) for o in options]
+
+    def scores(i, rest, chosen_ids):
+        deviation = rest + options[i].values - targets
+        score = np.square(deviation) @ weights + used_penalty[i]
+        # Avoid serving the same food twice on one day.
+        return score + np.where(np.isin(options[i].food_ids, chosen_ids), _DUPLICATE_PENALTY, 0.0)
+
+    # Greedy start: each slot matches its share of the daily targets.
+    chosen = []
+    for i, (_, _, share, _) in enumerate(MEAL_SLOTS):
+        rest = targets * (1 - share)
+        chosen.append(int(np.argmin(scores(i, rest, [options[j].food_ids[c] for j, c in enumerate(chosen)]))))
+
+    for _ in range(passes):
+        improved = False
+        for i in range(len(options)):
+            others = [j for j in range(len(options)) if j != i]
+            rest = sum(options[j].values[chosen[j]] for j in others)
+            slot_scores = scores(i, rest, [options[j].food_ids[chosen[j]] for j in others])
+            best = int(np.argmin(slot_scores))
+            if slot_scores[best] < slot_scores[chosen[i]] - 1e-12:
+                chosen[i], improved = best, True
+        if not improved:
+            break
+    return chosen
+
+
+def solve_meal_plan(
+    targets: Dict[str, float],
+    diet_tags: Optional[Sequence[str]] = None,
+    exclude_allergens: Optional[Sequence[str]] = None,
+    days: int = 1,
+    tolerance: float = 0.05,
+    database: Optional[FoodDatabase] = None,
+) -> Dict[str, Any]:
+    """
+    Builds a meal plan whose daily totals match calorie and macro targets.
+
+    Each day has a breakfast, lunch, snack and dinner. For every slot the
+    solver picks a food from the food database and a serving multiplier,
+    minimizing the weighted squared relative deviation of the day's totals
+    from the targets. Foods are rotated across days when that costs little.
+
+    Args:
+        targets: Daily targets with `calories`, `protein`, `carbs` and `fat` keys.
+        diet_tags: Diet tags every food must have (e.g. ["vegetarian"]).
+        exclude_allergens: Allergies no food may contain. Allergies outside
+            the database allergens (e.g. "banana") exclude the foods named
+            after them.
+        days: Number of days to plan.
+        tolerance: Allowed relative deviation of the daily calories; macros
+            are allowed twice this deviation.
+        database: The food database (defaults to the process-wide one).
+
+    Returns:
+        A diet plan with `days`, each holding `meals`, `totals` and
+        `within_tolerance`, or an `error` when a slot has no candidate food.
+        `excluded_allergens` lists every allergy applied; those matched by
+        food name only are repeated in `unmatched_allergies`, as a food may
+        still contain them as an ingredient.
+    """
+    database = database or get_food_database()
+    diet_tags = normalize_diet_tags(diet_tags)
+    allergens, unmatched = split_allergies(exclude_allergens)
+    exclude_allergens = allergens + unmatched
+    target_values = np.asarray([float(targets[m]) for m in _MACROS])
+    if not np.all(target_values > 0):
+        return {"error": f"Targets must be positive numbers: {targets}"}
+
+    options = []
+    for meal_type, _, _, _ in MEAL_SLOTS:
+        foods = _candidates(database, meal_type, diet_tags, allergens, unmatched)
+        if not foods:
+            return {"error": f"No {meal_type} foods match diet tags {diet_tags} without allergens {exclude_allergens}."}
+        options.append(_SlotOptions(foods))
+
+    plan_days = []
+    used: set = set()
+    for day in range(1, days + 1):
+        chosen = _solve_day(options, target_values, used)
+        meals = []
+        day_totals = np.zeros(len(_MACROS))
+        for slot_options, index, (_, label, _, time) in zip(options, chosen, MEAL_SLOTS):
+            food, values = slot_options.foods[index], slot_options.values[index]
+            used.add(food["id"])
+            day_totals += values
+            meals.append({
+                "name": label,
+                "time": time,
+                "description": food["name"],
+                "servings": float(slot_options.sizes[index]),
+                "serving_size": food["serving"],
+                "calories": round(values[0]),
+                "macros": {"protein": round(values[1]), "carbs": round(values[2]), "fat": round(values[3])},
+            })
+        totals = {m: round(v) for m, v in zip(_MACROS, day_totals)}
+        deviation = {m: round(float((v - t) / t), 3) for m, v, t in zip(_MACROS, day_totals, target_values)}
+        plan_days.append({
+            "day": day,
+            "meals": meals,
+            "totals": totals,
+            "deviation": deviation,
+            "within_tolerance": abs(deviation["calories"]) <= tolerance
+            and all(abs(deviation[m]) <= 2 * tolerance for m in _MACROS[1:]),
+        })
+
+    return {
+        "daily_calories": round(target_values[0]),
+        "targets": dict(zip(_MACROS, (round(t) for t in target_values))),
+        "diet_tags": diet_tags,
+        "excluded_allergens": exclude_allergens,
+        "unmatched_allergies": unmatched,
+        "days": plan_days,
+    }
+
+
+def _targets_from_cmc(cmc: Any) -> Optional[Dict[str, float]]:
+    """Extracts daily targets from the `cmc` state value (a dict or JSON text)."""
+    if isinstance(cmc, str):
+        match = re.search(r"\{.*\}", cmc, re.DOTALL)
+        if not match:
+            return None
+        try:
+            cmc = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return None
+    if not isinstance(cmc, dict):
+        return None
+    cmc = cmc.get("results", cmc)
+    try:
+        return {
+            "calories": float(cmc["estimated_daily_calories"]),
+            "protein": float(cmc["protein_grams"]),
+            "carbs": float(cmc["carbohydrate_grams"]),
+            "fat": float(cmc["fat_grams"]),
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def meal_plan_tool(days: int, tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Generates a meal plan that meets the user's confirmed calorie and macro
+    targets, respecting their dietary preferences and food allergies.
+
+    Uses the `cmc` results in session state; if they are missing, the targets
+    are calculated from the user profile.
+
+    Args:
+        days: Number of days to plan (1 for a day, 7 for a week).
+        tool_context: The ADK tool context containing session state.
+
+    Returns:
+        The meal plan (per-day meals with servings, calories and macros, and
+        daily totals), or an error message.
+    """
+    profile = load_user_profile(tool_context.state)
+
+    targets = _targets_from_cmc(tool_context.state.get(CMC_KEY))
+    if targets is None:
+        result = calculate_needs_batch([profile.cmc_inputs()])[0] if profile else {"error": "User profile not found in session state."}
+        if "error" in result:
+            return {"error": f"Calorie and macro targets are not available: {result['error']}"}
+        targets = _targets_from_cmc(result)
+
+    days = max(1, min(int(days or 1), 14))
+    logger.debug("Solving %d day(s) for targets %s", days, targets)
+    return solve_meal_plan(
+        targets,
+        diet_tags=list(profile.dietary_preferences) if profile else None,
+        exclude_allergens=list(profile.food_allergies) if profile else None,
+        days=days,
+    )
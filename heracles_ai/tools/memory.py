@@ -15,17 +15,32 @@
 
 """The 'memorize' tool for agents to manage session state (user profile, etc.)."""
 
-from datetime import datetime
+import copy
+from datetime import date, datetime
 import json
+import math
 import os
-from typing import Any, Dict, Optional  # Import Optional
+from typing import Any, Dict, List, Optional, Type  # Import Optional
 
 import google.adk as adk
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.sessions.state import State
 from google.adk.tools import ToolContext
+from pydantic import BaseModel, ValidationError
 
 from heracles_ai.shared_libraries import constants  # Import constants from shared_libraries
+from heracles_ai.shared_libraries.log import get_logger
+from heracles_ai.shared_libraries.types import (
+    MealLog,
+    WorkoutSession,
+    parse_structured,
+    resolve_activity_level,
+    resolve_goal,
+    validation_errors,
+)
+from heracles_ai.tools.cmc import PROFILE_FIELDS
+
+logger = get_logger("memory")
 
 # Assuming constants will be defined in shared_libraries
 # from heracles_ai.shared_libraries import constants
@@ -36,12 +51,69 @@ SAMPLE_SCENARIO_PATH = os.getenv(
 )
 
 
+# Keys whose change can alter the calories and macros calculation.
+_CMC_INPUT_KEYS = frozenset((constants.PROFILE_KEY, *PROFILE_FIELDS))
+
+
+def _invalidate_derived_state(key: str, mem_dict: State | dict[str, Any]) -> None:
+    """
+    Updates the state derived from a key that was just written: the memoized
+    calories and macros result is dropped when one of its inputs changed.
+    """
+    if key in _CMC_INPUT_KEYS and mem_dict.get(constants.CMC_MEMO_KEY) is not None:
+        mem_dict[constants.CMC_MEMO_KEY] = None
+
+
+# --- Lists ---
+# Lists written by the memory tools are plain, ordered JSON lists in the
+# session state; nothing else is stored next to them, so a list written
+# elsewhere (a scenario, a direct state edit) needs no extra bookkeeping.
+#
+# memorize_list and forget are O(n) in the list length: each call copies
+# the list and writes it back, which is what records the state delta, so a
+# membership index could not make them cheaper than one scan. memorize_many
+# builds a set from the list once per call, so adding m values costs
+# O(n + m) rather than O(n * m).
+
+
+def _item_key(item: Any) -> str:
+    """Returns the JSON text of a list item, used as its key in a membership set."""
+    return json.dumps(item, sort_keys=True)
+
+
+def _load_list(key: str, mem_dict: State | dict[str, Any]) -> list:
+    """
+    Returns a copy of the list stored under a key.
+
+    Args:
+        key: The state key of the list.
+        mem_dict: The session state.
+
+    Returns:
+        The list (a new empty list if the key is not set; a single stored
+        value is wrapped in a list).
+    """
+    items = mem_dict.get(key)
+    if items is None:
+        return []
+    # Ensure the state item is a list
+    return list(items) if isinstance(items, list) else [items]
+
+
+def _store_list(key: str, items: list, mem_dict: State | dict[str, Any]) -> None:
+    """Writes a list back, so the change is recorded as a state delta."""
+    # If list becomes empty, remove the key itself
+    mem_dict[key] = items if items else None
+    _invalidate_derived_state(key, mem_dict)
+
+
 # Define the memorize_list tool function
 def memorize_list(key: str, value: str, tool_context: ToolContext) -> Dict[str, str]:  # Changed value type to str
     """
     Memorizes a piece of information by appending it to a list associated with a key.
     Assumes the value provided is a string representation of the item to be added.
-    If the key doesn't exist, it creates a new list.
+    If the key doesn't exist, it creates a new list. A user profile list field
+    (e.g. "food_allergies") is appended to in the user profile.
 
     Args:
         key: The label (key) for the list in the session state (e.g., "dietary_restrictions").
@@ -52,19 +124,54 @@ def memorize_list(key: str, value: str, tool_context: ToolContext) -> Dict[str,
         A status message confirming the addition.
     """
     mem_dict = tool_context.state
-    if key not in mem_dict:
-        mem_dict[key] = []
-    # Ensure the state item is a list
-    if not isinstance(mem_dict[key], list):
-        # Handle error or convert - converting existing value to a list with the new one
-        mem_dict[key] = [mem_dict[key]]
-
-    if value not in mem_dict[key]:
-        mem_dict[key].append(value)
-        return {"status": f'Added "{value}" to list "{key}"'}
-    else:
+    if _PROFILE_FIELD_TYPES.get(key) is list:
+        return _add_to_profile_list(key, [value], mem_dict)
+    items = _load_list(key, mem_dict)
+    if value in items:
         return {"status": f'"{value}" already exists in list "{key}"'}
 
+    items.append(value)
+    _store_list(key, items, mem_dict)
+    return {"status": f'Added "{value}" to list "{key}"'}
+
+
+def memorize_many(key: str, values: List[str], tool_context: ToolContext) -> Dict[str, str]:
+    """
+    Memorizes several pieces of information at once by appending them to the
+    list associated with a key, skipping values that are already in it. A user
+    profile list field (e.g. "food_allergies") is appended to in the user
+    profile.
+
+    Args:
+        key: The label (key) for the list in the session state (e.g., "dietary_restrictions").
+        values: The string values to add to the list, in order.
+        tool_context: The ADK tool context.
+
+    Returns:
+        A status message listing the added and the skipped values.
+    """
+    mem_dict = tool_context.state
+    if _PROFILE_FIELD_TYPES.get(key) is list:
+        return _add_to_profile_list(key, list(values), mem_dict)
+    items = _load_list(key, mem_dict)
+    present = {_item_key(item) for item in items}
+    added, skipped = [], []
+    for value in values:
+        item_key = _item_key(value)
+        if item_key in present:
+            skipped.append(value)
+            continue
+        items.append(value)
+        present.add(item_key)
+        added.append(value)
+
+    if added:
+        _store_list(key, items, mem_dict)
+    status = f'Added {len(added)} value(s) to list "{key}"'
+    if skipped:
+        status += f"; already present: {', '.join(skipped)}"
+    return {"status": status}
+
 
 # Define the memorize tool function
 def memorize(key: str, value: str, tool_context: ToolContext) -> Dict[str, str]:  # Changed value type to str
@@ -82,14 +189,264 @@ def memorize(key: str, value: str, tool_context: ToolContext) -> Dict[str, str]:
     """
     mem_dict = tool_context.state
     mem_dict[key] = value
+    _invalidate_derived_state(key, mem_dict)
     return {"status": f'Stored "{key}": "{value}"'}
 
 
+# --- Profile batch ---
+# Type of each known user profile field. Enum fields list their valid values;
+# fields not listed here are stored as given.
+_PROFILE_FIELD_TYPES: Dict[str, Any] = {
+    "name_surname": str,
+    "age": int,
+    "sex": ("male", "female"),
+    "gender": str,
+    "height_cm": float,
+    "weight_kg": float,
+    "activity_level": "activity_level",
+    "fitness_level": str,
+    "fitness_goals": list,
+    "dietary_preferences": list,
+    "fitness_preferences": list,
+    "food_allergies": list,
+    "health_conditions": list,
+    "equipment_available": list,
+    "preferred_workout_times": list,
+    "program_start_date": "date",
+    "program_end_date": "date",
+}
+
+
+def _normalize_enum(value: Any) -> str:
+    return str(value).strip().lower().replace(" ", "_").replace("-", "_")
+
+
+def _profile_list_items(field: str, value: Any) -> List[str]:
+    """Returns the items of a profile list value as stored (stripped; goals normalized)."""
+    items = value if isinstance(value, list) else [value]
+    items = [str(item).strip() for item in items if str(item).strip()]
+    return [_normalize_enum(item) for item in items] if field == "fitness_goals" else items
+
+
+def _check_goals(goals: List[str]) -> None:
+    """Raises ValueError unless at least one goal maps to a calorie adjustment."""
+    if resolve_goal(goals) is None:
+        raise ValueError(f"no goal maps to one of {list(constants.GOAL_ADJUSTMENTS)}, got {goals!r}")
+
+
+def _coerce_profile_field(field: str, value: Any) -> Any:
+    """
+    Converts a profile value to the type of its field.
+
+    Args:
+        field: The profile field name.
+        value: The value given by the model.
+
+    Returns:
+        The converted value.
+
+    Raises:
+        ValueError: If the value does not fit the field.
+    """
+    kind = _PROFILE_FIELD_TYPES.get(field)
+    if kind is None:
+        return value
+    if isinstance(value, bool):
+        raise ValueError(f"expected {getattr(kind, '__name__', kind)}, got a boolean")
+
+    if kind is int:
+        number = float(value)
+        if not number.is_integer() or number <= 0:
+            raise ValueError(f"expected a positive whole number, got {value!r}")
+        return int(number)
+    if kind is float:
+        number = float(value)
+        if not math.isfinite(number) or number <= 0:
+            raise ValueError(f"expected a positive number, got {value!r}")
+        return number
+    if kind is str:
+        return str(value).strip()
+    if kind == "date":
+        return date.fromisoformat(str(value).strip()).isoformat()
+    if kind is list:
+        items = _profile_list_items(field, value)
+        if field == "fitness_goals":
+            _check_goals(items)
+        return items
+    if kind == "activity_level":
+        level = resolve_activity_level(value)
+        if level is None:
+            raise ValueError(f"must be one of {list(constants.ACTIVITY_MULTIPLIERS)}, got {value!r}")
+        return level
+
+    # Enum field.
+    normalized = _normalize_enum(value)
+    if normalized not in kind:
+        raise ValueError(f"must be one of {list(kind)}, got {value!r}")
+    return normalized
+
+
+def memorize_profile(fields: Dict[str, Any], tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Memorizes several user profile fields in one call.
+
+    Known fields are validated and converted: age (whole number), height_cm and
+    weight_kg (numbers), sex (male or female), activity_level (sedentary,
+    lightly_active, moderately_active, very_active, extra_active, or a common
+    synonym such as "moderate"), fitness_goals (at least one of lose_weight,
+    maintain_weight or gain_weight, or a synonym such as "build muscle"),
+    list fields such as food_allergies (a list of strings) and program dates
+    (YYYY-MM-DD). If any field is invalid nothing is stored.
+
+    Args:
+        fields: Profile field names mapped to their values,
+            e.g. {"name_surname": "Jane Doe", "age": 30, "height_cm": 168}.
+        tool_context: The ADK tool context.
+
+    Returns:
+        A status message listing the stored fields, or an error with the
+        invalid fields and what is wrong with them.
+    """
+    if not isinstance(fields, dict) or not fields:
+        return {"error": "No profile fields given. Pass a JSON object of field names and values."}
+
+    converted, invalid = {}, {}
+    for field, value in fields.items():
+        try:
+            converted[field] = _coerce_profile_field(field, value)
+        except (TypeError, ValueError) as e:
+            invalid[field] = str(e)
+    if invalid:
+        logger.warning("Rejected profile fields: %s", invalid)
+        return {"error": "Invalid profile fields; nothing was stored.", "invalid_fields": invalid}
+
+    mem_dict = tool_context.state
+    profile = mem_dict.get(constants.PROFILE_KEY)
+    profile = dict(profile) if isinstance(profile, dict) else {}
+    profile.update(converted)
+    # One assignment, so all fields land in the same state delta.
+    mem_dict[constants.PROFILE_KEY] = profile
+    _invalidate_derived_state(constants.PROFILE_KEY, mem_dict)
+    logger.debug("Stored profile fields: %s", sorted(converted))
+    return {"status": f"Stored profile fields: {', '.join(converted)}"}
+
+
+def _profile_list(field: str, mem_dict: State | dict[str, Any]) -> tuple[Dict[str, Any], List[Any]]:
+    """Returns a copy of the user profile and of one of its list fields."""
+    profile = mem_dict.get(constants.PROFILE_KEY)
+    profile = dict(profile) if isinstance(profile, dict) else {}
+    items = profile.get(field)
+    return profile, list(items) if isinstance(items, list) else [items] if items else []
+
+
+def _forget_profile_list(field: str, value: Optional[str], mem_dict: State | dict[str, Any]) -> Dict[str, str]:
+    """Removes a user profile list field, or one value from it."""
+    profile, items = _profile_list(field, mem_dict)
+    if not items:
+        return {"status": f'Profile field "{field}" not found in memory.'}
+    if value is None:
+        items = []
+    else:
+        removed = [item for item in _profile_list_items(field, value) if item in items]
+        if not removed:
+            return {"status": f'Value "{value}" not found in profile field "{field}"'}
+        items = [item for item in items if item not in removed]
+    if items:
+        profile[field] = items
+    else:
+        profile.pop(field)
+    mem_dict[constants.PROFILE_KEY] = profile
+    _invalidate_derived_state(constants.PROFILE_KEY, mem_dict)
+    if value is None:
+        return {"status": f'Removed profile field "{field}"'}
+    return {"status": f'Removed value "{value}" from profile field "{field}"'}
+
+
+def _add_to_profile_list(field: str, values: List[Any], mem_dict: State | dict[str, Any]) -> Dict[str, Any]:
+    """
+    Appends values to a list field of the user profile, skipping those already in it.
+
+    Profile lists (food_allergies, dietary_preferences, ...) are read from the
+    user profile by the planning tools, so they are never stored as top-level
+    keys. Goals are checked on the merged list: a goal with no calorie
+    adjustment (e.g. "run a marathon") can be added next to one that has.
+    """
+    values = _profile_list_items(field, values)
+    profile, items = _profile_list(field, mem_dict)
+    added = [value for i, value in enumerate(values) if value not in items and value not in values[:i]]
+    skipped = [value for value in values if value not in added]
+    if field == "fitness_goals":
+        try:
+            _check_goals(items + added)
+        except ValueError as e:
+            return {"error": f"Invalid {field}; nothing was stored.", "invalid_fields": {field: str(e)}}
+    if added:
+        profile[field] = items + added
+        mem_dict[constants.PROFILE_KEY] = profile
+        _invalidate_derived_state(constants.PROFILE_KEY, mem_dict)
+    status = f'Added {len(added)} value(s) to profile field "{field}"'
+    if skipped:
+        status += f"; already present: {', '.join(skipped)}"
+    return {"status": status}
+
+
+# --- Structured logs ---
+def _log_record(key: str, schema: Type[BaseModel], record: Any, mem_dict: State | dict[str, Any]) -> Dict[str, Any]:
+    """Validates a log entry and appends it, as a plain dict, to the list under a key."""
+    try:
+        entry = parse_structured(schema, record).model_dump(exclude_none=True)
+    except ValidationError as e:
+        invalid = validation_errors(e)
+        logger.warning("Rejected %s entry: %s", key, invalid)
+        return {"error": f"Invalid {schema.__name__}; nothing was stored.", "invalid_fields": invalid}
+
+    items = _load_list(key, mem_dict)
+    if entry in items:
+        return {"status": f"This entry is already in {key}", "entry": entry}
+    items.append(entry)
+    _store_list(key, items, mem_dict)
+    return {"status": f"Logged to {key}", "entry": entry}
+
+
+def log_workout_session(session: WorkoutSession, tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Logs a workout the user did to their workout history.
+
+    Args:
+        session: The workout: date (YYYY-MM-DD) and type are required;
+            duration_minutes, intensity, calories_burned, and for strength
+            work focus, sets, reps and weight_kg, when the user gave them.
+        tool_context: The ADK tool context.
+
+    Returns:
+        The stored entry, or an error with the invalid fields.
+    """
+    return _log_record(constants.WORKOUT_SESSIONS_KEY, WorkoutSession, session, tool_context.state)
+
+
+def log_meal(meal: MealLog, tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Logs a meal the user ate to their meal history.
+
+    Args:
+        meal: The meal: date (YYYY-MM-DD), name (e.g. Breakfast) and
+            calories are required; time, description and macros (grams of
+            protein, carbs and fat) when known.
+        tool_context: The ADK tool context.
+
+    Returns:
+        The stored entry, or an error with the invalid fields.
+    """
+    return _log_record(constants.MEALS_KEY, MealLog, meal, tool_context.state)
+
+
 # Define the forget tool function (optional, but good practice)
 def forget(key: str, tool_context: ToolContext, value: Optional[str] = None) -> Dict[str, str]:  # Changed value type to Optional[str]
     """
     Forgets a piece of information. If only key is provided, removes the entire key.
     If key and value are provided, removes the string value from the list associated with the key.
+    A user profile list field (e.g. "food_allergies") is removed from, or
+    removed with the value from, the user profile.
 
     Args:
         key: The label (key) of the information to forget.
@@ -100,34 +457,31 @@ def forget(key: str, tool_context: ToolContext, value: Optional[str] = None) ->
         A status message confirming the removal.
     """
     mem_dict = tool_context.state
-    if key not in mem_dict:
+    if _PROFILE_FIELD_TYPES.get(key) is list:
+        return _forget_profile_list(key, value, mem_dict)
+    # ADK state has no item deletion: a key is forgotten by setting it to None,
+    # which the persistent session service stores as a deletion.
+    if mem_dict.get(key) is None:
         return {"status": f'Key "{key}" not found in memory.'}
 
     if value is None:
         # Forget the entire key
-        try:
-            del mem_dict[key]
-            return {"status": f'Removed key "{key}"'}
-        except KeyError:
-            return {"status": f'Key "{key}" not found in memory.'}  # Should not happen due to check above, but safe
-    else:
-        # Forget a specific value from a list
-        if isinstance(mem_dict.get(key), list):
-            try:
-                mem_dict[key].remove(value)
-                # If list becomes empty, optionally remove the key itself
-                if not mem_dict[key]:
-                    del mem_dict[key]
-                    return {"status": f'Removed value "{value}" from "{key}" and the key itself as it became empty.'}
-                return {"status": f'Removed value "{value}" from list "{key}"'}
-            except ValueError:
-                return {"status": f'Value "{value}" not found in list "{key}"'}
-        else:
-            # Handle case where key exists but is not a list, or doesn't exist
-            if key in mem_dict:
-                return {"status": f'Cannot remove specific value from non-list key "{key}"'}
-            else:  # Should not happen due to initial check
-                return {"status": f'Key "{key}" not found in memory.'}
+        mem_dict[key] = None
+        _invalidate_derived_state(key, mem_dict)
+        return {"status": f'Removed key "{key}"'}
+
+    # Forget a specific value from a list
+    if not isinstance(mem_dict[key], list):
+        return {"status": f'Cannot remove specific value from non-list key "{key}"'}
+    items = _load_list(key, mem_dict)
+    try:
+        items.remove(value)
+    except ValueError:
+        return {"status": f'Value "{value}" not found in list "{key}"'}
+    _store_list(key, items, mem_dict)
+    if not items:
+        return {"status": f'Removed value "{value}" from "{key}" and the key itself as it became empty.'}
+    return {"status": f'Removed value "{value}" from list "{key}"'}
 
 
 def _set_initial_states(source: Dict[str, Any], target: State | dict[str, Any]):
@@ -159,28 +513,64 @@ def _set_initial_states(source: Dict[str, Any], target: State | dict[str, Any]):
     #     target[constants.USER_GOAL] = user_profile.get(constants.FITNESS_GOALS)
 
 
-def _load_precreated_profile(callback_context: CallbackContext):
+# Process-wide cache of parsed scenario files: path -> (mtime, initial state).
+_SCENARIO_CACHE: Dict[str, tuple[Optional[float], Dict[str, Any]]] = {}
+
+
+def _read_scenario(path: str) -> Dict[str, Any]:
     """
-    Sets up the initial state by loading a profile from a JSON file.
-    Intended to be used as a `before_agent_callback` for the root agent.
-    This gets called before the system instruction is constructed.
+    Returns the initial state stored in a scenario file, parsing it only when
+    the file is seen for the first time or its modification time changed.
 
     Args:
-        callback_context: The callback context provided by ADK.
+        path: Path of the scenario JSON file.
+
+    Returns:
+        The "state" object of the scenario, or an empty dict when the file is
+        missing or cannot be decoded.
     """
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+
+    cached = _SCENARIO_CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
     data = {}
     try:
-        with open(SAMPLE_SCENARIO_PATH, "r", encoding="utf-8") as file:
+        with open(path, "r", encoding="utf-8") as file:
             data = json.load(file)
-            print(f"\nLoading Initial State from {SAMPLE_SCENARIO_PATH}: {json.dumps(data, indent=2)}\n")
+            logger.info("Loading Initial State from %s", path)
     except FileNotFoundError:
-        print(f"\nWarning: Scenario file not found at {SAMPLE_SCENARIO_PATH}. Starting with empty state.\n")
+        logger.warning("Scenario file not found at %s. Starting with empty state.", path)
         # Initialize with a default empty structure if file not found
         data = {"state": {}}  # Or load from diet_empty_default.json structure if preferred
     except json.JSONDecodeError:
-        print(f"\nError: Could not decode JSON from {SAMPLE_SCENARIO_PATH}. Starting with empty state.\n")
+        logger.error("Could not decode JSON from %s. Starting with empty state.", path)
         data = {"state": {}}
 
     # Ensure 'state' key exists in the loaded data
-    initial_state_data = data.get("state", {})
-    _set_initial_states(initial_state_data, callback_context.state)
\ No newline at end of file
+    initial_state = data.get("state", {})
+    _SCENARIO_CACHE[path] = (mtime, initial_state)
+    return initial_state
+
+
+def _load_precreated_profile(callback_context: CallbackContext):
+    """
+    Sets up the initial state by loading a profile from a JSON file.
+    Intended to be used as a `before_agent_callback` for the root agent.
+    This gets called before the system instruction is constructed.
+
+    The scenario is only read for sessions that are not initialized yet, and
+    parsed files are cached process-wide (see `_read_scenario`).
+
+    Args:
+        callback_context: The callback context provided by ADK.
+    """
+    if constants.PROGRAM_INITIALIZED in callback_context.state:
+        return
+
+    initial_state_data = copy.deepcopy(_read_scenario(SAMPLE_SCENARIO_PATH))
+    _set_initial_states(initial_state_data, callback_context.state)
@@ -15,32 +15,66 @@
 
 """Nutrition-related tools for Heracles.AI."""
 
-from typing import Dict
+import sqlite3
+from typing import Any, Dict
+
 import google.adk.tools as ToolContext
 
-# Placeholder function for the nutrition tool
-def nutrition_tool(query: str, tool_context: ToolContext) -> Dict[str, str]:
+from heracles_ai.shared_libraries.log import get_logger
+from heracles_ai.shared_libraries.types import load_user_profile
+from heracles_ai.tools.food import (
+    get_food_database,
+    normalize_diet_tags,
+    parse_food_query,
+    split_allergies,
+)
+
+logger = get_logger("nutrition")
+
+
+def nutrition_tool(query: str, tool_context: ToolContext) -> Dict[str, Any]:
     """
-    (Simulated) Gets meal and snack suggestions aligned with dietary needs and goals.
+    Gets meal and snack suggestions aligned with dietary needs and goals from
+    the local food database.
+
+    The query is turned into indexed filters (meal type, diet tags, allergens,
+    per-serving calorie and macro ranges). The user's `dietary_preferences`
+    and `food_allergies` from the profile are always applied. Allergies the
+    database has no allergen data for (e.g. "banana") exclude the foods named
+    after them, and are returned in `unmatched_allergies`: a food may still
+    contain them as an ingredient, so warn the user about them.
 
     Args:
-        query: A description of the dietary needs (e.g., "vegetarian high-protein snacks").
+        query: A description of the dietary needs (e.g., "vegetarian high-protein snacks under 300 kcal").
         tool_context: The ADK tool context.
 
     Returns:
-        A status message or simulated meal data.
+        A dictionary with the matching foods (per-serving macros) and any
+        `unmatched_allergies`, or a status message.
     """
-    # In a real implementation, this would query a nutrition database or API.
-    print(f"[nutrition_tool called with query: {query}]")
-    # Simulate finding some meal ideas
-    simulated_meals = [
-        {"meal_type": "snack", "name": "Greek Yogurt with Berries"},
-        {"meal_type": "lunch", "name": "Lentil Soup with Whole Wheat Bread"},
-        {"meal_type": "dinner", "name": "Tofu Stir-fry with Brown Rice"}
-    ]
-    # For now, just return a status message. The agent prompt expects this tool
-    # to be used, but the agent itself will generate the plan text.
-    # Alternatively, return the simulated data as a JSON string:
-    # import json
-    # return {"meals": json.dumps(simulated_meals)}
-    return {"status": f"Simulated finding meal suggestions for: {query}"}
+    logger.debug("Called with query: %s", query)
+    food_query = parse_food_query(query)
+
+    unmatched: list = []
+    profile = load_user_profile(tool_context.state)
+    if profile is not None:
+        for tag in normalize_diet_tags(list(profile.dietary_preferences)):
+            if tag not in food_query.diet_tags:
+                food_query.diet_tags.append(tag)
+        allergens, unmatched = split_allergies(list(profile.food_allergies))
+        for allergen in allergens:
+            if allergen not in food_query.exclude_allergens:
+                food_query.exclude_allergens.append(allergen)
+        food_query.exclude_terms.extend(unmatched)
+
+    try:
+        foods = get_food_database().search(food_query)
+    except (OSError, sqlite3.Error, ValueError) as e:
+        logger.error("Error querying the food database: %s", e)
+        return {"error": f"Failed to query the food database: {e}"}
+
+    result: Dict[str, Any] = {"foods": foods} if foods else {
+        "status": f"No foods found for: {query}. Try relaxing the calorie or macro limits."}
+    if unmatched:
+        result["unmatched_allergies"] = unmatched
+    return result
@@ -12,15 +12,35 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""Wrapper to Google Search Grounding with custom prompt."""
+"""Wrapper to Google Search Grounding with custom prompt, with a result cache."""
+
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional
 
 from google.adk.agents import Agent
 from google.adk.tools.agent_tool import AgentTool
+from google.adk.tools.tool_context import ToolContext
 
 from google.adk.tools.google_search_tool import google_search
+from heracles_ai.shared_libraries import metrics
+from heracles_ai.shared_libraries.cache import TTLCache
+from heracles_ai.shared_libraries.models import get_model
+
+# Search results are cached per normalized query for this many seconds.
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("HERACLES_AI_SEARCH_CACHE_TTL_SECONDS", "86400"))
+SEARCH_CACHE_SIZE = int(os.getenv("HERACLES_AI_SEARCH_CACHE_SIZE", "1024"))
+# Optional SQLite file that keeps cached results across restarts and processes.
+SEARCH_CACHE_DB = os.getenv("HERACLES_AI_SEARCH_CACHE_DB", "")
 
 _search_agent = Agent(
-    model="gemini-2.0-flash",
+    model=get_model("google_search_grounding", model="gemini-2.0-flash"),
     name="google_search_grounding",
     description="An agent providing Google-search grounding capability",
     instruction=""",
@@ -31,5 +51,139 @@ _search_agent = Agent(
     tools=[google_search],
 )
 
-google_search_grounding = AgentTool(agent=_search_agent)
+
+def normalize_query(query: str) -> str:
+    """Normalizes a search query so trivially different phrasings share a cache entry."""
+    query = unicodedata.normalize("NFKC", query or "").lower()
+    query = re.sub(r"\s+", " ", query).strip()
+    return query.strip(" ?!.,;:")
+
+
+class SearchCache:
+    """
+    TTL+LRU cache of search results keyed by normalized query, optionally
+    backed by SQLite.
+
+    Lookups go to the in-memory LRU first and then to SQLite; SQLite hits are
+    promoted to memory. Hits and misses are counted in the metrics registry
+    (`heracles_search_cache_requests_total`). On the event loop, use
+    `get_async` and `set_async`, which run the SQLite reads and writes in a
+    worker thread.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = SEARCH_CACHE_SIZE,
+        ttl: float = SEARCH_CACHE_TTL_SECONDS,
+        db_path: Optional[str] = SEARCH_CACHE_DB or None,
+        registry: metrics.MetricsRegistry = metrics.REGISTRY,
+    ):
+        self.ttl = ttl
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.registry = registry
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache "
+                "(query TEXT PRIMARY KEY, result TEXT NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID"
+            )
+            self._db.execute("DELETE FROM search_cache WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        self.registry.inc("heracles_search_cache_requests_total", {"result": "hit" if hit else "miss"})
+
+    def _load(self, key: str) -> Optional[Any]:
+        """Reads an entry from SQLite, promoting it to memory."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result FROM search_cache WHERE query = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        value = json.loads(row[0])
+        self.memory.set(key, value)
+        return value
+
+    def _store(self, key: str, value: Any) -> None:
+        """Writes an entry to SQLite."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO search_cache (query, result, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + self.ttl),
+            )
+            self._db.commit()
+
+    def get(self, query: str) -> Optional[Any]:
+        """Returns the cached result of a query, or None."""
+        key = normalize_query(query)
+        value = self.memory.get(key)
+        if value is None and self._db is not None:
+            value = self._load(key)
+        self._count(value is not None)
+        return value
+
+    async def get_async(self, query: str) -> Optional[Any]:
+        """`get`, with the SQLite read in a worker thread."""
+        key = normalize_query(query)
+        value = self.memory.get(key)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._load, key)
+        self._count(value is not None)
+        return value
+
+    def set(self, query: str, value: Any) -> None:
+        """Caches the result of a query."""
+        key = normalize_query(query)
+        self.memory.set(key, value)
+        if self._db is not None:
+            self._store(key, value)
+
+    async def set_async(self, query: str, value: Any) -> None:
+        """`set`, with the SQLite write in a worker thread."""
+        key = normalize_query(query)
+        self.memory.set(key, value)
+        if self._db is not None:
+            await asyncio.to_thread(self._store, key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hits, misses, hit rate and in-memory size."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "size": len(self.memory),
+        }
+
+
+class CachedAgentTool(AgentTool):
+    """An AgentTool that answers repeated requests from a SearchCache."""
+
+    def __init__(self, agent, cache: Optional[SearchCache] = None, **kwargs):
+        super().__init__(agent=agent, **kwargs)
+        self.cache = cache if cache is not None else SearchCache()
+
+    async def run_async(self, *, args: Dict[str, Any], tool_context: ToolContext) -> Any:
+        query = args["request"] if "request" in args else json.dumps(args, sort_keys=True)
+        cached = await self.cache.get_async(query)
+        if cached is not None:
+            return cached
+        result = await super().run_async(args=args, tool_context=tool_context)
+        if result:
+            await self.cache.set_async(query, result)
+        return result
+
+
+google_search_grounding = CachedAgentTool(agent=_search_agent)
         
\ No newline at end of file
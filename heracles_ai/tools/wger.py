@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pooled and cached client for the WGER exercise API (https://wger.de)."""
+
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from heracles_ai.shared_libraries.cache import TTLCache
+
+# Base URL of the WGER REST API. Point it at a local stub server to run offline.
+WGER_API_URL = os.getenv("WGER_API_URL", "https://wger.de/api/v2")
+
+# WGER language id for English.
+WGER_LANGUAGE_ENGLISH = 2
+
+DEFAULT_TIMEOUT_SECONDS = 10
+DEFAULT_CACHE_TTL_SECONDS = int(os.getenv("WGER_CACHE_TTL_SECONDS", "3600"))
+DEFAULT_CACHE_SIZE = int(os.getenv("WGER_CACHE_SIZE", "256"))
+DEFAULT_PAGE_SIZE = 100
+
+
+def _normalize_params(params: Optional[Dict[str, Any]]) -> Tuple[Tuple[str, str], ...]:
+    """Builds a cache key that does not depend on parameter order or value types."""
+    if not params:
+        return ()
+    return tuple(sorted((str(k), str(v)) for k, v in params.items() if v is not None))
+
+
+class WgerClient:
+    """
+    Client for the WGER REST API.
+
+    All requests share one `requests.Session` (HTTP keep-alive and a connection
+    pool) with retries on transient failures. JSON responses are cached in a
+    TTL+LRU cache keyed by endpoint and normalized query parameters.
+    """
+
+    def __init__(
+        self,
+        base_url: str = WGER_API_URL,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        cache: Optional[TTLCache] = None,
+        session: Optional[requests.Session] = None,
+        retries: int = 3,
+        pool_size: int = 10,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cache = cache if cache is not None else TTLCache(DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL_SECONDS)
+        self.session = session if session is not None else self._create_session(retries, pool_size)
+
+    @staticmethod
+    def _create_session(retries: int, pool_size: int) -> requests.Session:
+        session = requests.Session()
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({"Accept": "application/json"})
+        return session
+
+    def _url(self, endpoint_path: str) -> str:
+        if endpoint_path.startswith(("http://", "https://")):
+            return endpoint_path
+        return f"{self.base_url}/{endpoint_path.lstrip('/')}"
+
+    def fetch(self, endpoint_path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Fetches a single page from the API.
+
+        Args:
+            endpoint_path: The API path (e.g. "/exerciseinfo/") or an absolute URL.
+            params: Optional query parameters.
+
+        Returns:
+            The decoded JSON response.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails.
+            ValueError: If the response is not valid JSON.
+        """
+        url = self._url(endpoint_path)
+        key = (url, _normalize_params(params))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        self.cache.set(key, data)
+        return data
+
+    def fetch_all(
+        self,
+        endpoint_path: str,
+        params: Optional[Dict[str, Any]] = None,
+        max_pages: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetches every page of a paginated endpoint by following `next` links.
+
+        Args:
+            endpoint_path: The API path (e.g. "/exerciseinfo/").
+            params: Optional query parameters for the first page.
+            max_pages: Upper bound on the number of pages to fetch.
+
+        Returns:
+            The concatenated `results` of all pages.
+        """
+        params = {"limit": DEFAULT_PAGE_SIZE, **(params or {})}
+        key = ("all", self._url(endpoint_path), _normalize_params(params))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        results: List[Dict[str, Any]] = []
+        url: Optional[str] = endpoint_path
+        page_params: Optional[Dict[str, Any]] = params
+        for _ in range(max_pages):
+            page = self.fetch(url, page_params)
+            results.extend(page.get("results", []))
+            # The `next` link already carries the query string.
+            url, page_params = page.get("next"), None
+            if not url:
+                break
+
+        self.cache.set(key, results)
+        return results
+
+
+def _clean_html(text: str) -> str:
+    return re.sub(r"<[^>]+>", "", text or "").strip()
+
+
+def format_exercise_info(ex: Dict[str, Any]) -> Dict[str, Any]:
+    """Flattens a WGER /exerciseinfo/ record into what the coach agent needs."""
+    name = ex.get("name")
+    description = ex.get("description", "")
+    # Newer WGER versions keep names and descriptions in per-language translations.
+    for translation in ex.get("translations", []):
+        if translation.get("language") == WGER_LANGUAGE_ENGLISH:
+            name = name or translation.get("name")
+            description = description or translation.get("description", "")
+            break
+    return {
+        "id": ex.get("id"),
+        "name": name,
+        "description": _clean_html(description),
+        "category": (ex.get("category") or {}).get("name"),
+        "muscles": [m.get("name_en") or m.get("name") for m in ex.get("muscles", [])],
+        "equipment": [eq.get("name") for eq in ex.get("equipment", [])],
+    }
+
+
+_default_client: Optional[WgerClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_wger_client() -> WgerClient:
+    """Returns the process-wide WGER client, creating it on first use."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = WgerClient()
+    return _default_client
+
+
+def fetch_wger_data(endpoint_path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Fetches all pages of a WGER endpoint with the shared client.
+
+    Args:
+        endpoint_path: The API path (e.g. "/exerciseinfo/").
+        params: Optional query parameters.
+
+    Returns:
+        A dictionary with a `results` list, in the shape of a WGER page.
+    """
+    return {"results": get_wger_client().fetch_all(endpoint_path, params)}
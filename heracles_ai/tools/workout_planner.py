@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Rule-based workout-plan generator with progressive-overload week templates."""
+
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+import google.adk.tools as ToolContext
+
+from heracles_ai.shared_libraries.log import get_logger
+from heracles_ai.shared_libraries.types import UserProfile, load_user_profile
+from heracles_ai.tools.exercise import ExerciseCatalog, get_exercise_catalog
+
+logger = get_logger("workout_planner")
+
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+DEFAULT_DURATION_WEEKS = 12
+
+# Training sessions per week for each activity level.
+WORKOUTS_PER_WEEK = {
+    "sedentary": 3,
+    "lightly_active": 3,
+    "moderately_active": 4,
+    "very_active": 5,
+    "extra_active": 6,
+}
+
+# Training days (indexes into WEEKDAYS) for a number of sessions per week.
+TRAINING_DAYS = {
+    2: (0, 3),
+    3: (0, 2, 4),
+    4: (0, 1, 3, 4),
+    5: (0, 1, 3, 4, 5),
+    6: (0, 1, 2, 3, 4, 5),
+}
+
+# Session types of a week, by training focus and sessions per week.
+SESSION_TEMPLATES = {
+    "strength": {
+        2: ("full", "full"),
+        3: ("full", "full", "full"),
+        4: ("upper", "lower", "upper", "lower"),
+        5: ("upper", "lower", "cardio", "upper", "lower"),
+        6: ("push", "pull", "lower", "push", "pull", "lower"),
+    },
+    "fat_loss": {
+        2: ("full+cardio", "full+cardio"),
+        3: ("full+cardio", "cardio", "full+cardio"),
+        4: ("full+cardio", "cardio", "full+cardio", "cardio"),
+        5: ("upper+cardio", "cardio", "lower+cardio", "cardio", "full"),
+        6: ("upper+cardio", "cardio", "lower+cardio", "cardio", "full", "cardio"),
+    },
+    "endurance": {
+        2: ("cardio", "full"),
+        3: ("cardio", "full", "cardio"),
+        4: ("cardio", "full", "cardio", "cardio"),
+        5: ("cardio", "full", "cardio", "full", "cardio"),
+        6: ("cardio", "full", "cardio", "cardio", "full", "cardio"),
+    },
+    "general": {
+        2: ("full", "cardio"),
+        3: ("full", "cardio", "full"),
+        4: ("upper", "cardio", "lower", "cardio"),
+        5: ("upper", "cardio", "lower", "cardio", "full"),
+        6: ("upper", "cardio", "lower", "cardio", "full", "cardio"),
+    },
+}
+
+# Exercise categories trained by each strength session type.
+SESSION_CATEGORIES = {
+    "full": ("Legs", "Chest", "Back", "Shoulders", "Abs"),
+    "upper": ("Chest", "Back", "Shoulders", "Arms", "Arms"),
+    "lower": ("Legs", "Legs", "Legs", "Abs"),
+    "push": ("Chest", "Chest", "Shoulders", "Arms"),
+    "pull": ("Back", "Back", "Arms", "Abs"),
+}
+
+# Goal keywords mapped to a training focus; the first match wins.
+GOAL_FOCUS = (
+    ("lose", "fat_loss"), ("fat", "fat_loss"), ("weight_loss", "fat_loss"),
+    ("muscle", "strength"), ("gain", "strength"), ("strength", "strength"), ("bulk", "strength"),
+    ("cardio", "endurance"), ("endurance", "endurance"), ("run", "endurance"), ("marathon", "endurance"),
+)
+
+# Base volume by fitness level: sets per exercise and cardio minutes per session.
+LEVEL_VOLUME = {
+    "beginner": {"sets": 2, "cardio_minutes": 20},
+    "intermediate": {"sets": 3, "cardio_minutes": 30},
+    "advanced": {"sets": 4, "cardio_minutes": 40},
+}
+
+# Progressive-overload blocks of four weeks (three loading weeks and a
+# deload week): extra sets, reps per set and cardio intensity.
+OVERLOAD_BLOCKS = (
+    {"phase": "foundation", "extra_sets": 0, "reps": 12, "intensity": "moderate"},
+    {"phase": "build", "extra_sets": 1, "reps": 10, "intensity": "moderate"},
+    {"phase": "peak", "extra_sets": 1, "reps": 8, "intensity": "vigorous"},
+)
+BLOCK_WEEKS = 4
+
+
+def _as_list(value: Any) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return [str(v) for v in value]
+
+
+def _normalize(value: Any) -> str:
+    return str(value or "").strip().lower().replace(" ", "_").replace("-", "_")
+
+
+def training_focus(fitness_goals: Any) -> str:
+    """Maps the profile's fitness goals to a training focus."""
+    for goal in _as_list(fitness_goals):
+        goal = _normalize(goal)
+        for keyword, focus in GOAL_FOCUS:
+            if keyword in goal:
+                return focus
+    return "general"
+
+
+def week_template(week: int) -> Dict[str, Any]:
+    """
+    Returns the progressive-overload parameters of a program week (1-based).
+
+    Weeks run in blocks of four: three loading weeks whose cardio volume
+    grows by 5% a week, followed by a deload week with one set less, 80%
+    cardio volume and light intensity. Each block raises sets or lowers reps.
+    Week 1 leaves the generated base week unchanged.
+    """
+    block = OVERLOAD_BLOCKS[min((week - 1) // BLOCK_WEEKS, len(OVERLOAD_BLOCKS) - 1)]
+    position = (week - 1) % BLOCK_WEEKS
+    if position == BLOCK_WEEKS - 1:
+        return {"week": week, "phase": "deload", "extra_sets": block["extra_sets"] - 1,
+                "reps": block["reps"], "cardio_factor": 0.8, "intensity": "light"}
+    block_index = OVERLOAD_BLOCKS.index(block)
+    return {"week": week, "phase": block["phase"], "extra_sets": block["extra_sets"], "reps": block["reps"],
+            "cardio_factor": round(1 + 0.1 * block_index + 0.05 * position, 2), "intensity": block["intensity"]}
+
+
+def _duration_weeks(profile: UserProfile) -> int:
+    if not profile.program_start_date or not profile.program_end_date:
+        return DEFAULT_DURATION_WEEKS
+    start = date.fromisoformat(profile.program_start_date)
+    end = date.fromisoformat(profile.program_end_date)
+    return max(1, round((end - start).days / 7))
+
+
+class _ExercisePicker:
+    """Deterministically rotates through the catalog exercises of a category."""
+
+    def __init__(self, catalog: ExerciseCatalog, equipment_available: Optional[Iterable[str]]):
+        self.catalog = catalog
+        self.equipment_available = equipment_available
+        self._pools: Dict[str, List[Dict[str, Any]]] = {}
+        self._next: Dict[str, int] = {}
+
+    def pick(self, category: str) -> Optional[Dict[str, Any]]:
+        if category not in self._pools:
+            self._pools[category] = [
+                ex for ex in self.catalog.search(category, self.equipment_available, limit=1000)
+                if ex["category"] == category
+            ]
+            self._next[category] = 0
+        pool = self._pools[category]
+        if not pool:
+            return None
+        exercise = pool[self._next[category] % len(pool)]
+        self._next[category] += 1
+        return exercise
+
+
+def _render_day(day: Dict[str, Any], template: Dict[str, Any]) -> Dict[str, Any]:
+    """Applies a week template to a base-week day."""
+    exercises = []
+    for exercise in day["exercises"]:
+        exercise = dict(exercise)
+        if "sets" in exercise:
+            exercise["sets"] = max(1, exercise["sets"] + template["extra_sets"])
+            exercise["reps"] = template["reps"]
+        elif exercise.get("duration_minutes"):
+            exercise["duration_minutes"] = int(round(exercise["duration_minutes"] * template["cardio_factor"] / 5) * 5)
+            exercise["intensity"] = template["intensity"]
+        exercises.append(exercise)
+    return {**day, "exercises": exercises}
+
+
+def render_week(fitness_plan: Dict[str, Any], week: int) -> List[Dict[str, Any]]:
+    """
+    Returns the `daily_workouts` of a program week, derived from the plan's
+    first week and the week's progressive-overload template.
+    """
+    return [_render_day(day, week_template(week)) for day in fitness_plan["daily_workouts"]]
+
+
+def generate_fitness_plan(
+    fitness_goals: Any = None,
+    activity_level: Optional[str] = None,
+    equipment_available: Optional[Iterable[str]] = None,
+    preferred_workout_times: Optional[Iterable[str]] = None,
+    duration_weeks: int = DEFAULT_DURATION_WEEKS,
+    fitness_level: Optional[str] = None,
+    catalog: Optional[ExerciseCatalog] = None,
+) -> Dict[str, Any]:
+    """
+    Generates a fitness plan in the `fitness_plan` state shape.
+
+    The weekly split comes from the training focus (derived from the goals)
+    and the number of sessions (derived from the activity level). Exercises
+    are picked from the exercise catalog, restricted to the user's equipment.
+    `daily_workouts` holds week 1; `weekly_progression` lists the
+    progressive-overload template of every week, and `render_week` expands
+    any week into its `daily_workouts`.
+
+    Args:
+        fitness_goals: The profile's goals (string or list).
+        activity_level: One of ACTIVITY_MULTIPLIERS' levels.
+        equipment_available: The profile's equipment list.
+        preferred_workout_times: E.g. ["morning", "evening"]; the first one is used.
+        duration_weeks: Program length in weeks.
+        fitness_level: beginner, intermediate or advanced.
+        catalog: The exercise catalog (defaults to the process-wide one).
+
+    Returns:
+        The fitness plan.
+    """
+    catalog = catalog or get_exercise_catalog()
+    focus = training_focus(fitness_goals)
+    workouts_per_week = WORKOUTS_PER_WEEK.get(_normalize(activity_level), 4)
+    volume = LEVEL_VOLUME.get(_normalize(fitness_level), LEVEL_VOLUME["intermediate"])
+    times = _as_list(preferred_workout_times)
+    picker = _ExercisePicker(catalog, equipment_available)
+
+    sessions = dict(zip(TRAINING_DAYS[workouts_per_week], SESSION_TEMPLATES[focus][workouts_per_week]))
+    base_week = []
+    for index, weekday in enumerate(WEEKDAYS):
+        session = sessions.get(index)
+        exercises: List[Dict[str, Any]] = []
+        if session is None:
+            exercises.append({"name": "Rest", "duration_minutes": 0, "intensity": "none"})
+        for part in (session or "").split("+"):
+            if part == "cardio":
+                cardio = picker.pick("Cardio")
+                exercises.append({
+                    "name": cardio["name"] if cardio else "Brisk Walking",
+                    "duration_minutes": volume["cardio_minutes"] if session == "cardio" else volume["cardio_minutes"] // 2 + 5,
+                    "intensity": "moderate",
+                })
+            elif part:
+                for category in SESSION_CATEGORIES[part]:
+                    exercise = picker.pick(category)
+                    if exercise is not None:
+                        exercises.append({"name": exercise["name"], "sets": volume["sets"], "reps": 12,
+                                          "focus": category.lower()})
+        day = {"day": weekday, "exercises": exercises}
+        if session is not None and times:
+            day["time"] = times[index % len(times)]
+        base_week.append(day)
+
+    duration_weeks = max(1, int(duration_weeks))
+    goals = ", ".join(_as_list(fitness_goals)) or "general fitness"
+    return {
+        "name": f"{duration_weeks}-Week {focus.replace('_', ' ').title()} Plan",
+        "description": f"A {workouts_per_week}-day-a-week program for {goals}, with progressive overload in 4-week blocks.",
+        "duration_weeks": duration_weeks,
+        "workouts_per_week": workouts_per_week,
+        "daily_workouts": base_week,
+        "weekly_progression": [week_template(week) for week in range(1, duration_weeks + 1)],
+    }
+
+
+def workout_plan_tool(duration_weeks: int, tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Generates a personalized fitness plan from the user profile (fitness goals,
+    activity level, available equipment, preferred workout times).
+
+    Args:
+        duration_weeks: Program length in weeks; pass 0 to use the program dates in the profile.
+        tool_context: The ADK tool context containing session state.
+
+    Returns:
+        The fitness plan: `daily_workouts` for the first week and the
+        `weekly_progression` (sets, reps, cardio volume) of every week.
+    """
+    profile = load_user_profile(tool_context.state)
+    if profile is None:
+        return {"error": "User profile not found in session state. Please provide user profile information."}
+
+    weeks = int(duration_weeks or 0) or _duration_weeks(profile)
+    logger.debug("Generating a %d-week plan", weeks)
+    return generate_fitness_plan(
+        fitness_goals=list(profile.fitness_goals),
+        activity_level=profile.activity_level,
+        equipment_available=list(profile.equipment_available),
+        preferred_workout_times=list(profile.preferred_workout_times),
+        duration_weeks=weeks,
+        fitness_level=profile.fitness_level,
+    )
@@ -0,0 +1,187 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Offline load test of `heracles_ai.agent.root_agent`.
+
+Every agent in the tree is switched to a `ScriptedLlm`, so the run needs no
+network access and is deterministic. N sessions replay scripted onboarding,
+planning and monitoring conversations concurrently, and the report lists
+turn latency percentiles, throughput, model and tool call counts and peak
+RSS.
+
+Usage (from the repository root):
+    python -m tests.benchmark.run_benchmark --sessions 50 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from google.adk.agents import LlmAgent
+from google.adk.apps import App
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from heracles_ai.agent import root_agent
+from heracles_ai.shared_libraries import log, metrics
+from heracles_ai.tools import memory
+from heracles_ai.shared_libraries.scripted_llm import ScriptedLlm
+
+APP_NAME = "heracles_ai_benchmark"
+DEFAULT_SCENARIO = "eval/program_johndoe_example.json"
+
+# Scripted user turns of each conversation type.
+CONVERSATIONS: Dict[str, List[str]] = {
+    "onboarding": [
+        "Hi, my name is Jane Doe and I am 30 years old.",
+        "Please update my profile: I like running.",
+        "Now please create my plan.",
+    ],
+    "planning": [
+        "Please create my diet and workout plan.",
+        "How am I doing? Any feedback?",
+    ],
+    "monitoring": [
+        "I did a 30 minute run this morning, please log it.",
+        "I ate oatmeal with berries for breakfast.",
+        "How am I doing? Any feedback?",
+    ],
+}
+
+
+def use_scripted_model(agent, latency_seconds: float = 0.0) -> None:
+    """Replaces the model of every agent in the tree with a ScriptedLlm."""
+    seen = set()
+    pending = [agent]
+    while pending:
+        current = pending.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        pending.extend(current.sub_agents)
+        if not isinstance(current, LlmAgent):
+            continue  # Workflow agents (e.g. the parallel planning mode) have no model.
+        current.model = ScriptedLlm(model=f"scripted/{current.name}", latency_seconds=latency_seconds)
+        pending.extend(tool.agent for tool in current.tools if getattr(tool, "agent", None) is not None)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def _run_session(runner: InMemoryRunner, index: int, messages: List[str],
+                       semaphore: asyncio.Semaphore, latencies: List[float]) -> None:
+    async with semaphore:
+        user_id = f"user-{index}"
+        session = await runner.session_service.create_session(app_name=APP_NAME, user_id=user_id)
+        for text in messages:
+            started = time.perf_counter()
+            message = types.Content(role="user", parts=[types.Part(text=text)])
+            async for _ in runner.run_async(user_id=user_id, session_id=session.id, new_message=message):
+                pass
+            latencies.append(time.perf_counter() - started)
+
+
+async def run_benchmark(
+    sessions: int = 20,
+    concurrency: int = 10,
+    model_latency_ms: float = 0.0,
+    scenario: str = DEFAULT_SCENARIO,
+) -> Dict[str, Any]:
+    """
+    Runs the load test and returns its report.
+
+    Args:
+        sessions: Number of sessions; conversation types are assigned round-robin.
+        concurrency: Maximum number of sessions running at the same time.
+        model_latency_ms: Simulated latency of every model call.
+        scenario: Scenario file the root agent loads the initial state from.
+
+    Returns:
+        The report: turn latency percentiles (ms), throughput, model and tool
+        call counts, and peak RSS (MB).
+    """
+    memory.SAMPLE_SCENARIO_PATH = scenario
+    use_scripted_model(root_agent, model_latency_ms / 1000)
+    registry = metrics.MetricsRegistry()
+    recorder = metrics.instrument(root_agent, metrics.LatencyRecorder(registry))
+
+    runner = InMemoryRunner(app=App(name=APP_NAME, root_agent=root_agent, plugins=[metrics.MetricsPlugin(recorder)]))
+    semaphore = asyncio.Semaphore(concurrency)
+    conversations = list(CONVERSATIONS.values())
+    latencies: List[float] = []
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _run_session(runner, i, conversations[i % len(conversations)], semaphore, latencies)
+        for i in range(sessions)
+    ))
+    elapsed = time.perf_counter() - started
+
+    def total(name: str, key: str) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for (metric, labels), value in registry.counters.items():
+            if metric == name:
+                label = dict(labels)[key]
+                counts[label] = counts.get(label, 0) + int(value)
+        return dict(sorted(counts.items()))
+
+    turn_ms = np.asarray(latencies) * 1000
+    return {
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "turns": len(latencies),
+        "duration_seconds": round(elapsed, 3),
+        "throughput_turns_per_second": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "turn_latency_ms": {
+            "p50": round(float(np.percentile(turn_ms, 50)), 2),
+            "p95": round(float(np.percentile(turn_ms, 95)), 2),
+            "p99": round(float(np.percentile(turn_ms, 99)), 2),
+            "max": round(float(turn_ms.max()), 2),
+        },
+        "model_calls": total("heracles_model_calls_total", "agent"),
+        "tool_calls": total("heracles_tool_calls_total", "tool"),
+        "tool_errors": total("heracles_tool_errors_total", "tool"),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--model-latency-ms", type=float, default=0.0)
+    parser.add_argument("--scenario", default=DEFAULT_SCENARIO)
+    parser.add_argument("--max-p95-ms", type=float, default=None,
+                        help="Exit with status 1 if the p95 turn latency exceeds this value.")
+    args = parser.parse_args(argv)
+
+    log.configure_logging(level="ERROR")
+    report = asyncio.run(run_benchmark(args.sessions, args.concurrency, args.model_latency_ms, args.scenario))
+    print(json.dumps(report, indent=2))
+    if args.max_p95_ms is not None and report["turn_latency_ms"]["p95"] > args.max_p95_ms:
+        print(f"p95 turn latency {report['turn_latency_ms']['p95']} ms exceeds {args.max_p95_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Smoke test of the offline benchmark harness."""
+
+import json
+import pathlib
+import subprocess
+import sys
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parents[2]
+
+
+def test_benchmark_runs_offline():
+    # A separate process, because the harness swaps the models of root_agent.
+    completed = subprocess.run(
+        [sys.executable, "-m", "tests.benchmark.run_benchmark", "--sessions", "3", "--concurrency", "3"],
+        cwd=REPO_ROOT, capture_output=True, text=True, timeout=300, check=True,
+    )
+    report = json.loads(completed.stdout)
+
+    assert report["turns"] == 8
+    # The pre-router transfers every scripted message without a model call.
+    assert report["model_calls"].get("root_agent", 0) == 0
+    assert report["tool_calls"]["workout_plan_tool"] == 2
+    assert report["tool_calls"]["meal_plan_tool"] == 2
+    assert 0 < report["turn_latency_ms"]["p50"] <= report["turn_latency_ms"]["p99"]
+    assert report["peak_rss_mb"] > 0
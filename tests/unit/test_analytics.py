@@ -0,0 +1,77 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the incremental progress analytics."""
+
+import json
+import pathlib
+from types import SimpleNamespace
+
+from heracles_ai.shared_libraries import constants
+from heracles_ai.tools import analytics
+
+SCENARIO = pathlib.Path(__file__).parents[2] / "eval/program_johndoe_example.json"
+
+
+def _state():
+    return json.loads(SCENARIO.read_text())["state"]
+
+
+def test_summary_of_scenario():
+    summary = analytics.progress_analytics_tool(SimpleNamespace(state=_state()))
+
+    assert summary["planned_days_per_week"] == 5
+    week = summary["weeks"][-1]
+    assert (week["week"], week["sessions"], week["training_days"]) == ("2024-W08", 3, 2)
+    assert week["minutes"] == 85 and week["volume_kg"] == 2250
+    assert week["adherence_pct"] == 40
+    assert summary["calories"]["recent_deltas"] == {"2024-02-19": -330, "2024-02-20": -1440}
+    assert summary["weight_trend"]["kg_per_week"] == -1.0
+
+
+def test_only_new_records_are_folded(monkeypatch):
+    state = _state()
+    context = SimpleNamespace(state=state)
+    analytics.progress_analytics_tool(context)
+
+    folded = []
+    monkeypatch.setitem(analytics._FOLDERS, "meals", lambda aggregates, record: folded.append(record))
+    state["meals"] = state["meals"] + [{"date": "2024-02-20", "name": "Lunch", "calories": 500}]
+    analytics.progress_analytics_tool(context)
+    assert folded == [state["meals"][-1]]
+    assert state[constants.ANALYTICS_KEY]["cursors"]["meals"]["count"] == 5
+
+    # A rewritten list rebuilds the aggregates from scratch.
+    monkeypatch.undo()
+    state["meals"] = state["meals"][:1]
+    summary = analytics.progress_analytics_tool(context)
+    assert summary["calories"]["logged_days"] == 1
+
+
+def test_meal_logged_late_for_a_folded_day_is_counted():
+    meals = [{"date": f"2024-03-{day:02d}", "name": "Dinner", "calories": 2000} for day in range(2, 2 + analytics.RECENT_DAYS + 2)]
+    state = {"meals": meals, "diet_plan": {"daily_calories": 2000}}
+    context = SimpleNamespace(state=state)
+    summary = analytics.progress_analytics_tool(context)
+    assert summary["calories"]["logged_days"] == analytics.RECENT_DAYS + 2
+    assert summary["calories"]["average_delta"] == 0
+
+    # Logged out of order: a day before the folded ones, and one more meal of a folded day.
+    state["meals"] = meals + [{"date": "2024-03-01", "name": "Dinner", "calories": 1000},
+                              {"date": "2024-03-02", "name": "Snack", "calories": 200}]
+    summary = analytics.progress_analytics_tool(context)
+    assert summary["calories"]["logged_days"] == analytics.RECENT_DAYS + 3
+    assert summary["calories"]["average_daily"] == round((2000 * (analytics.RECENT_DAYS + 2) + 1200) / (analytics.RECENT_DAYS + 3))
+    # Same result as folding all the meals at once.
+    assert summary == analytics.progress_analytics_tool(SimpleNamespace(state={**state, constants.ANALYTICS_KEY: None}))
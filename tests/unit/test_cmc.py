@@ -0,0 +1,182 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the calories and macros calculator."""
+
+import copy
+import logging
+from types import SimpleNamespace
+
+import numpy as np
+
+from heracles_ai.tools.cmc import calculate_and_store_cmc_tool, calculate_needs_batch, calories_macro_calculator_tool
+from heracles_ai.shared_libraries import types
+from heracles_ai.shared_libraries.log import get_logger
+from heracles_ai.tools import memory
+from heracles_ai.tools.memory import memorize
+
+
+PROFILE = {
+    "age": 30,
+    "sex": "male",
+    "height_cm": 180,
+    "weight_kg": 75,
+    "activity_level": "moderately_active",
+    "fitness_goals": "lose weight",
+}
+
+
+def test_single_profile_tool():
+    result = calories_macro_calculator_tool("lose weight", SimpleNamespace(state={"user_profile": PROFILE}))
+    assert result == {
+        "estimated_daily_calories": 2182,
+        "protein_grams": 135,
+        "carbohydrate_grams": 276,
+        "fat_grams": 60,
+        "calculation_details": {
+            "bmr": 1730.0,
+            "tdee": 2681.5,
+            "goal_adjustment": -500,
+            "activity_level": "moderately_active",
+            "goal": "lose_weight",
+        },
+    }
+
+
+def test_batch_returns_per_row_errors():
+    results = calculate_needs_batch([
+        PROFILE,
+        {**PROFILE, "age": ""},
+        {**PROFILE, "sex": "other"},
+        "not a profile",
+    ])
+    assert results[0]["estimated_daily_calories"] == 2182
+    assert "Age is missing" in results[1]["error"]
+    assert "Invalid sex" in results[2]["error"]
+    assert "expected format" in results[3]["error"]
+
+
+def test_columnar_batch_matches_rows():
+    rows = [
+        PROFILE,
+        {**PROFILE, "sex": "female", "weight_kg": 62.5, "activity_level": "sedentary"},
+        {**PROFILE, "age": 55, "fitness_goals": "gain_weight", "activity_level": "extra_active"},
+    ]
+    columns = {
+        field: np.asarray([row[field] for row in rows])
+        for field in ("age", "sex", "height_cm", "weight_kg", "activity_level", "fitness_goals")
+    }
+    assert calculate_needs_batch(columns) == calculate_needs_batch(rows)
+
+
+def test_columnar_batch_treats_nan_as_missing():
+    columns = {**{k: [v] for k, v in PROFILE.items()}, "weight_kg": np.array([np.nan])}
+    (result,) = calculate_needs_batch(columns)
+    assert "Weight (kg) is missing" in result["error"]
+
+
+def test_direct_tool_writes_cmc_state():
+    state = {"user_profile": PROFILE}
+    result = calculate_and_store_cmc_tool("lose weight", SimpleNamespace(state=state))
+    assert state["cmc"] == result
+    assert result["estimated_daily_calories"] == 2182
+
+    state = {"user_profile": {**PROFILE, "age": None}}
+    assert "error" in calculate_and_store_cmc_tool("lose weight", SimpleNamespace(state=state))
+    assert "cmc" not in state
+
+
+class _Records(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_results_are_memoized_per_profile():
+    state = {"user_profile": dict(PROFILE)}
+    context = SimpleNamespace(state=state)
+    first = calories_macro_calculator_tool("lose weight", context)
+
+    records = _Records()
+    logger = get_logger("cmc")
+    logger.addHandler(records)
+    try:
+        again = calories_macro_calculator_tool("lose weight", context)
+    finally:
+        logger.removeHandler(records)
+    assert records.records == []
+    assert again == first
+
+    # The results handed out are copies: changing one leaves the memo as it was.
+    expected = copy.deepcopy(first)
+    first["calculation_details"]["goal"] = "changed"
+    again["estimated_daily_calories"] = 0
+    assert calories_macro_calculator_tool("lose weight", context) == expected
+    assert state["_cmc_memo"]["result"] == expected
+
+    memorize("user_profile", {**PROFILE, "weight_kg": 85}, context)
+    assert state["_cmc_memo"] is None
+    second = calories_macro_calculator_tool("lose weight", context)
+    assert second["estimated_daily_calories"] > first["estimated_daily_calories"]
+
+
+def test_profile_written_outside_the_tools_is_parsed_again():
+    state = {}
+    memory._set_initial_states({"user_profile": dict(PROFILE)}, state)
+    context = SimpleNamespace(state=state)
+    first = calories_macro_calculator_tool("lose weight", context)
+
+    # E.g. an AgentTool state delta.
+    state["user_profile"] = {**PROFILE, "weight_kg": 85}
+    second = calories_macro_calculator_tool("lose weight", context)
+    fresh = calories_macro_calculator_tool("lose weight", SimpleNamespace(state={"user_profile": state["user_profile"]}))
+    assert second == fresh
+    assert second["estimated_daily_calories"] > first["estimated_daily_calories"]
+    assert types.load_user_profile(state).weight_kg == 85
+
+
+def test_list_goals_and_gender_are_normalized():
+    state = {}
+    memory._set_initial_states({"user_profile": {
+        "age": "30", "gender": "Male", "height_cm": "180", "weight_kg": 75,
+        "activity_level": "Moderately Active", "fitness_goals": ["improve cardio", "Lose Weight"],
+    }}, state)
+    profile = types.load_user_profile(state)
+    assert (profile.age, profile.sex, profile.height_cm, profile.primary_goal) == (30, "male", 180.0, "lose_weight")
+
+    result = calories_macro_calculator_tool("", SimpleNamespace(state=state))
+    assert result["calculation_details"]["goal"] == "lose_weight"
+    assert result["calculation_details"]["activity_level"] == "moderately_active"
+
+    memory.memorize_profile({"activity_level": "very_active"}, SimpleNamespace(state=state))
+    result = calories_macro_calculator_tool("", SimpleNamespace(state=state))
+    assert result["calculation_details"]["activity_level"] == "very_active"
+
+
+def test_activity_and_goal_aliases_resolve():
+    profiles = [
+        dict(PROFILE, activity_level="moderate", fitness_goals=["improve_cardio", "lose_weight"]),
+        dict(PROFILE, activity_level="Very-Active", fitness_goals="build muscle"),
+        dict(PROFILE, activity_level="light", fitness_goals=["general fitness"]),
+        dict(PROFILE, activity_level="couch"),
+    ]
+    results = calculate_needs_batch(profiles)
+    details = [r.get("calculation_details") for r in results]
+    assert (details[0]["activity_level"], details[0]["goal"]) == ("moderately_active", "lose_weight")
+    assert (details[1]["activity_level"], details[1]["goal"]) == ("very_active", "gain_weight")
+    assert (details[2]["activity_level"], details[2]["goal"]) == ("lightly_active", "maintain_weight")
+    assert "Invalid activity level: 'couch'" in results[3]["error"]
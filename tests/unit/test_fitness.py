@@ -0,0 +1,105 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the WGER client and the fitness tool, against a local stub server."""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import pathlib
+import threading
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from heracles_ai.tools import exercise, fitness, wger
+
+FIXTURE = json.loads((pathlib.Path(__file__).parents[1] / "fixtures/wger_exerciseinfo.json").read_text())
+
+
+@pytest.fixture
+def wger_stub():
+    """Serves the recorded /exerciseinfo/ fixture with WGER-style pagination."""
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            requests_seen.append(self.path)
+            limit, offset = int(query.get("limit", 2)), int(query.get("offset", 0))
+            next_url = None
+            if offset + limit < len(FIXTURE):
+                next_url = f"http://127.0.0.1:{self.server.server_port}{url.path}?limit={limit}&offset={offset + limit}"
+            body = json.dumps({"count": len(FIXTURE), "next": next_url, "results": FIXTURE[offset:offset + limit]})
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body.encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", requests_seen
+    server.shutdown()
+
+
+def test_client_follows_pagination_and_caches(wger_stub):
+    base_url, requests_seen = wger_stub
+    client = wger.WgerClient(base_url=base_url)
+
+    results = client.fetch_all("/exerciseinfo/", {"limit": 2, "language": 2})
+    assert [ex["id"] for ex in results] == [ex["id"] for ex in FIXTURE]
+    assert len(requests_seen) == 3
+
+    # Same params in a different order are served from the cache.
+    client.fetch_all("/exerciseinfo/", {"language": "2", "limit": 2})
+    assert len(requests_seen) == 3
+
+    # max_pages bounds the requests, not just the pages kept.
+    assert len(FIXTURE) > 2
+    assert len(client.fetch_all("/exerciseinfo/", {"limit": 1, "language": 2}, max_pages=2)) == 2
+    assert len(requests_seen) == 5
+
+
+def test_catalog_from_wger_dump(wger_stub):
+    base_url, _ = wger_stub
+    catalog = exercise.ExerciseCatalog.download(wger.WgerClient(base_url=base_url))
+
+    assert [ex["name"] for ex in catalog.search("dumbbell exercises for chest")] == ["Dumbbell Bench Press"]
+    assert [ex["name"] for ex in catalog.search("chest", equipment_available=["bodyweight"])] == ["Push-Ups"]
+
+
+def test_fitness_tool_uses_profile_equipment():
+    state = {"user_profile": {"equipment_available": ["dumbbells"]}}
+    result = fitness.fitness_tool("chest exercises", SimpleNamespace(state=state))
+    names = [ex["name"] for ex in result["exercises"]]
+    assert "Push-Up" in names
+    assert "Barbell Bench Press" not in names
+    # Dumbbell presses also need a bench, which the user did not list.
+    assert "Dumbbell Bench Press" not in names
+
+    state["user_profile"]["equipment_available"] = ["gym_access"]
+    result = fitness.fitness_tool("chest exercises", SimpleNamespace(state=state))
+    assert "Barbell Bench Press" in [ex["name"] for ex in result["exercises"]]
+
+
+def test_unknown_query_terms_are_ignored():
+    catalog = exercise.get_exercise_catalog()
+    assert catalog.search("beginner triceps") == catalog.search("triceps")
+    assert catalog.search("dumbbell swimming") == []
@@ -0,0 +1,79 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the food database and the nutrition tool."""
+
+from types import SimpleNamespace
+
+from heracles_ai.tools.food import FoodQuery, get_food_database, parse_food_query, split_allergies
+from heracles_ai.tools.nutrition import nutrition_tool
+
+
+def test_parse_food_query():
+    query = parse_food_query("Vegetarian high-protein snacks under 300 kcal")
+    assert query.meal_type == "snack"
+    assert query.diet_tags == ["vegetarian"]
+    assert query.max_calories == 300
+    assert query.min_protein == 15
+
+    query = parse_food_query("nut-free keto dinner around 600 calories")
+    assert query.exclude_allergens == ["peanuts", "tree_nuts"]
+    assert (round(query.min_calories), round(query.max_calories)) == (510, 690)
+
+
+def test_search_uses_indexes():
+    database = get_food_database()
+    query = parse_food_query("vegetarian high-protein snacks under 300 kcal")
+    plan = " ".join(database.explain(query))
+    assert "USING PRIMARY KEY (meal_type=? AND calories<?)" in plan
+
+    foods = database.search(query)
+    assert foods
+    for food in foods:
+        assert food["calories"] <= 300
+        assert food["protein"] >= 15
+        assert "vegetarian" in food["diet_tags"]
+
+
+def test_nutrition_tool_applies_profile_restrictions():
+    state = {"user_profile": {"dietary_preferences": ["pescatarian"], "food_allergies": ["Shellfish", "fish"]}}
+    result = nutrition_tool("dinner", SimpleNamespace(state=state))
+    assert result["foods"]
+    for food in result["foods"]:
+        assert "pescatarian" in food["diet_tags"]
+        assert not {"fish", "shellfish"} & set(food["allergens"])
+
+
+def test_split_allergies():
+    assert split_allergies(["Nuts", "Banana", "kiwi", "shellfish", "banana"]) == (
+        ["peanuts", "tree_nuts", "shellfish"], ["banana", "kiwi"])
+
+
+def test_unknown_allergies_exclude_foods_by_name():
+    database = get_food_database()
+    names = [food["name"] for food in database.search(FoodQuery(limit=500))]
+    assert "Banana" in names and "Berries and Coconut Yogurt" in names
+    kept = [food["name"] for food in database.search(FoodQuery(exclude_terms=["banana", "berry"], limit=500))]
+    assert [name for name in names if "Banana" not in name and "Berr" not in name] == kept
+
+
+def test_nutrition_tool_reports_unknown_allergies():
+    state = {"user_profile": {"food_allergies": ["banana", "peanut"]}}
+    result = nutrition_tool("low-cal snack", SimpleNamespace(state=state))  # Banana comes third without the allergy.
+    assert result["foods"]
+    for food in result["foods"]:
+        assert "banana" not in food["name"].lower() and "peanuts" not in food["allergens"]
+    # The database has no allergen data for banana: the agent is told to warn the user.
+    assert result["unmatched_allergies"] == ["banana"]
+    assert "unmatched_allergies" not in nutrition_tool("snack", SimpleNamespace(state={"user_profile": {"food_allergies": ["peanut"]}}))
@@ -0,0 +1,76 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the state-projecting instruction providers."""
+
+import json
+import pathlib
+from types import SimpleNamespace
+
+import pytest
+
+from heracles_ai.shared_libraries import instructions
+from heracles_ai.sub_agents.coach import prompt as coach_prompt
+
+SCENARIO = pathlib.Path(__file__).parents[2] / "eval/program_johndoe_example.json"
+
+
+def _state():
+    return json.loads(SCENARIO.read_text())["state"]
+
+
+def test_projection_keeps_agent_fields_and_recent_records():
+    state = _state()
+    state["meals"] = [{"date": f"2024-03-{day:02d}", "name": "Lunch", "calories": 500} for day in range(1, 31)]
+
+    coach = instructions.render_instruction(
+        coach_prompt.COACH_AGENT_INSTR, state, instructions.PROJECTIONS["coach_agent"], "coach_agent")
+    assert '"equipment_available":["gym_access","running_shoes"]' in coach
+    assert "food_allergies" not in coach
+    assert len(coach) < len(coach_prompt.COACH_AGENT_INSTR) + len(str(state["user_profile"]))
+
+    monitoring = instructions.render_instruction("Check in.", state, instructions.PROJECTIONS["monitoring_agent"])
+    assert '"... 25 earlier"' in monitoring and "2024-03-30" in monitoring and "2024-03-01" not in monitoring
+
+
+def test_placeholders_follow_adk_syntax():
+    projection = instructions.Projection(fields={"user_profile": ("name_surname",)})
+    state = {"user_profile": {"name_surname": "Jane", "age": 30}, "_time": "now"}
+
+    text = instructions.render_instruction(
+        "{user_profile} {_time} {missing?} {user_profile[age]} {\"a\": 1}", state, projection)
+    assert text == '{"name_surname":"Jane"} now  {user_profile[age]} {"a": 1}'
+    with pytest.raises(KeyError):
+        instructions.render_instruction("{missing}", state, projection)
+
+
+def test_budget_truncates_further():
+    state = {"log": [{"date": f"2024-01-{day:02d}", "note": "x" * 200} for day in range(1, 29)]}
+    projection = instructions.Projection(fields={"log": None}, token_budget=150)
+    text = instructions.render_instruction("{log}", state, projection)
+    assert instructions.estimate_tokens(text) <= 150
+
+
+def test_provider_is_memoized_per_state_version(monkeypatch):
+    calls = []
+    monkeypatch.setattr(instructions, "render_instruction",
+                        lambda template, state, projection, agent_name: calls.append(1) or template)
+    provider = instructions.instruction_provider("coach_agent", "Hello")
+    session = SimpleNamespace(app_name="app", user_id="u", id="s", events=[SimpleNamespace(id="e1")])
+    context = SimpleNamespace(session=session, state={})
+
+    assert provider(context) == provider(context) == "Hello"
+    session.events.append(SimpleNamespace(id="e2"))
+    provider(context)
+    assert len(calls) == 2
@@ -0,0 +1,63 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the tool logging setup."""
+
+import logging
+import queue
+
+import pytest
+
+from heracles_ai.shared_libraries import log
+
+
+def test_parse_levels():
+    assert log.parse_levels("cmc=debug, fitness=WARNING,") == {"cmc": logging.DEBUG, "fitness": logging.WARNING}
+    with pytest.raises(ValueError):
+        log.parse_levels("cmc=LOUD")
+
+
+def test_tool_levels_and_lazy_formatting():
+    class Loud:
+        formatted = 0
+
+        def __str__(self):
+            Loud.formatted += 1
+            return "loud"
+
+    log.configure_logging(level="INFO", tool_levels={"test_tool": logging.DEBUG})
+    try:
+        assert log.get_logger("test_tool").isEnabledFor(logging.DEBUG)
+        assert not log.get_logger("other_tool").isEnabledFor(logging.DEBUG)
+        log.get_logger("other_tool").debug("value: %s", Loud())
+        assert Loud.formatted == 0
+    finally:
+        log.configure_logging(tool_levels={"test_tool": logging.NOTSET})
+
+
+def test_message_is_resolved_when_logged():
+    records = queue.SimpleQueue()
+    logger = logging.getLogger("heracles_ai_test_prepare")
+    logger.addHandler(log._DeferredQueueHandler(records))
+    logger.propagate = False
+    try:
+        state = {"meals": ["oats"]}
+        logger.warning("state: %s", state)
+        state["meals"].append("eggs")
+        record = records.get_nowait()
+        assert record.msg == "state: {'meals': ['oats']}"
+        assert record.args is None
+        assert logging.Formatter("%(levelname)s %(message)s").format(record) == "WARNING state: {'meals': ['oats']}"
+    finally:
+        logger.handlers.clear()
@@ -0,0 +1,63 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the meal-plan solver."""
+
+from types import SimpleNamespace
+
+from heracles_ai.tools.food import FoodQuery, get_food_database
+from heracles_ai.tools.meal_planner import meal_plan_tool, solve_meal_plan
+
+TARGETS = {"calories": 2182, "protein": 135, "carbs": 276, "fat": 60}
+
+
+def test_week_plan_meets_targets():
+    plan = solve_meal_plan(TARGETS, diet_tags=["vegetarian"], exclude_allergens=["shellfish"], days=7)
+    assert len(plan["days"]) == 7
+    assert all(day["within_tolerance"] for day in plan["days"])
+
+    vegetarian = {food["name"] for food in get_food_database().search(
+        FoodQuery(diet_tags=["vegetarian"], limit=500))}
+    for day in plan["days"]:
+        descriptions = [meal["description"] for meal in day["meals"]]
+        assert set(descriptions) <= vegetarian
+        assert len(set(descriptions)) == len(descriptions)
+
+
+def test_plan_is_deterministic():
+    assert solve_meal_plan(TARGETS, days=3) == solve_meal_plan(TARGETS, days=3)
+
+
+def test_tool_reads_cmc_from_state():
+    state = {
+        "user_profile": {"dietary_preferences": ["keto"], "food_allergies": []},
+        "cmc": 'Here are your targets: {"results": {"estimated_daily_calories": 1800, "protein_grams": 120, '
+               '"carbohydrate_grams": 40, "fat_grams": 120}}',
+    }
+    plan = meal_plan_tool(1, SimpleNamespace(state=state))
+    assert plan["targets"] == {"calories": 1800, "protein": 120, "carbs": 40, "fat": 120}
+    assert plan["days"][0]["within_tolerance"]
+
+
+def test_plan_excludes_allergies_outside_the_allergen_vocabulary():
+    state = {"user_profile": {"food_allergies": ["banana", "peanuts"]}}
+    plan = meal_plan_tool(7, SimpleNamespace(state={**state, "cmc": {
+        "estimated_daily_calories": 2182, "protein_grams": 135, "carbohydrate_grams": 276, "fat_grams": 60}}))
+    descriptions = [meal["description"] for day in plan["days"] for meal in day["meals"]]
+    assert not [name for name in descriptions if "Banana" in name or "Peanut" in name]
+    assert plan["excluded_allergens"] == ["peanuts", "banana"]
+    assert plan["unmatched_allergies"] == ["banana"]
+    # Without the allergy, the same plan would serve Banana.
+    unrestricted = solve_meal_plan(TARGETS, exclude_allergens=["peanuts"], days=7)
+    assert any("Banana" in meal["description"] for day in unrestricted["days"] for meal in day["meals"])
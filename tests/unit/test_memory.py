@@ -0,0 +1,157 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the memory tools and initial state loading."""
+
+import json
+import os
+from types import SimpleNamespace
+
+from heracles_ai.shared_libraries import constants
+from heracles_ai.tools import memory
+from heracles_ai.tools.meal_planner import meal_plan_tool
+
+
+def _write_scenario(path, state, mtime):
+    path.write_text(json.dumps({"state": state}), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_scenario_is_cached_until_modified(tmp_path, monkeypatch):
+    scenario = tmp_path / "scenario.json"
+    _write_scenario(scenario, {"user_profile": {"age": 30}}, mtime=1000)
+    monkeypatch.setattr(memory, "SAMPLE_SCENARIO_PATH", str(scenario))
+
+    first = memory._read_scenario(str(scenario))
+    assert memory._read_scenario(str(scenario)) is first
+
+    _write_scenario(scenario, {"user_profile": {"age": 31}}, mtime=2000)
+    assert memory._read_scenario(str(scenario))["user_profile"]["age"] == 31
+
+
+def test_initialized_session_is_not_reloaded(tmp_path, monkeypatch):
+    scenario = tmp_path / "scenario.json"
+    _write_scenario(scenario, {"user_profile": {"age": 30}}, mtime=1000)
+    monkeypatch.setattr(memory, "SAMPLE_SCENARIO_PATH", str(scenario))
+
+    context = SimpleNamespace(state={})
+    memory._load_precreated_profile(context)
+    assert context.state[constants.PROGRAM_INITIALIZED] is True
+    context.state["user_profile"]["age"] = 40
+
+    # A second session gets its own copy of the cached scenario.
+    other = SimpleNamespace(state={})
+    memory._load_precreated_profile(other)
+    assert other.state["user_profile"]["age"] == 30
+
+    monkeypatch.setattr(memory, "_read_scenario", lambda path: 1 / 0)
+    memory._load_precreated_profile(context)
+    assert context.state["user_profile"]["age"] == 40
+
+
+def test_memorize_list_keeps_order_and_stores_only_the_list():
+    context = SimpleNamespace(state={"allergies": ["peanuts"]})
+
+    memory.memorize_list("allergies", "shellfish", context)
+    memory.memorize_many("allergies", ["gluten", "peanuts", "soy"], context)
+    assert memory.memorize_list("allergies", "soy", context)["status"] == '"soy" already exists in list "allergies"'
+    assert context.state["allergies"] == ["peanuts", "shellfish", "gluten", "soy"]
+    assert sorted(context.state) == ["allergies"]
+
+    memory.forget("allergies", context, value="shellfish")
+    assert context.state["allergies"] == ["peanuts", "gluten", "soy"]
+    assert memory.memorize_list("allergies", "shellfish", context)["status"].startswith("Added")
+
+    # A list rewritten outside the tools, even at the same length, is read as it is.
+    context.state["allergies"] = ["eggs", "gluten", "soy"]
+    assert memory.memorize_list("allergies", "eggs", context)["status"].startswith('"eggs" already exists')
+    assert memory.memorize_many("allergies", ["peanuts", "soy"], context)["status"].startswith("Added 1 value(s)")
+
+    memory.forget("allergies", context, value="eggs")
+    assert context.state["allergies"] == ["gluten", "soy", "peanuts"]
+
+    context.state["allergies"] = ["eggs"]
+    memory.forget("allergies", context, value="eggs")
+    assert context.state["allergies"] is None
+
+
+def test_memorize_profile_validates_and_writes_once():
+    context = SimpleNamespace(state={"user_profile": {"name_surname": "Jane Doe", "age": ""}})
+
+    result = memory.memorize_profile(
+        {"age": "30", "height_cm": 168, "weight_kg": "62.5", "activity_level": "Moderately Active",
+         "fitness_goals": ["lose weight", "improve_cardio"], "food_allergies": "peanuts"},
+        context,
+    )
+    assert "error" not in result
+    assert context.state["user_profile"] == {
+        "name_surname": "Jane Doe", "age": 30, "height_cm": 168.0, "weight_kg": 62.5,
+        "activity_level": "moderately_active", "fitness_goals": ["lose_weight", "improve_cardio"],
+        "food_allergies": ["peanuts"],
+    }
+
+    result = memory.memorize_profile({"age": 30.5, "activity_level": "couch", "weight_kg": 70}, context)
+    assert set(result["invalid_fields"]) == {"age", "activity_level"}
+    assert context.state["user_profile"]["weight_kg"] == 62.5
+
+
+def test_log_tools_store_validated_entries():
+    context = SimpleNamespace(state={})
+    result = memory.log_workout_session(
+        {"date": "2024-02-26", "type": "Running", "duration_minutes": "30", "calories_burned": None}, context)
+    assert result["entry"] == {"date": "2024-02-26", "type": "Running", "duration_minutes": 30.0}
+    assert memory.log_workout_session(result["entry"], context)["status"].startswith("This entry is already")
+
+    invalid = memory.log_meal({"date": "26/02/2024", "name": "Lunch"}, context)
+    assert set(invalid["invalid_fields"]) == {"date", "calories"}
+    assert memory.log_meal({"date": "2024-02-26", "name": "Lunch", "calories": 520}, context)["status"] == "Logged to meals"
+
+    assert context.state["workout_sessions"] == [result["entry"]]
+    assert context.state["meals"] == [{"date": "2024-02-26", "name": "Lunch", "calories": 520.0}]
+
+
+def test_onboarding_allergies_reach_the_meal_plan():
+    context = SimpleNamespace(state={})
+    memory.memorize_profile(
+        {"name_surname": "Jane Doe", "age": 30, "sex": "female", "height_cm": 168, "weight_kg": 62,
+         "activity_level": "moderately_active", "fitness_goals": ["lose_weight"], "food_allergies": ["peanuts"]},
+        context,
+    )
+    # A profile list given to the list tools lands in the profile as well.
+    assert "error" not in memory.memorize_many("food_allergies", ["shellfish", "peanuts"], context)
+    assert context.state["user_profile"]["food_allergies"] == ["peanuts", "shellfish"]
+    assert "food_allergies" not in context.state
+
+    plan = meal_plan_tool(1, context)
+    assert "error" not in plan
+    assert set(plan["excluded_allergens"]) == {"peanuts", "shellfish"}
+
+
+def test_profile_lists_are_forgotten_and_goals_checked_on_the_merged_list():
+    context = SimpleNamespace(state={"user_profile": {"fitness_goals": ["lose_weight"]}})
+    assert memory.memorize_list("food_allergies", "kiwi", context)["status"].startswith("Added 1")
+    assert memory.forget("food_allergies", context, value="kiwi")["status"] == 'Removed value "kiwi" from profile field "food_allergies"'
+    assert "food_allergies" not in context.state["user_profile"]
+    assert memory.forget("food_allergies", context, value="kiwi")["status"].startswith('Profile field "food_allergies" not found')
+
+    # The profile already has a goal with a calorie adjustment.
+    assert "error" not in memory.memorize_list("fitness_goals", "run a marathon", context)
+    assert context.state["user_profile"]["fitness_goals"] == ["lose_weight", "run_a_marathon"]
+    memory.forget("fitness_goals", context, value="Lose weight")
+    assert context.state["user_profile"]["fitness_goals"] == ["run_a_marathon"]
+    assert "invalid_fields" in memory.memorize_list("fitness_goals", "get flexible", context)
+    assert context.state["user_profile"]["fitness_goals"] == ["run_a_marathon"]
+
+    memory.forget("fitness_goals", context)
+    assert context.state["user_profile"] == {}
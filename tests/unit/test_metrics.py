@@ -0,0 +1,124 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the latency metrics."""
+
+import asyncio
+from types import SimpleNamespace
+
+from google.adk.agents import Agent
+from google.adk.apps import App
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+from heracles_ai.shared_libraries import router
+from heracles_ai.shared_libraries.metrics import LatencyRecorder, MetricsPlugin, MetricsRegistry, instrument
+
+
+class _FixedLlm(BaseLlm):
+    """Replies with a fixed part."""
+
+    part: types.Part
+
+    async def generate_content_async(self, llm_request, stream=False):
+        yield LlmResponse(content=types.Content(role="model", parts=[self.part]))
+
+
+def test_recorder_collects_agent_model_and_tool_metrics(tmp_path):
+    registry = MetricsRegistry()
+    recorder = LatencyRecorder(registry)
+    context = SimpleNamespace(invocation_id="inv-1", agent_name="dietitian_agent", function_call_id="call-1")
+    tool = SimpleNamespace(name="meal_plan_tool")
+    usage = SimpleNamespace(prompt_token_count=120, candidates_token_count=30, thoughts_token_count=None)
+
+    recorder.before_agent(context)
+    recorder.before_model(context, None)
+    recorder.after_model(context, SimpleNamespace(partial=False, usage_metadata=usage))
+    recorder.before_tool(tool, {}, context)
+    recorder.after_tool(tool, {}, context, {"error": "no targets"})
+    recorder.after_agent(context)
+
+    assert registry.counter("heracles_model_calls_total", agent="dietitian_agent") == 1
+    assert registry.counter("heracles_model_tokens_total", agent="dietitian_agent", type="prompt") == 120
+    assert registry.counter("heracles_tool_errors_total", agent="dietitian_agent", tool="meal_plan_tool") == 1
+    assert registry.histogram("heracles_agent_duration_seconds", agent="dietitian_agent").count == 1
+
+    path = tmp_path / "metrics.prom"
+    registry.write(str(path))
+    text = path.read_text()
+    assert "# TYPE heracles_tool_duration_seconds histogram" in text
+    assert 'heracles_tool_duration_seconds_bucket{agent="dietitian_agent",tool="meal_plan_tool",le="+Inf"} 1' in text
+    assert 'heracles_tool_duration_seconds_count{agent="dietitian_agent",tool="meal_plan_tool"} 1' in text
+
+
+def test_instrument_reaches_agent_tools_once():
+    def existing(callback_context):
+        return None
+
+    inner = Agent(model="gemini-2.0-flash-001", name="inner")
+    middle = Agent(model="gemini-2.0-flash-001", name="middle", tools=[AgentTool(agent=inner)])
+    root = Agent(model="gemini-2.0-flash-001", name="root", sub_agents=[middle], before_agent_callback=existing)
+    recorder = instrument(root, LatencyRecorder(MetricsRegistry()))
+
+    assert root.before_agent_callback == [recorder.before_agent, existing]
+    assert inner.after_tool_callback == [recorder.after_tool]
+    assert middle.before_model_callback == [recorder.before_model]
+
+
+def test_runs_are_counted_and_timers_closed_through_a_runner():
+    transfer = types.Part(function_call=types.FunctionCall(name="transfer_to_agent", args={"agent_name": "coach_agent"}))
+    coach = Agent(name="coach_agent", model=_FixedLlm(model="fixed", part=types.Part(text="Let's train.")))
+    root = Agent(name="root_agent", model=_FixedLlm(model="fixed", part=transfer), sub_agents=[coach])
+    registry = MetricsRegistry()
+    recorder = instrument(root, LatencyRecorder(registry))
+
+    async def run():
+        runner = InMemoryRunner(app=App(name="heracles", root_agent=root, plugins=[MetricsPlugin(recorder)]))
+        for user_id in ("u1", "u2", "u3"):
+            session = await runner.session_service.create_session(app_name="heracles", user_id=user_id)
+            message = types.Content(role="user", parts=[types.Part(text="Plan my workouts.")])
+            async for _ in runner.run_async(user_id=user_id, session_id=session.id, new_message=message):
+                pass
+
+    asyncio.run(run())
+    for agent in ("root_agent", "coach_agent"):
+        assert registry.counter("heracles_agent_runs_total", agent=agent) == 3
+        assert registry.histogram("heracles_agent_duration_seconds", agent=agent).count == 3
+        assert registry.counter("heracles_model_calls_total", agent=agent) == 3
+    assert recorder._starts == {}
+
+
+def test_routed_turns_are_not_timed_as_model_calls():
+    monitoring = Agent(name="monitoring_agent", model=_FixedLlm(model="fixed", part=types.Part(text="Logged.")))
+    root = Agent(name="root_agent", model=_FixedLlm(model="fixed", part=types.Part(text="Hi!")),
+                 sub_agents=[monitoring], before_model_callback=router.route_user_message)
+    registry = MetricsRegistry()
+    recorder = instrument(root, LatencyRecorder(registry))
+    assert root.before_model_callback == [router.route_user_message, recorder.before_model]
+
+    async def run():
+        # No MetricsPlugin: the recorder alone must not leave a timer behind.
+        runner = InMemoryRunner(agent=root, app_name="heracles")
+        session = await runner.session_service.create_session(app_name="heracles", user_id="u1")
+        message = types.Content(role="user", parts=[types.Part(text="log my run please")])
+        async for _ in runner.run_async(user_id="u1", session_id=session.id, new_message=message):
+            pass
+
+    asyncio.run(run())
+    assert registry.counter("heracles_model_calls_total", agent="root_agent") == 0
+    assert registry.counter("heracles_model_calls_total", agent="monitoring_agent") == 1
+    assert not [key for starts in recorder._starts.values() for key in starts if key[0] == "model"]
@@ -0,0 +1,84 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the model backends."""
+
+import asyncio
+import logging
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+import pytest
+
+from heracles_ai.shared_libraries.models import (
+    CassetteMissError,
+    CassetteStore,
+    ReplayLlm,
+    get_model,
+    request_key,
+)
+from heracles_ai.shared_libraries.scripted_llm import ScriptedLlm
+
+
+def _request(text, instruction="You are a coach."):
+    return LlmRequest(
+        model="gemini-2.0-flash-001",
+        contents=[types.Content(role="user", parts=[types.Part(text=text)])],
+        config=types.GenerateContentConfig(system_instruction=instruction),
+    )
+
+
+def _generate(llm, request):
+    async def collect():
+        return [response async for response in llm.generate_content_async(request)]
+    return asyncio.run(collect())
+
+
+def test_request_key_ignores_the_session_time():
+    recorded = _request("Hi", "You are a coach.\n- Current time: 2025-05-01 09:12:44.120581")
+    replayed = _request("Hi", "You are a coach.\n- Current time: 2026-10-18 07:53:30.641234")
+    assert request_key(recorded) == request_key(replayed)
+    assert request_key(_request("I ate on 2025-05-01")) != request_key(_request("I ate on 2025-05-02"))
+
+
+def test_replay_returns_recorded_responses_and_falls_back(tmp_path):
+    recorded = LlmResponse(content=types.Content(role="model", parts=[types.Part(text="Recorded answer")]))
+    CassetteStore(str(tmp_path)).save(request_key(_request("Hi")), [recorded])
+    assert request_key(_request("Hi")) == request_key(_request("Hi"))
+    assert request_key(_request("Hi")) != request_key(_request("Hello"))
+
+    replay = ReplayLlm(model="gemini-2.0-flash-001", cassette_dir=str(tmp_path),
+                       fallback=ScriptedLlm(model="scripted/feedback_agent"))
+    assert _generate(replay, _request("Hi"))[0].content.parts[0].text == "Recorded answer"
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logging.getLogger("heracles_ai.models").addHandler(handler)
+    try:
+        assert _generate(replay, _request("Hello"))[0].content.parts[0].text.startswith("[feedback_agent]")
+    finally:
+        logging.getLogger("heracles_ai.models").removeHandler(handler)
+    assert [record.levelno for record in records] == [logging.WARNING]
+
+    with pytest.raises(CassetteMissError):
+        _generate(ReplayLlm(model="gemini-2.0-flash-001", cassette_dir=str(tmp_path)), _request("Hello"))
+
+
+def test_get_model_backends():
+    assert get_model("coach_agent", backend="live") == "gemini-2.0-flash-001"
+    assert get_model("coach_agent", backend="replay").fallback is None
+    assert get_model("coach_agent", backend="scripted").agent_name == "coach_agent"
+    with pytest.raises(ValueError):
+        get_model("coach_agent", backend="mock")
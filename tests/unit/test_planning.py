@@ -0,0 +1,201 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the parallel planning mode."""
+
+import asyncio
+import json
+import pathlib
+import warnings
+
+from google.adk.agents import Agent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from heracles_ai.shared_libraries import constants
+from heracles_ai.shared_libraries.types import DietPlan, FitnessPlan
+from heracles_ai.sub_agents.planning.merge import _branch_plan, build_plan_builder_agent, format_plan, merge_plans, parse_plan
+from heracles_ai.sub_agents.planning import stream
+from heracles_ai.sub_agents.planning.stream import JsonChunkScanner, iter_chunks
+
+SCENARIO = pathlib.Path(__file__).parents[2] / "eval/program_johndoe_example.json"
+
+# Current and peak number of overlapping model calls.
+_calls = {"now": 0, "peak": 0}
+
+
+class _SlowLlm(BaseLlm):
+    """Replies with a fixed plan after a delay."""
+
+    reply: str = ""
+
+    async def generate_content_async(self, llm_request, stream=False):
+        _calls["now"] += 1
+        _calls["peak"] = max(_calls["peak"], _calls["now"])
+        await asyncio.sleep(0.05)
+        _calls["now"] -= 1
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=self.reply)]))
+
+
+class _StreamingLlm(BaseLlm):
+    """Streams a fixed reply in pieces of a few characters, then sends it whole."""
+
+    reply: str = ""
+
+    async def generate_content_async(self, llm_request, stream=False):
+        for start in range(0, len(self.reply), 8):
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=self.reply[start:start + 8])]), partial=True)
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=self.reply)]))
+
+
+def test_parse_plan():
+    assert parse_plan('```json\n{"name": "Cut"}\n```') == {"name": "Cut"}
+    assert parse_plan('Here is the plan: {"name": "Cut"} Enjoy!') == {"name": "Cut"}
+    assert parse_plan("No plan today.") == "No plan today."
+    assert parse_plan({"name": "Cut"}) == {"name": "Cut"}
+
+
+_FITNESS_PLAN = {
+    "workouts_per_week": 2,
+    "daily_workouts": [
+        {"day": "Monday", "exercises": [{"name": "Squat {barbell}", "sets": 3, "reps": "8-10"}]},
+        {"day": "Thursday", "exercises": [{"name": "Run", "duration_minutes": 30}]},
+    ],
+    "weekly_progression": [{"week": 1, "phase": "base"}, {"week": 2, "phase": "base"}],
+}
+
+
+def test_scanner_reports_chunks_as_they_close():
+    text = "Here is your plan:\n```json\n" + json.dumps(_FITNESS_PLAN) + "\n```"
+    scanner = JsonChunkScanner()
+    fed = [(i, chunk) for i, char in enumerate(text) for chunk in scanner.feed(char)]
+    assert [kind for _, (kind, _, _) in fed] == ["workout_day", "workout_day", "week", "week"]
+    assert [chunk for _, chunk in fed] == list(iter_chunks(_FITNESS_PLAN))
+    # Each chunk is reported on its closing brace, before the rest of the plan arrives.
+    assert fed[0][0] == text.index("}]}") + 2
+
+
+def test_plans_are_created_concurrently_and_merged():
+    meal = {"name": "Breakfast", "calories": 450}
+    dietitian = Agent(name="dietitian_agent", model=_SlowLlm(model="slow", reply=json.dumps({"daily_calories": 2000, "meals": [meal]})))
+    coach = Agent(name="coach_agent", model=_SlowLlm(model="slow", reply="```json\n" + json.dumps(_FITNESS_PLAN) + "\n```"))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        workflow = build_plan_builder_agent(dietitian, coach, "Plan meals.", "Plan workouts.")
+
+    async def run():
+        runner = InMemoryRunner(agent=workflow, app_name="heracles")
+        session = await runner.session_service.create_session(app_name="heracles", user_id="u1")
+        message = types.Content(role="user", parts=[types.Part(text="Create my plans.")])
+        events = [event async for event in runner.run_async(user_id="u1", session_id=session.id, new_message=message)]
+        session = await runner.session_service.get_session(app_name="heracles", user_id="u1", session_id=session.id)
+        return events, session.state
+
+    events, state = asyncio.run(run())
+    assert _calls["peak"] == 2
+    chunks = [event.custom_metadata["plan_chunk"] for event in events if event.custom_metadata]
+    assert [(chunk["kind"], chunk["index"]) for chunk in chunks if chunk["plan"] == "fitness_plan"] == [
+        ("workout_day", 0), ("workout_day", 1), ("week", 0), ("week", 1)]
+    assert [(chunk["kind"], chunk["chunk"]) for chunk in chunks if chunk["plan"] == "diet_plan"] == [("meal", meal)]
+    # Chunk events carry only their entry; the draft is written once, after the last chunk.
+    assert not any(event.actions.state_delta for event in events if event.custom_metadata)
+    drafts = [event.actions.state_delta["_draft:fitness_plan"] for event in events
+              if "_draft:fitness_plan" in event.actions.state_delta and event.author == "fitness_plan_stream_agent"]
+    assert drafts == [{key: _FITNESS_PLAN[key] for key in ("daily_workouts", "weekly_progression")}]
+
+    # The turn ends on the presented plan, not on its JSON.
+    assert events[-1].author == "plan_merge_agent"
+    text = events[-1].content.parts[0].text
+    assert text.startswith("Here is your comprehensive nutrition and fitness plan:")
+    assert "- Breakfast: 450 kcal" in text and "- Monday: Squat {barbell} 3x8-10" in text and "- Thursday: Run 30 min" in text
+    assert text.endswith("Do you have any questions about the plan?")
+    combined = state[constants.COMBINED_PLAN_KEY]
+    # Stored as validated by the DietPlan schema (ADK's output_schema dump keeps the empty lists).
+    assert combined["nutrition_plan"] == {"daily_calories": 2000.0, "meals": [{**meal, "calories": 450.0}], "days": [], "supplements": []}
+    assert combined["fitness_plan"] == _FITNESS_PLAN
+    assert state[constants.FITNESS_PLAN_KEY] == _FITNESS_PLAN
+    assert state["_draft:fitness_plan"] is None
+    # The agents of the root tree are left untouched.
+    assert dietitian.parent_agent is None and dietitian.output_key is None
+
+
+def test_draft_is_saved_every_few_chunks(monkeypatch):
+    monkeypatch.setattr(stream, "DRAFT_SAVE_INTERVAL", 2)
+    meals = [{"name": f"Meal {i}", "calories": 100 + i} for i in range(5)]
+    dietitian = Agent(name="dietitian_agent", model=_StreamingLlm(model="streaming", reply=json.dumps({"daily_calories": 2000, "meals": meals})))
+    agent = stream.PlanStreamAgent(name="diet_plan_stream_agent", plan_key="diet_plan", sub_agents=[dietitian])
+
+    async def run():
+        runner = InMemoryRunner(agent=agent, app_name="heracles")
+        session = await runner.session_service.create_session(app_name="heracles", user_id="u1")
+        message = types.Content(role="user", parts=[types.Part(text="Plan my meals.")])
+        return [event async for event in runner.run_async(user_id="u1", session_id=session.id, new_message=message)]
+
+    events = asyncio.run(run())
+    drafts = [event.actions.state_delta["_draft:diet_plan"] for event in events if "_draft:diet_plan" in event.actions.state_delta]
+    # A reply streamed meal by meal: one write per two chunks, and one for the last chunk.
+    assert [len(draft["meals"]) for draft in drafts] == [2, 4, 5]
+    assert drafts[-1] == {"meals": meals}
+
+
+def test_dietitian_branch_calculates_without_the_calculator_agent():
+    from google.adk.tools.agent_tool import AgentTool
+    from heracles_ai.sub_agents.dietitian.agent import DIRECT_CMC_TOOLS, nutiritions_calculator_agent
+
+    dietitian = Agent(name="dietitian_agent", model=_SlowLlm(model="slow"),
+                      tools=[AgentTool(agent=nutiritions_calculator_agent), *DIRECT_CMC_TOOLS[1:]])
+    coach = Agent(name="coach_agent", model=_SlowLlm(model="slow"))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        workflow = build_plan_builder_agent(dietitian, coach, "Plan meals.", "Plan workouts.", dietitian_tools=DIRECT_CMC_TOOLS)
+    branch = workflow.sub_agents[0].sub_agents[0].sub_agents[0]
+    # The calculator agent asks the user to confirm, which nobody can do in a branch.
+    assert [tool.__name__ for tool in branch.tools] == [
+        "calculate_and_store_cmc_tool", "memorize", "nutrition_tool", "meal_plan_tool"]
+    assert isinstance(dietitian.tools[0], AgentTool)
+
+
+def test_scenario_plans_survive_the_merge():
+    state = json.loads(SCENARIO.read_text())["state"]
+    diet_plan, fitness_plan = state[constants.DIET_PLAN_KEY], state[constants.FITNESS_PLAN_KEY]
+    assert diet_plan["supplements"]
+    assert _branch_plan(state, constants.DIET_PLAN_KEY, DietPlan) == diet_plan
+    assert _branch_plan(state, constants.FITNESS_PLAN_KEY, FitnessPlan) == fitness_plan
+    assert "- Supplement: Omega-3 (1 capsule, 19:00)" in format_plan(merge_plans(diet_plan, fitness_plan))
+
+
+def test_meals_of_a_multi_day_plan_keep_their_day():
+    breakfast, dinner = {"name": "Breakfast", "calories": 450}, {"name": "Dinner", "calories": 700}
+    plan = {"daily_calories": 2000, "days": [{"day": 1, "meals": [breakfast, dinner]}, {"day": 2, "meals": [dinner]}]}
+    scanner = JsonChunkScanner()
+    text = json.dumps(plan)
+    fed = [chunk for char in text for chunk in scanner.feed(char)]
+    assert fed == list(iter_chunks(plan)) == [("meal", breakfast, 1), ("meal", dinner, 1), ("meal", dinner, 2)]
+
+    dietitian = Agent(name="dietitian_agent", model=_StreamingLlm(model="streaming", reply=text))
+    agent = stream.PlanStreamAgent(name="diet_plan_stream_agent", plan_key="diet_plan", sub_agents=[dietitian])
+
+    async def run():
+        runner = InMemoryRunner(agent=agent, app_name="heracles")
+        session = await runner.session_service.create_session(app_name="heracles", user_id="u1")
+        message = types.Content(role="user", parts=[types.Part(text="Plan my week.")])
+        return [event async for event in runner.run_async(user_id="u1", session_id=session.id, new_message=message)]
+
+    events = asyncio.run(run())
+    chunks = [event.custom_metadata["plan_chunk"] for event in events if event.custom_metadata]
+    assert [(chunk["day"], chunk["index"]) for chunk in chunks] == [(1, 0), (1, 1), (2, 0)]
+    drafts = [event.actions.state_delta["_draft:diet_plan"] for event in events if "_draft:diet_plan" in event.actions.state_delta]
+    assert drafts == [{"days": plan["days"]}]
@@ -0,0 +1,63 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the root agent pre-router."""
+
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from heracles_ai.shared_libraries import metrics, router
+
+
+@pytest.mark.parametrize("text, agent, route", [
+    ("Please transfer me to the coach", "coach_agent", "rule"),
+    ("I did a 30 minute run this morning, please log it.", "monitoring_agent", "rule"),
+    ("How am I doing? Any feedback?", "feedback_agent", "rule"),
+    ("Now please create my diet and workout plan.", "planning_agent", "rule"),
+    ("calculate my macros please", "dietitian_agent", "classifier"),
+    ("hello there", None, "llm"),
+    # Questions and negations are not activity reports.
+    ("I did not understand the plan", None, "llm"),
+    ("I ate too much, should I change my diet?", None, "llm"),
+    ("Can you tell me why I skipped breakfast?", None, "llm"),
+])
+def test_classify(text, agent, route):
+    assert router.classify(text) == (agent, route)
+
+
+def _request(*contents):
+    request = LlmRequest(contents=list(contents))
+    request.tools_dict["transfer_to_agent"] = None
+    return request
+
+
+def test_route_returns_transfer_call_for_new_user_message():
+    registry = metrics.MetricsRegistry()
+    context = SimpleNamespace(agent_name="root_agent")
+    message = types.Content(role="user", parts=[types.Part(text="log my run please")])
+
+    response = router.route_user_message(context, _request(message), registry)
+    call = response.content.parts[0].function_call
+    assert (call.name, call.args) == ("transfer_to_agent", {"agent_name": "monitoring_agent"})
+    assert registry.counter("heracles_router_decisions_total", route="rule", agent="monitoring_agent") == 1
+
+    # Not a new user message: a tool result or another agent's replayed output.
+    tool_result = types.Content(role="user", parts=[
+        types.Part(function_response=types.FunctionResponse(name="memorize", response={}))])
+    replayed = types.Content(role="user", parts=[types.Part(text="For context: [coach_agent] said: log my run")])
+    assert router.route_user_message(context, _request(message, tool_result), registry) is None
+    assert router.route_user_message(context, _request(replayed), registry) is None
@@ -0,0 +1,83 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the search result cache."""
+
+import asyncio
+import threading
+
+from google.adk.tools.agent_tool import AgentTool
+
+from heracles_ai.shared_libraries.metrics import MetricsRegistry
+from heracles_ai.tools.search import CachedAgentTool, SearchCache, _search_agent, normalize_query
+
+
+def test_cache_normalizes_queries_and_persists(tmp_path):
+    db_path = str(tmp_path / "search.db")
+    registry = MetricsRegistry()
+    cache = SearchCache(maxsize=2, ttl=60, db_path=db_path, registry=registry)
+
+    assert normalize_query("  Best  PRE-workout snack? ") == "best pre-workout snack"
+    assert cache.get("best pre-workout snack") is None
+    cache.set("best pre-workout snack", "A banana.")
+    assert cache.get("Best   pre-workout snack?") == "A banana."
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "size": 1}
+    assert registry.counter("heracles_search_cache_requests_total", result="hit") == 1
+
+    # A new process starts with an empty LRU but finds the SQLite entry.
+    assert SearchCache(db_path=db_path, registry=registry).get("best pre-workout snack") == "A banana."
+
+    expired = SearchCache(ttl=-1, db_path=str(tmp_path / "expired.db"), registry=registry)
+    expired.set("x", "stale")
+    assert expired.get("x") is None
+
+
+def test_cached_tool_runs_the_search_once(monkeypatch):
+    calls = []
+
+    async def fake_run_async(self, *, args, tool_context):
+        calls.append(args["request"])
+        return f"Answer to {args['request']}"
+
+    monkeypatch.setattr(AgentTool, "run_async", fake_run_async)
+    tool = CachedAgentTool(agent=_search_agent, cache=SearchCache(registry=MetricsRegistry()))
+
+    async def run(query):
+        return await tool.run_async(args={"request": query}, tool_context=None)
+
+    assert asyncio.run(run("Protein per day?")) == "Answer to Protein per day?"
+    assert asyncio.run(run("protein per day")) == "Answer to Protein per day?"
+    assert calls == ["Protein per day?"]
+
+
+def test_cached_tool_reads_and_writes_sqlite_off_the_event_loop(tmp_path, monkeypatch):
+    async def fake_run_async(self, *, args, tool_context):
+        return f"Answer to {args['request']}"
+
+    monkeypatch.setattr(AgentTool, "run_async", fake_run_async)
+    cache = SearchCache(db_path=str(tmp_path / "search.db"), registry=MetricsRegistry())
+    threads = []
+    for name in ("_load", "_store"):
+        method = getattr(cache, name)
+        monkeypatch.setattr(cache, name, lambda *args, _method=method: threads.append(threading.get_ident()) or _method(*args))
+    tool = CachedAgentTool(agent=_search_agent, cache=cache)
+
+    async def run():
+        answer = await tool.run_async(args={"request": "Protein per day?"}, tool_context=None)
+        return answer, threading.get_ident()
+
+    answer, loop_thread = asyncio.run(run())
+    assert answer == "Answer to Protein per day?"
+    assert len(threads) == 2 and loop_thread not in threads
+    assert SearchCache(db_path=str(tmp_path / "search.db"), registry=MetricsRegistry()).get("protein per day") == answer
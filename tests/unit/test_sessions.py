@@ -0,0 +1,102 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the persistent session service."""
+
+import asyncio
+import sqlite3
+import threading
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.sessions.base_session_service import GetSessionConfig
+import pytest
+
+from heracles_ai.shared_libraries.sessions import PersistentSessionService, SqliteSessionStore
+
+
+def _event(delta):
+    return Event(author="monitoring_agent", invocation_id="inv", actions=EventActions(state_delta=delta))
+
+
+def test_state_deltas_are_persisted_per_key(tmp_path):
+    path = str(tmp_path / "sessions.db")
+
+    async def scenario():
+        service = PersistentSessionService(SqliteSessionStore(path))
+        session = await service.create_session(
+            app_name="heracles", user_id="u1", session_id="s1",
+            state={"meals": ["oatmeal"], "diet_plan": {"calories": 2000}, "user:units": "metric"},
+        )
+        with pytest.raises(AlreadyExistsError):
+            await service.create_session(app_name="heracles", user_id="u1", session_id="s1")
+
+        await service.append_event(session, _event({"meals": ["oatmeal", "salad"], "temp:scratch": 1}))
+        await service.append_event(session, _event({"diet_plan": None}))
+        assert session.state["meals"] == ["oatmeal", "salad"]
+
+        # A fresh service (e.g. after a restart) sees the same state and events.
+        reloaded = await PersistentSessionService(SqliteSessionStore(path)).get_session(
+            app_name="heracles", user_id="u1", session_id="s1")
+        recent = await service.get_session(app_name="heracles", user_id="u1", session_id="s1",
+                                           config=GetSessionConfig(num_recent_events=1))
+        return reloaded, recent, await service.get_user_state(app_name="heracles", user_id="u1")
+
+    reloaded, recent, user_state = asyncio.run(scenario())
+    assert reloaded.state == {"meals": ["oatmeal", "salad"], "user:units": "metric"}
+    assert len(reloaded.events) == 2 and reloaded.events[0].author == "monitoring_agent"
+    assert len(recent.events) == 1
+    assert user_state == {"units": "metric"}
+
+    rows = sqlite3.connect(path).execute("SELECT key FROM session_state ORDER BY key").fetchall()
+    assert rows == [("meals",)]
+    assert sqlite3.connect(path).execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+
+def test_store_calls_run_off_the_event_loop(tmp_path):
+    store = SqliteSessionStore(str(tmp_path / "sessions.db"))
+    threads = []
+    load_session = store.load_session
+
+    def recording_load_session(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return load_session(*args, **kwargs)
+
+    store.load_session = recording_load_session
+
+    async def scenario():
+        service = PersistentSessionService(store)
+        await service.create_session(app_name="heracles", user_id="u1", session_id="s1")
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+    assert threads and loop_thread not in threads
+
+
+def test_failed_delete_is_rolled_back(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    store = SqliteSessionStore(path)
+    ids = ("heracles", "u1", "s1")
+    store.create_session(*ids, {"session": {"meals": []}}, 1.0)
+    store.append_event(*ids, "e1", 2.0, "{}", {"session": {"meals": ["salad"]}})
+    sqlite3.connect(path).execute(
+        "CREATE TRIGGER keep_events BEFORE DELETE ON events BEGIN SELECT RAISE(ABORT, 'kept'); END")
+
+    with pytest.raises(sqlite3.IntegrityError):
+        store.delete_session(*ids)
+    # The session is whole, and the connection can write again.
+    store.append_event(*ids, "e2", 3.0, "{}", {})
+    stored = SqliteSessionStore(path).load_session(*ids)
+    assert stored.state == {"meals": ["salad"]} and len(stored.events) == 2
@@ -0,0 +1,59 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the workout-plan generator."""
+
+import json
+import pathlib
+from types import SimpleNamespace
+
+from heracles_ai.tools.exercise import get_exercise_catalog
+from heracles_ai.tools.workout_planner import render_week, week_template, workout_plan_tool
+
+EXAMPLE = json.loads((pathlib.Path(__file__).parents[2] / "eval/program_johndoe_example.json").read_text())
+
+
+def test_plan_matches_example_shape():
+    profile = {**EXAMPLE["state"]["user_profile"], "activity_level": "moderately_active"}
+    plan = workout_plan_tool(0, SimpleNamespace(state={"user_profile": profile}))
+    example = EXAMPLE["state"]["fitness_plan"]
+
+    assert plan["duration_weeks"] == 13  # 2025-01-15 to 2025-04-15
+    assert plan["workouts_per_week"] == 4
+    assert [day["day"] for day in plan["daily_workouts"]] == [day["day"] for day in example["daily_workouts"]]
+    example_keys = {frozenset(ex) for day in example["daily_workouts"] for ex in day["exercises"]}
+    for day in plan["daily_workouts"]:
+        for exercise in day["exercises"]:
+            assert frozenset(exercise) in example_keys
+
+
+def test_plan_respects_equipment():
+    profile = {"fitness_goals": ["build_muscle"], "activity_level": "very_active", "equipment_available": ["dumbbells"]}
+    plan = workout_plan_tool(8, SimpleNamespace(state={"user_profile": profile}))
+    allowed = {ex["name"] for ex in get_exercise_catalog().search("", ["dumbbells"], limit=1000)}
+    names = {ex["name"] for day in plan["daily_workouts"] for ex in day["exercises"]} - {"Rest"}
+    assert names <= allowed
+
+
+def test_progressive_overload():
+    assert [week_template(week)["phase"] for week in range(1, 13)] == (
+        ["foundation"] * 3 + ["deload"] + ["build"] * 3 + ["deload"] + ["peak"] * 3 + ["deload"])
+
+    profile = {"fitness_goals": ["lose_weight"], "activity_level": "sedentary"}
+    plan = workout_plan_tool(12, SimpleNamespace(state={"user_profile": profile}))
+    monday = {week: render_week(plan, week)[0]["exercises"][0] for week in (1, 4, 5, 9)}
+    assert (monday[1]["sets"], monday[1]["reps"]) == (3, 12)
+    assert (monday[4]["sets"], monday[4]["reps"]) == (2, 12)
+    assert (monday[5]["sets"], monday[5]["reps"]) == (4, 10)
+    assert (monday[9]["sets"], monday[9]["reps"]) == (4, 8)